@@ -2,13 +2,21 @@ import hmac
 import hashlib
 import logging
 from datetime import datetime, timezone
-from fastapi import Request, Header, HTTPException, Depends
+from typing import Optional
+from fastapi import Request, Header, HTTPException, Depends, WebSocket
 from app.core.application import Application
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+class RequestContext:
+    def __init__(self, org_id: str, key_id: str, key_name: str):
+        self.org_id = org_id
+        self.key_id = key_id
+        self.key_name = key_name
+
+
 async def get_app(request: Request):
     return request.app.state.app
 
@@ -21,11 +29,8 @@ def hash_api_key(raw_key: str) -> str:
     ).hexdigest()
 
 
-async def verify_api_key(
-    x_api_key: str = Header(..., alias="X-API-Key"),
-    app: Application = Depends(get_app),
-):
-    key_hash = hash_api_key(x_api_key)
+async def authenticate_api_key(app: Application, raw_key: str) -> dict:
+    key_hash = hash_api_key(raw_key)
 
     key_node = await app.repo.organization.find_api_key_by_hash(key_hash)
 
@@ -45,3 +50,38 @@ async def verify_api_key(
         "key_id": key_node.id,
         "name": key_node.name,
     }
+
+
+async def verify_api_key(
+    x_api_key: str = Header(..., alias="X-API-Key"),
+    app: Application = Depends(get_app),
+):
+    return await authenticate_api_key(app, x_api_key)
+
+
+async def get_request_context(auth: dict = Depends(verify_api_key)) -> RequestContext:
+    return RequestContext(
+        org_id=auth["org_id"],
+        key_id=auth["key_id"],
+        key_name=auth["name"],
+    )
+
+
+async def get_websocket_context(websocket: WebSocket) -> Optional[RequestContext]:
+    """Authenticate a WebSocket handshake.
+
+    Browsers cannot set headers on WebSocket requests, so the key may also
+    be passed as the `api_key` query parameter. Returns None when the key
+    is missing or rejected.
+    """
+    raw_key = websocket.headers.get("x-api-key") or websocket.query_params.get("api_key")
+    if not raw_key:
+        return None
+
+    try:
+        auth = await authenticate_api_key(websocket.app.state.app, raw_key)
+    except HTTPException as e:
+        logger.info(f"WebSocket authentication failed: {e.detail}")
+        return None
+
+    return RequestContext(org_id=auth["org_id"], key_id=auth["key_id"], key_name=auth["name"])
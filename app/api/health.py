@@ -18,4 +18,5 @@ async def health_check(app: Application = Depends(get_app)):
         status="healthy" if all([neo4j_health, weaviate_health]) else "degraded",
         version="0.1.0",
         components={"neo4j": neo4j_health, "weaviate": weaviate_health},
+        metrics=app.metrics(),
     )
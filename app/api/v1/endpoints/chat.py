@@ -1,64 +1,140 @@
+import json
 import logging
-from fastapi import APIRouter, Depends, status, HTTPException, WebSocket, WebSocketDisconnect
-from app.api.deps import RequestContext, get_request_context
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import (
+    APIRouter,
+    Depends,
+    status,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from app.api.deps import RequestContext, get_app, get_request_context, get_websocket_context
+from app.core.application import Application
+from app.core.exceptions import LLMError, ResourceNotFoundError
 from app.models.schema import ChatMessageRequest, ChatResponse
-from app.services.neo4j import Neo4jService
-from app.services.weaviate import WeaviateService
-from app.services.llm import LLMService
-from app.services.chat import ChatService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-neo4j_service = Neo4jService()
-weaviate_service = WeaviateService()
-llm_service = LLMService()
-chat_service = ChatService(neo4j_service, weaviate_service, llm_service)
+# Application-defined close code mirroring HTTP 404
+WS_4404_NOT_FOUND = 4404
 
 
 @router.post("/start", status_code=status.HTTP_201_CREATED)
 async def start_conversation(
     context: RequestContext = Depends(get_request_context),
+    app: Application = Depends(get_app),
 ):
     try:
-        conversation_id = await chat_service.create_conversation(context.org_id)
+        conversation_id = await app.chat.create_conversation(context.org_id)
         return {"conversation_id": conversation_id}
     except Exception as e:
         logger.error(f"Failed to start conversation: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to start conversation")
 
 
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_chat_sse(
+    request: Request, events: AsyncIterator[Dict[str, Any]]
+) -> AsyncIterator[str]:
+    """Render chat events as Server-Sent Events.
+
+    The next event is only pulled from the LLM once the previous one has
+    been written, so a slow client throttles generation. When the client
+    goes away the event stream is closed, which cancels the upstream
+    completion.
+    """
+    async with aclosing(events):
+        try:
+            async for event in events:
+                if await request.is_disconnected():
+                    logger.info("Client disconnected, cancelling chat stream")
+                    return
+                yield sse_event(event.pop("type"), event)
+        except LLMError as e:
+            yield sse_event("error", {"detail": e.message})
+        except Exception as e:
+            # Headers are already sent; report the failure in-band.
+            logger.error(f"Failed to stream message: {str(e)}")
+            yield sse_event("error", {"detail": "Failed to process message"})
+
+
 @router.post("/message", response_model=ChatResponse)
 async def send_message(
     message: ChatMessageRequest,
+    request: Request,
+    response: Response,
+    stream: bool = False,
     context: RequestContext = Depends(get_request_context),
+    app: Application = Depends(get_app),
 ):
+    """Answer a message.
+
+    With `stream=true` the reply is a `text/event-stream` of `delta` events
+    followed by a `done` event with the message id and sources. Either way
+    the `Server-Timing` header breaks down retrieval latency per stage.
+    """
     try:
         if not message.conversation_id:
-            message.conversation_id = await chat_service.create_conversation(context.org_id)
+            message.conversation_id = await app.chat.create_conversation(context.org_id)
+        elif not await app.chat.conversation_exists(message.conversation_id, context.org_id):
+            raise ResourceNotFoundError("Conversation")
 
-        await chat_service.add_message(
-            message.conversation_id,
-            context.org_id,
-            "user",
-            message.content,
-        )
+        if stream:
+            retrieval = await app.chat.retrieve(
+                message.conversation_id,
+                context.org_id,
+                message.content,
+                message.context_resources,
+                persist_user_message=True,
+            )
+            return StreamingResponse(
+                stream_chat_sse(
+                    request,
+                    app.chat.stream_response(
+                        message.conversation_id,
+                        context.org_id,
+                        message.content,
+                        retrieval=retrieval,
+                    ),
+                ),
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "X-Accel-Buffering": "no",
+                    "Server-Timing": retrieval.server_timing(),
+                },
+            )
 
-        response_text = await chat_service.generate_response(
+        reply = await app.chat.generate_response(
             message.conversation_id,
             context.org_id,
             message.content,
             message.context_resources,
+            persist_user_message=True,
         )
+        response.headers["Server-Timing"] = reply.retrieval.server_timing()
 
         return ChatResponse(
-            message_id="auto",
+            message_id=reply.message_id,
             conversation_id=message.conversation_id,
-            content=response_text,
+            content=reply.content,
+            sources=reply.retrieval.sources,
+            prompt_tokens=reply.retrieval.prompt_tokens.get("total"),
             confidence=0.95,
         )
 
+    except ResourceNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to send message: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to process message")
@@ -66,17 +142,56 @@ async def send_message(
 
 @router.websocket("/ws/{conversation_id}")
 async def websocket_endpoint(websocket: WebSocket, conversation_id: str):
+    """Stream assistant replies token by token.
+
+    Each client frame is either plain text or JSON
+    `{"content": ..., "context_resources": [...]}`. The server answers with
+    `{"type": "delta", "content": ...}` frames followed by
+    `{"type": "done", "message_id": ..., "conversation_id": ...}`.
+    """
+    context = await get_websocket_context(websocket)
+    if context is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid API key")
+        return
+
+    app: Application = websocket.app.state.app
     await websocket.accept()
+    if not await app.chat.conversation_exists(conversation_id, context.org_id):
+        await websocket.close(code=WS_4404_NOT_FOUND, reason="Conversation not found")
+        return
     try:
         while True:
-            data = await websocket.receive_text()
-            logger.info(f"Received message: {data}")
+            content, context_resources = parse_ws_message(await websocket.receive_text())
+            if not content:
+                continue
 
-            response = f"Echo: {data}"
-            await websocket.send_text(response)
+            events = app.chat.stream_response(
+                conversation_id,
+                context.org_id,
+                content,
+                context_resources,
+                persist_user_message=True,
+            )
+            try:
+                async with aclosing(events):
+                    async for event in events:
+                        await websocket.send_json(event)
+            except LLMError as e:
+                await websocket.send_json({"type": "error", "detail": e.message})
 
     except WebSocketDisconnect:
         logger.info(f"Client disconnected from conversation {conversation_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
         await websocket.close(code=1011, reason="Internal server error")
+
+
+def parse_ws_message(data: str) -> Tuple[str, Optional[List[str]]]:
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return data.strip(), None
+
+    if not isinstance(payload, dict):
+        return data.strip(), None
+    return str(payload.get("content", "")).strip(), payload.get("context_resources")
@@ -1,22 +1,85 @@
+import json
 import logging
-import uuid
-from fastapi import APIRouter, Depends, status, HTTPException
-from app.api.deps import RequestContext, get_request_context
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from app.api.deps import RequestContext, get_app, get_request_context
+from app.core.application import Application
 from app.models.schema import CloudResourceResponse
-from app.services.neo4j import Neo4jService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/resources", tags=["resources"])
-neo4j_service = Neo4jService()
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def to_resource_response(node: Dict[str, Any], org_id: str) -> CloudResourceResponse:
+    metadata = node.get("metadata") or {}
+    if isinstance(metadata, str):
+        metadata = json.loads(metadata)
+
+    return CloudResourceResponse(
+        id=node.get("id"),
+        name=node.get("name"),
+        resource_type=node.get("type"),
+        provider=node.get("provider"),
+        account_id=node.get("account_id"),
+        metadata=metadata,
+        org_id=org_id,
+        created_at=node.get("created_at"),
+        updated_at=node.get("updated_at"),
+    )
+
+
+async def stream_resources_ndjson(
+    app: Application,
+    org_id: str,
+    skip: int,
+    limit: Optional[int],
+    fetch_size: Optional[int],
+) -> AsyncIterator[str]:
+    query = """
+    MATCH (r:CloudResource {org_id: $org_id})
+    RETURN r
+    SKIP $skip
+    """
+    parameters: Dict[str, Any] = {"org_id": org_id, "skip": skip}
+    if limit is not None:
+        query += "LIMIT $limit"
+        parameters["limit"] = limit
+
+    try:
+        async for record in app.neo4j.iter_query(query, parameters, fetch_size=fetch_size):
+            yield to_resource_response(record["r"], org_id).model_dump_json() + "\n"
+    except Exception as e:
+        # Headers are already sent, so the error goes out as a final line
+        logger.error(f"Failed to stream resources: {str(e)}")
+        yield json.dumps({"error": "Failed to stream resources"}) + "\n"
 
 
 @router.get("", response_model=list[CloudResourceResponse])
 async def list_resources(
     skip: int = 0,
-    limit: int = 100,
+    limit: Optional[int] = None,
+    stream: bool = False,
+    fetch_size: Optional[int] = None,
     context: RequestContext = Depends(get_request_context),
+    app: Application = Depends(get_app),
 ):
+    """List resources.
+
+    With `stream=true` the response is NDJSON (one resource per line) read
+    lazily from Neo4j, and `limit` is optional; otherwise it is a JSON array
+    page of at most `limit` (default 100) resources. A stream that fails
+    part way ends with an `{"error": ...}` line.
+    """
+    if stream:
+        return StreamingResponse(
+            stream_resources_ndjson(app, context.org_id, skip, limit, fetch_size),
+            media_type="application/x-ndjson",
+        )
+
     try:
         query = """
         MATCH (r:CloudResource {org_id: $org_id})
@@ -25,25 +88,16 @@ async def list_resources(
         LIMIT $limit
         """
 
-        results = await neo4j_service.execute_query(
+        results = await app.neo4j.read(
             query,
-            {"org_id": context.org_id, "skip": skip, "limit": limit},
+            {
+                "org_id": context.org_id,
+                "skip": skip,
+                "limit": DEFAULT_PAGE_SIZE if limit is None else limit,
+            },
         )
 
-        return [
-            CloudResourceResponse(
-                id=r.get("r").get("id"),
-                name=r.get("r").get("name"),
-                resource_type=r.get("r").get("type"),
-                provider=r.get("r").get("provider"),
-                account_id=r.get("r").get("account_id"),
-                metadata=r.get("r").get("metadata", {}),
-                org_id=context.org_id,
-                created_at=r.get("r").get("created_at"),
-                updated_at=r.get("r").get("updated_at"),
-            )
-            for r in results
-        ]
+        return [to_resource_response(r.get("r"), context.org_id) for r in results]
 
     except Exception as e:
         logger.error(f"Failed to list resources: {str(e)}")
@@ -54,6 +108,7 @@ async def list_resources(
 async def get_resource(
     resource_id: str,
     context: RequestContext = Depends(get_request_context),
+    app: Application = Depends(get_app),
 ):
     try:
         query = """
@@ -61,7 +116,7 @@ async def get_resource(
         RETURN r
         """
 
-        results = await neo4j_service.execute_query(
+        results = await app.neo4j.read(
             query,
             {"resource_id": resource_id, "org_id": context.org_id},
         )
@@ -69,18 +124,7 @@ async def get_resource(
         if not results:
             raise HTTPException(status_code=404, detail="Resource not found")
 
-        r = results[0]
-        return CloudResourceResponse(
-            id=r.get("r").get("id"),
-            name=r.get("r").get("name"),
-            resource_type=r.get("r").get("type"),
-            provider=r.get("r").get("provider"),
-            account_id=r.get("r").get("account_id"),
-            metadata=r.get("r").get("metadata", {}),
-            org_id=context.org_id,
-            created_at=r.get("r").get("created_at"),
-            updated_at=r.get("r").get("updated_at"),
-        )
+        return to_resource_response(results[0].get("r"), context.org_id)
 
     except HTTPException:
         raise
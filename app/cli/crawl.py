@@ -0,0 +1,163 @@
+import json
+from typing import Annotated
+
+import typer
+from rich import print
+
+from app.cli.utils import with_app
+from app.core.application import Application
+from app.core.constants import CloudProvider
+from app.services.crawler.recording import PageRecorder
+from app.services.crawler.replay import ReplayCrawler
+
+cli = typer.Typer()
+
+
+async def _find_job(app: Application, org_name: str, provider: CloudProvider, account_id: str):
+    org = await app.repo.organization.get_org_by_name(org_name)
+    if not org:
+        print(f"[red]Error:[/red] Organization '[bold]{org_name}[/bold]' not found.")
+        raise typer.Exit(code=1)
+
+    await app.scheduler.ensure_jobs()
+    job = await app.repo.crawl_job.get_job(f"{org.id}:{provider.value}:{account_id}")
+    if not job:
+        print(f"[red]Error:[/red] Cloud account '[bold]{account_id}[/bold]' not found.")
+        raise typer.Exit(code=1)
+    return job
+
+
+@cli.command()
+@with_app()
+async def run(
+    app: Application,
+    org_name: str,
+    provider: Annotated[CloudProvider, typer.Argument(help="Cloud provider (aws, azure, gcp)")],
+    account_id: str,
+    full: bool = typer.Option(False, help="Rewrite every resource instead of a delta sync"),
+    asset_export: str = typer.Option(
+        None, help="GCP only: read a Cloud Asset Inventory export (NDJSON) instead of the APIs"
+    ),
+):
+    """Sync an account now, in this process."""
+    job = await _find_job(app, org_name, provider, account_id)
+
+    credentials = {"asset_export_path": asset_export} if asset_export else None
+    report = await app.scheduler.run_job(
+        job, incremental=not full, credentials=credentials, force=True
+    )
+    if report is None:
+        print("[yellow]Crawl is already running on another worker[/yellow]")
+        raise typer.Exit(code=1)
+
+    job = await app.repo.crawl_job.get_job(job.id)
+    if job.status == "failed":
+        print(f"[red]Crawl failed:[/red] {job.last_error}")
+        raise typer.Exit(code=1)
+
+    print("[green]✔ Crawl complete[/green]")
+    print(json.dumps({k: v for k, v in report.items() if k != "batches"}, indent=2))
+
+
+@cli.command()
+@with_app()
+async def record(
+    app: Application,
+    org_name: str,
+    provider: Annotated[CloudProvider, typer.Argument(help="Cloud provider (aws, azure, gcp)")],
+    account_id: str,
+    output: str = typer.Option(..., help="Recording to write (gzipped NDJSON)"),
+):
+    """Crawl an account and record the raw API pages for offline replay; nothing is stored."""
+    job = await _find_job(app, org_name, provider, account_id)
+    crawler = app.crawlers[job.provider]
+    credentials = app.scheduler.credentials_resolver(job)
+
+    resources = 0
+    with PageRecorder(output, job.provider, job.account_id) as recorder:
+        async for _ in crawler.iter_resources(
+            job.org_id, job.account_id, credentials, recorder=recorder
+        ):
+            resources += 1
+
+    print(f"[green]✔ Recorded {recorder.pages} pages[/green] ({resources} resources) to {output}")
+
+
+@cli.command()
+@with_app()
+async def replay(
+    app: Application,
+    org_name: str,
+    recording: str,
+    account_id: str = typer.Option(None, help="Store under this account (default: recorded)"),
+    speed: float = typer.Option(0.0, help="Multiple of the recorded pace; 0 is unthrottled"),
+    scale: int = typer.Option(1, help="Copies of every recorded resource to synthesize"),
+    full: bool = typer.Option(False, help="Rewrite every resource instead of a delta sync"),
+    index: bool = typer.Option(True, help="Also embed the resources into the vector index"),
+):
+    """Ingest a recorded crawl, e.g. to benchmark ingest without cloud access."""
+    org = await app.repo.organization.get_org_by_name(org_name)
+    if not org:
+        print(f"[red]Error:[/red] Organization '[bold]{org_name}[/bold]' not found.")
+        raise typer.Exit(code=1)
+
+    crawler = ReplayCrawler(
+        app.neo4j,
+        recording,
+        speed=speed,
+        scale=scale,
+        indexer=app.indexer if index else None,
+        response_cache=app.response_cache,
+        response_cache_invalidation=app.response_cache_invalidation,
+    )
+    account_id = account_id or crawler.header["account_id"]
+    report = await crawler.sync_resources(org.id, account_id, {}, incremental=not full)
+
+    print("[green]✔ Replay complete[/green]")
+    print(json.dumps({k: v for k, v in report.items() if k != "batches"}, indent=2))
+
+
+@cli.command()
+@with_app()
+async def trigger(
+    app: Application,
+    org_name: str,
+    provider: Annotated[CloudProvider, typer.Argument(help="Cloud provider (aws, azure, gcp)")],
+    account_id: str,
+):
+    """Make an account's sync due now; the API server's scheduler runs it."""
+    job = await _find_job(app, org_name, provider, account_id)
+    await app.scheduler.trigger(job.id)
+    print(f"[green]Crawl queued[/green] for [bold]{job.id}[/bold]")
+
+
+@cli.command()
+@with_app()
+async def index(
+    app: Application,
+    org_name: str,
+    provider: Annotated[CloudProvider, typer.Argument(help="Cloud provider (aws, azure, gcp)")],
+    account_id: str,
+):
+    """Embed an account's stored resources into the vector index."""
+    job = await _find_job(app, org_name, provider, account_id)
+    report = await app.indexer.index_account(job.org_id, job.account_id)
+    print(f"[green]✔ Indexed {report['indexed']} resources[/green] in {report['seconds']}s")
+    if report["failed"]:
+        print(f"[yellow]{report['failed']} resources failed to index[/yellow]")
+
+
+@cli.command()
+@with_app()
+async def status(app: Application, org_id: str = typer.Option(None, help="Filter by org id")):
+    """Show crawl job state."""
+    jobs = await app.repo.crawl_job.list_jobs(org_id)
+    for j in jobs:
+        last_run = j.last_run_at.strftime("%Y-%m-%d %H:%M:%S") if j.last_run_at else "never"
+        print(
+            f"{j.provider} | {j.account_id} | [bold]{j.status}[/bold] | "
+            f"last: {last_run} | next: {j.next_run_at.strftime('%Y-%m-%d %H:%M:%S')} | "
+            f"failures: {j.failures}"
+        )
+        if j.last_error:
+            print(f"    [red]{j.last_error}[/red]")
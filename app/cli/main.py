@@ -3,6 +3,8 @@ from cli.migrate import cli as migrate_cli
 from cli.organization import cli as org_cli
 from cli.cloud_account import cli as account_cli
 from cli.api_key import cli as key_cli
+from cli.crawl import cli as crawl_cli
+from cli.vectors import cli as vectors_cli
 
 cli = typer.Typer()
 
@@ -10,6 +12,8 @@ cli.add_typer(migrate_cli, name="migrate")
 cli.add_typer(org_cli, name="org")
 cli.add_typer(account_cli, name="account")
 cli.add_typer(key_cli, name="key")
+cli.add_typer(crawl_cli, name="crawl")
+cli.add_typer(vectors_cli, name="vectors")
 
 if __name__ == "__main__":
     cli()
@@ -1,6 +1,6 @@
 import typer
 from app.cli.utils import with_app
-from app.core.migrate import run_migrations
+from app.core.migrate import run_migrations, run_vector_migrations
 
 cli = typer.Typer()
 
@@ -9,4 +9,5 @@ cli = typer.Typer()
 @with_app(require_migration=False)
 async def migrate(app):
     await run_migrations(app.neo4j)
+    await run_vector_migrations(app.indexer)
     print("Migrations applied successfully.")
@@ -0,0 +1,29 @@
+import typer
+from rich import print
+from typing import Annotated, Optional
+from app.cli.utils import with_app
+from app.core.application import Application
+from app.services.indexing import RESOURCE_COLLECTION
+
+cli = typer.Typer()
+
+
+@cli.command()
+@with_app()
+async def tenants(app: Application):
+    """Show the resource index tenant of every organization and its status."""
+    for name, status in sorted((await app.weaviate.list_tenants(RESOURCE_COLLECTION)).items()):
+        print(f"{name} | {status}")
+
+
+@cli.command("deactivate-idle")
+@with_app()
+async def deactivate_idle(
+    app: Application,
+    idle_days: Annotated[
+        Optional[int], typer.Option(help="Days without chat activity (default from settings)")
+    ] = None,
+):
+    """Unload the vectors of organizations that have not chatted recently."""
+    deactivated = await app.indexer.deactivate_idle_tenants(idle_days)
+    print(f"[green]✔ Deactivated {len(deactivated)} idle tenants[/green]")
@@ -1,22 +1,98 @@
 import logging
 from app.services.neo4j import Neo4jService
 from app.services.weaviate import WeaviateService
+from app.services.llm import LLMService
+from app.services.chat import ChatService
+from app.services.indexing import ResourceIndexer
+from app.services.cache import TTLCache, CacheInvalidationChannel
+from app.services.embedding_cache import EmbeddingCache
+from app.services.response_cache import SemanticResponseCache
+from app.services.crawler.aws import AWSCrawler
+from app.services.crawler.azure import AzureCrawler
+from app.services.crawler.gcp import GCPCrawler
+from app.services.crawler.scheduler import CrawlScheduler
+from app.core.config import settings
+from app.core.constants import CloudProvider
 
 from app.services.repositories.organization import OrganizationRepository
 from app.services.repositories.resource import ResourceRepository
+from app.services.repositories.crawl_job import CrawlJobRepository
 
 logger = logging.getLogger("cloud-companion")
 
 
 class Repositories:
-    def __init__(self, neo4j):
-        self.organization = OrganizationRepository(neo4j)
+    def __init__(self, neo4j, api_key_cache=None, api_key_invalidation=None):
+        self.organization = OrganizationRepository(
+            neo4j,
+            api_key_cache=api_key_cache,
+            api_key_invalidation=api_key_invalidation,
+        )
+        self.crawl_job = CrawlJobRepository(neo4j)
 
 
 class Application:
-    def __init__(self):
+    def __init__(self, run_scheduler: bool = False):
         self.neo4j = Neo4jService()
         self.weaviate = WeaviateService()
+        self.embedding_cache = (
+            EmbeddingCache(
+                settings.EMBEDDING_CACHE_PATH,
+                max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+            )
+            if settings.EMBEDDING_CACHE_ENABLED
+            else None
+        )
+        self.llm = LLMService(embedding_cache=self.embedding_cache)
+        self.response_cache = (
+            SemanticResponseCache(
+                max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+                ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+                threshold=settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+            )
+            if settings.RESPONSE_CACHE_ENABLED
+            else None
+        )
+        # Crawls may run in another process (scheduler worker, CLI), so
+        # resource changes are broadcast to every worker's response cache
+        self.response_cache_invalidation = (
+            CacheInvalidationChannel(
+                self.neo4j,
+                name="resources",
+                poll_interval=settings.RESPONSE_CACHE_INVALIDATION_POLL_SECONDS,
+            )
+            if self.response_cache
+            else None
+        )
+        if self.response_cache_invalidation:
+            self.response_cache_invalidation.subscribe(self.response_cache.clear)
+        self.chat = ChatService(
+            self.neo4j, self.weaviate, self.llm, response_cache=self.response_cache
+        )
+        self.indexer = ResourceIndexer(self.neo4j, self.llm, self.weaviate)
+        self.api_key_cache = TTLCache(
+            max_entries=settings.API_KEY_CACHE_MAX_ENTRIES,
+            ttl=settings.API_KEY_CACHE_TTL_SECONDS,
+            negative_ttl=settings.API_KEY_CACHE_NEGATIVE_TTL_SECONDS,
+        )
+        self.api_key_invalidation = CacheInvalidationChannel(
+            self.neo4j,
+            name="api_key",
+            poll_interval=settings.API_KEY_CACHE_INVALIDATION_POLL_SECONDS,
+        )
+        self.api_key_invalidation.subscribe(self.api_key_cache.clear)
+        crawler_options = {
+            "indexer": self.indexer,
+            "response_cache": self.response_cache,
+            "response_cache_invalidation": self.response_cache_invalidation,
+        }
+        self.crawlers = {
+            CloudProvider.AWS.value: AWSCrawler(self.neo4j, **crawler_options),
+            CloudProvider.AZURE.value: AzureCrawler(self.neo4j, **crawler_options),
+            CloudProvider.GCP.value: GCPCrawler(self.neo4j, **crawler_options),
+        }
+        self.run_scheduler = run_scheduler
         self.started = False
 
     async def start(self):
@@ -27,7 +103,18 @@ class Application:
         await self.neo4j.connect()
         await self.weaviate.connect()
 
-        self.repo = Repositories(self.neo4j)
+        self.repo = Repositories(
+            self.neo4j,
+            api_key_cache=self.api_key_cache,
+            api_key_invalidation=self.api_key_invalidation,
+        )
+        self.api_key_invalidation.start()
+        if self.response_cache_invalidation:
+            self.response_cache_invalidation.start()
+
+        self.scheduler = CrawlScheduler(self.repo.crawl_job, self.crawlers)
+        if self.run_scheduler and settings.CRAWL_SCHEDULER_ENABLED:
+            self.scheduler.start()
 
         self.started = True
         logger.info("Application started")
@@ -37,8 +124,24 @@ class Application:
             return
 
         logger.info("Stopping application services")
+        await self.scheduler.stop()
+        await self.chat.stop()
+        await self.api_key_invalidation.stop()
+        if self.response_cache_invalidation:
+            await self.response_cache_invalidation.stop()
         await self.neo4j.close()
         await self.weaviate.close()
+        if self.embedding_cache:
+            self.embedding_cache.close()
 
         self.started = False
         logger.info("Application stopped")
+
+    def metrics(self) -> dict:
+        return {
+            "api_key_cache": self.api_key_cache.stats(),
+            "neo4j_pool": self.neo4j.pool_stats(),
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "crawl_scheduler": self.scheduler.stats() if self.started else None,
+        }
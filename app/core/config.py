@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
@@ -35,6 +35,10 @@ class Settings(BaseSettings):
     NEO4J_USER: str = Field(default="companion")
     NEO4J_PASSWORD: str = Field(default="")
     NEO4J_DATABASE: str = Field(default="neo4j")
+    NEO4J_MAX_CONNECTION_POOL_SIZE: int = Field(default=100)
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT: float = Field(default=60.0)
+    NEO4J_MAX_CONNECTION_LIFETIME: float = Field(default=3600.0)
+    NEO4J_FETCH_SIZE: int = Field(default=1000)
 
     @field_validator("NEO4J_PASSWORD")
     @classmethod
@@ -45,6 +49,47 @@ class Settings(BaseSettings):
 
     WEAVIATE_URL: str = Field(default="http://weaviate:8080")
     WEAVIATE_API_KEY: str = Field(default="")
+    WEAVIATE_GRPC_PORT: int = Field(default=50051)
+    WEAVIATE_TIMEOUT_INIT_SECONDS: float = Field(default=5)
+    WEAVIATE_TIMEOUT_QUERY_SECONDS: float = Field(default=30)
+    WEAVIATE_TIMEOUT_INSERT_SECONDS: float = Field(default=90)
+    WEAVIATE_MAX_RETRIES: int = Field(default=2)
+    WEAVIATE_RETRY_BACKOFF_SECONDS: float = Field(default=0.2)
+    WEAVIATE_BATCH_SIZE: int = Field(default=200)
+    WEAVIATE_BATCH_CONCURRENCY: int = Field(default=2)
+    WEAVIATE_INACTIVE_TENANT_STATUS: str = Field(default="INACTIVE")
+    WEAVIATE_TENANT_IDLE_DAYS: int = Field(default=30)
+
+    RESOURCE_SEARCH_ALPHA: float = Field(default=0.5)
+    RESOURCE_SEARCH_LIMIT: int = Field(default=5)
+
+    CHAT_HISTORY_MESSAGES: int = Field(default=10)
+    CHAT_SUMMARY_ENABLED: bool = Field(default=True)
+    CHAT_SUMMARY_KEEP_MESSAGES: int = Field(default=4)
+    CHAT_SUMMARY_MAX_TOKENS: int = Field(default=300)
+    CHAT_HISTORY_TIMEOUT_SECONDS: float = Field(default=2.0)
+    CHAT_RESOURCES_TIMEOUT_SECONDS: float = Field(default=2.0)
+    CHAT_SEARCH_TIMEOUT_SECONDS: float = Field(default=3.0)
+    CHAT_PERSIST_TIMEOUT_SECONDS: float = Field(default=5.0)
+
+    RESPONSE_CACHE_ENABLED: bool = Field(default=False)
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = Field(default=0.95)
+    RESPONSE_CACHE_TTL_SECONDS: float = Field(default=3600.0)
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=1000)
+    RESPONSE_CACHE_INVALIDATION_POLL_SECONDS: float = Field(default=5.0)
+
+    LLM_PROVIDER: str = Field(default="ollama")
+    LLM_MODEL: str = Field(default="llama3")
+    LLM_API_KEY: str = Field(default="")
+    LLM_BASE_URL: str = Field(default="http://ollama:11434")
+    LLM_TEMPERATURE: float = Field(default=0.2)
+    LLM_MAX_TOKENS: int = Field(default=1024)
+    LLM_MAX_CONTEXT_TOKENS: int = Field(default=3000)
+    LLM_EMBEDDING_MODEL: str = Field(default="embedding")
+    LLM_EMBEDDING_BATCH_SIZE: int = Field(default=64)
+    LLM_EMBEDDING_BATCH_TOKENS: int = Field(default=8000)
+    LLM_EMBEDDING_MAX_INPUT_TOKENS: int = Field(default=512)
+    LLM_EMBEDDING_CONCURRENCY: int = Field(default=4)
 
     API_HMAC_SECRET: str = Field(default="")
 
@@ -55,6 +100,40 @@ class Settings(BaseSettings):
             raise ValueError("API_HMAC_SECRET must be set for secure operations")
         return v
 
+    API_KEY_CACHE_TTL_SECONDS: float = Field(default=60.0)
+    API_KEY_CACHE_NEGATIVE_TTL_SECONDS: float = Field(default=10.0)
+    API_KEY_CACHE_MAX_ENTRIES: int = Field(default=10000)
+    API_KEY_CACHE_INVALIDATION_POLL_SECONDS: float = Field(default=5.0)
+
+    CRAWLER_INGEST_BATCH_SIZE: int = Field(default=500)
+    CRAWLER_INGEST_CONCURRENCY: int = Field(default=4)
+    CRAWLER_QUEUE_SIZE: int = Field(default=64)
+    CRAWLER_INCREMENTAL: bool = Field(default=True)
+    AWS_CRAWLER_MAX_WORKERS: int = Field(default=16)
+    AZURE_CRAWLER_MAX_CONCURRENCY: int = Field(default=8)
+    GCP_CRAWLER_MAX_CONCURRENCY: int = Field(default=8)
+    # Cloud Asset Inventory export to crawl GCP from, e.g. /exports/{project_id}.json.gz
+    GCP_ASSET_EXPORT_PATH: str = Field(default="")
+
+    EMBEDDING_CACHE_ENABLED: bool = Field(default=True)
+    EMBEDDING_CACHE_PATH: str = Field(default=".cache/embeddings.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(default=100_000)
+    EMBEDDING_CACHE_MAX_BYTES: int = Field(default=512 * 1024 * 1024)
+
+    INDEXING_BATCH_SIZE: int = Field(default=1000)
+
+    CRAWL_SCHEDULER_ENABLED: bool = Field(default=False)
+    CRAWL_SCHEDULER_TICK_SECONDS: float = Field(default=30.0)
+    CRAWL_INTERVAL_SECONDS: float = Field(default=6 * 3600)
+    CRAWL_INTERVAL_JITTER: float = Field(default=0.1)
+    CRAWL_MAX_CONCURRENCY: int = Field(default=4)
+    CRAWL_PROVIDER_CONCURRENCY: Dict[str, int] = Field(
+        default_factory=lambda: {"AWS": 2, "AZURE": 2, "GCP": 2}
+    )
+    CRAWL_BACKOFF_BASE_SECONDS: float = Field(default=300.0)
+    CRAWL_BACKOFF_MAX_SECONDS: float = Field(default=6 * 3600)
+    CRAWL_LEASE_SECONDS: float = Field(default=2 * 3600)
+
     AWS_ACCOUNT_ID: str = Field(default="")
     AZURE_SUBSCRIPTION_ID: str = Field(default="")
     GCP_PROJECT_ID: str = Field(default="")
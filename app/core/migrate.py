@@ -6,6 +6,12 @@ logger = logging.getLogger("cloud-companion")
 MIGRATIONS_PATH = Path(__file__).parent / "migrations"
 
 
+def split_statements(cypher: str) -> list[str]:
+    """Split a migration file into statements; the driver runs one per query."""
+    lines = [line for line in cypher.splitlines() if not line.strip().startswith("//")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
 async def run_migrations(neo4j_service):
     driver = neo4j_service.driver
 
@@ -39,8 +45,9 @@ async def run_migrations(neo4j_service):
 
             logger.info(f"Applying migration: {version}")
 
-            cypher = file.read_text()
-            await session.run(cypher)
+            for statement in split_statements(file.read_text()):
+                result = await session.run(statement)
+                await result.consume()
 
             await session.run(
                 """
@@ -55,6 +62,12 @@ async def run_migrations(neo4j_service):
         logger.info("Neo4j migrations complete.")
 
 
+async def run_vector_migrations(indexer):
+    """Create Weaviate collections and one tenant per organization."""
+    created = await indexer.ensure_schema()
+    logger.info(f"Weaviate schema ready ({len(created)} tenants created).")
+
+
 async def get_latest_migration_version(neo4j_service):
     driver = neo4j_service.driver
 
@@ -0,0 +1,18 @@
+// ---------------------------------------------------------------------------
+// CLOUD RESOURCE (crawler ingest)
+// Bulk ingest MERGEs on CloudResource.id and matches CloudAccount.id,
+// so both must be index-backed.
+// ---------------------------------------------------------------------------
+
+CREATE CONSTRAINT cloud_resource_id IF NOT EXISTS
+FOR (r:CloudResource)
+REQUIRE r.id IS UNIQUE;
+
+CREATE INDEX cloud_account_id IF NOT EXISTS
+FOR (c:CloudAccount)
+ON (c.id);
+
+// Resource listing is always org-scoped
+CREATE INDEX cloud_resource_org_index IF NOT EXISTS
+FOR (r:CloudResource)
+ON (r.org_id);
@@ -0,0 +1,12 @@
+// ---------------------------------------------------------------------------
+// CRAWL JOB
+// One scheduler job per Account, keyed by org + provider + account_id
+// ---------------------------------------------------------------------------
+
+CREATE CONSTRAINT crawl_job_id IF NOT EXISTS
+FOR (j:CrawlJob)
+REQUIRE j.id IS UNIQUE;
+
+CREATE INDEX crawl_job_next_run_index IF NOT EXISTS
+FOR (j:CrawlJob)
+ON (j.next_run_at);
@@ -0,0 +1,35 @@
+// ---------------------------------------------------------------------------
+// CONVERSATION
+// Looked up by id for every chat message, and by org for tenant housekeeping
+// ---------------------------------------------------------------------------
+
+CREATE CONSTRAINT conversation_id IF NOT EXISTS
+FOR (c:Conversation)
+REQUIRE c.id IS UNIQUE;
+
+CREATE INDEX conversation_org_index IF NOT EXISTS
+FOR (c:Conversation)
+ON (c.org_id);
+
+
+// ---------------------------------------------------------------------------
+// MESSAGE
+// History is fetched newest first per conversation, so messages carry their
+// conversation id and (conversation_id, created_at) backs the ORDER BY
+// ---------------------------------------------------------------------------
+
+CREATE CONSTRAINT message_id IF NOT EXISTS
+FOR (m:Message)
+REQUIRE m.id IS UNIQUE;
+
+CREATE INDEX message_conversation_created_index IF NOT EXISTS
+FOR (m:Message)
+ON (m.conversation_id, m.created_at);
+
+// Backfill messages stored before they carried the conversation id
+MATCH (c:Conversation)-[:HAS_MESSAGE]->(m:Message)
+WHERE m.conversation_id IS NULL
+CALL {
+    WITH c, m
+    SET m.conversation_id = c.id
+} IN TRANSACTIONS OF 10000 ROWS;
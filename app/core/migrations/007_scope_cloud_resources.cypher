@@ -0,0 +1,16 @@
+// ---------------------------------------------------------------------------
+// CLOUD RESOURCE (tenant scoping)
+// Provider ids are not unique across organizations or accounts (name-based
+// ARNs, GCP full names, replayed recordings), so ingest MERGEs resources on
+// (org_id, account_id, id) and accounts on (org_id, id).
+// ---------------------------------------------------------------------------
+
+DROP CONSTRAINT cloud_resource_id IF EXISTS;
+
+CREATE CONSTRAINT cloud_resource_key IF NOT EXISTS
+FOR (r:CloudResource)
+REQUIRE (r.org_id, r.account_id, r.id) IS UNIQUE;
+
+CREATE INDEX cloud_account_org_id IF NOT EXISTS
+FOR (c:CloudAccount)
+ON (c.org_id, c.id);
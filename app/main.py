@@ -17,7 +17,7 @@ ROOT_DIR = Path(__file__).parent.parent
 
 logger = logging.getLogger("cloud-companion")
 
-app_instance = Application()
+app_instance = Application(run_scheduler=True)
 
 
 @asynccontextmanager
@@ -125,6 +125,58 @@ class Account(BaseNode):
         }
 
 
+class CrawlJob(BaseNode):
+    """Scheduler state for the periodic sync of one cloud account."""
+
+    label = "CrawlJob"
+
+    def __init__(
+        self,
+        org_id: str,
+        provider: str,
+        account_id: str,
+        next_run_at: datetime | str,
+        id: Optional[str] = None,
+        status: str = "pending",
+        failures: int = 0,
+        last_run_at: Optional[datetime | str] = None,
+        last_error: Optional[str] = None,
+        last_report: Optional[str] = None,
+        lease_owner: Optional[str] = None,
+        lease_expires_at: Optional[datetime | str] = None,
+    ):
+        self.id = id or f"{org_id}:{provider}:{account_id}"
+        self.org_id = org_id
+        self.provider = provider
+        self.account_id = account_id
+        self.next_run_at = ensure_datetime(next_run_at)
+        self.status = status
+        self.failures = failures
+        self.last_run_at = ensure_datetime(last_run_at) if last_run_at else None
+        self.last_error = last_error
+        self.last_report = last_report
+        self.lease_owner = lease_owner
+        self.lease_expires_at = ensure_datetime(lease_expires_at) if lease_expires_at else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "org_id": self.org_id,
+            "provider": self.provider,
+            "account_id": self.account_id,
+            "next_run_at": self.next_run_at.isoformat(),
+            "status": self.status,
+            "failures": self.failures,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_error": self.last_error,
+            "last_report": self.last_report,
+            "lease_owner": self.lease_owner,
+            "lease_expires_at": (
+                self.lease_expires_at.isoformat() if self.lease_expires_at else None
+            ),
+        }
+
+
 # ---------------------------------------------------------------------------
 # Location Layer
 # ---------------------------------------------------------------------------
@@ -430,3 +482,41 @@ class Resource(BaseNode):
             "metadata": self.metadata,
             "created_at": self.created_at.isoformat(),
         }
+
+
+class CloudResource(BaseNode):
+    """
+    Flat resource record produced by the crawlers and stored as
+    `:CloudResource` under its `CloudAccount`.
+    """
+
+    label = "CloudResource"
+
+    def __init__(
+        self,
+        id: str,
+        org_id: str,
+        name: Optional[str],
+        resource_type: str,
+        provider: str,
+        account_id: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = str(id)
+        self.org_id = org_id
+        self.name = name
+        self.resource_type = resource_type
+        self.provider = provider
+        self.account_id = account_id
+        self.metadata = metadata or {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "org_id": self.org_id,
+            "name": self.name,
+            "resource_type": self.resource_type,
+            "provider": self.provider,
+            "account_id": self.account_id,
+            "metadata": self.metadata,
+        }
@@ -107,6 +107,7 @@ class ChatResponse(BaseModel):
     conversation_id: str
     content: str
     sources: Optional[List[Dict[str, Any]]] = None
+    prompt_tokens: Optional[int] = None
     confidence: float = Field(ge=0.0, le=1.0)
 
 
@@ -114,3 +115,4 @@ class HealthResponse(BaseModel):
     status: str
     version: str
     components: Dict[str, bool]
+    metrics: Optional[Dict[str, Any]] = None
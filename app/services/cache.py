@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded in-process cache with per-entry expiry and LRU eviction.
+
+    `None` is a valid cached value, which allows negative lookups to be
+    cached (optionally with a shorter `negative_ttl`).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 60.0,
+        negative_ttl: Optional[float] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if self._entries.pop(key, _MISSING) is not _MISSING:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class CacheInvalidationChannel:
+    """Cross-worker invalidation signal backed by a version counter in Neo4j.
+
+    Every worker keeps its own in-process caches. Publishing bumps a
+    `:CacheInvalidation` node; other workers poll the counter in the
+    background and run their subscribers when it changes, so staleness is
+    bounded by `poll_interval` instead of by the cache TTL.
+    """
+
+    def __init__(self, neo4j_service, name: str, poll_interval: float = 5.0):
+        self.neo4j = neo4j_service
+        self.name = name
+        self.poll_interval = poll_interval
+        self._version: Optional[int] = None
+        self._subscribers: List[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        self._subscribers.append(callback)
+
+    async def publish(self) -> None:
+        query = """
+        MERGE (c:CacheInvalidation {name: $name})
+        SET c.version = coalesce(c.version, 0) + 1,
+            c.updated_at = datetime()
+        RETURN c.version AS version
+        """
+        try:
+            results = await self.neo4j.write(query, {"name": self.name})
+            # Our own caches were already invalidated locally by the caller;
+            # only skip our own bump, never one published by another worker.
+            if results and self._version is not None:
+                if results[0]["version"] == self._version + 1:
+                    self._version = results[0]["version"]
+        except Exception as e:
+            logger.warning(f"Failed to publish cache invalidation for {self.name}: {str(e)}")
+
+    async def poll(self) -> None:
+        query = """
+        MATCH (c:CacheInvalidation {name: $name})
+        RETURN c.version AS version
+        """
+        results = await self.neo4j.read(query, {"name": self.name})
+        version = results[0]["version"] if results else 0
+
+        if self._version is not None and version != self._version:
+            logger.debug(f"Cache invalidation received for {self.name} (version {version})")
+            for callback in self._subscribers:
+                callback()
+
+        self._version = version
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation poll failed for {self.name}: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None and self.poll_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def cached(cache: TTLCache, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+    hit, value = cache.get(key)
+    if hit:
+        return value
+
+    value = await loader()
+    cache.set(key, value)
+    return value
@@ -1,13 +1,104 @@
+import asyncio
 import logging
+import re
+import time
 import uuid
-from typing import Optional, Dict, Any, List
+from contextlib import aclosing
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+from app.core.config import settings
+from app.core.constants import CloudProvider, Region
 from app.services.neo4j import Neo4jService
 from app.services.weaviate import WeaviateService
 from app.services.llm import LLMService
-from app.core.exceptions import DatabaseError
+from app.services.indexing import RESOURCE_COLLECTION, RESOURCE_SEARCH_PROPERTIES
+from app.services.context import SUMMARY_PREFIX, ContextBuilder
+from app.services.response_cache import SemanticResponseCache, context_fingerprint
+from app.core.exceptions import DatabaseError, ResourceNotFoundError
 
 logger = logging.getLogger(__name__)
 
+# The running summary plus the newest messages it doesn't cover yet
+CONVERSATION_CONTEXT_QUERY = """
+MATCH (c:Conversation {id: $conv_id, org_id: $org_id})
+OPTIONAL MATCH (m:Message {conversation_id: $conv_id})
+WHERE (c.summary_through IS NULL OR m.created_at > c.summary_through)
+  AND ($exclude_id IS NULL OR m.id <> $exclude_id)
+WITH c, m
+ORDER BY m.created_at DESC
+LIMIT $limit
+RETURN c.summary as summary, m.role as role, m.content as content
+"""
+
+UNSUMMARIZED_MESSAGES_QUERY = """
+MATCH (c:Conversation {id: $conv_id, org_id: $org_id})
+MATCH (m:Message {conversation_id: $conv_id})
+WHERE c.summary_through IS NULL OR m.created_at > c.summary_through
+RETURN c.summary as summary, c.summary_through as summary_through,
+       m.role as role, m.content as content, m.created_at as created_at
+ORDER BY m.created_at
+"""
+
+# Only applies if nobody else moved the summary on in the meantime
+SAVE_SUMMARY_QUERY = """
+MATCH (c:Conversation {id: $conv_id, org_id: $org_id})
+WHERE (c.summary_through IS NULL AND $previous IS NULL) OR c.summary_through = $previous
+SET c.summary = $summary,
+    c.summary_through = $through,
+    c.summary_updated_at = datetime()
+RETURN c.id as id
+"""
+
+CONVERSATION_EXISTS_QUERY = """
+MATCH (c:Conversation {id: $conv_id, org_id: $org_id})
+RETURN c.id as id
+"""
+
+CONTEXT_RESOURCES_QUERY = """
+MATCH (r:CloudResource)
+WHERE r.id IN $ids AND r.org_id = $org_id
+RETURN r.id as id, r.name as name, r.metadata as metadata, r.type as type
+"""
+
+PROVIDER_KEYWORDS = {
+    "aws": CloudProvider.AWS.value,
+    "amazon": CloudProvider.AWS.value,
+    "azure": CloudProvider.AZURE.value,
+    "gcp": CloudProvider.GCP.value,
+    "google": CloudProvider.GCP.value,
+}
+
+REGION_CODES = {
+    region.code for regions in (Region.AWS, Region.AZURE, Region.GCP) for region in regions
+}
+
+STATE_KEYWORDS = {
+    "running",
+    "stopped",
+    "stopping",
+    "pending",
+    "terminated",
+    "available",
+    "deleting",
+    "failed",
+}
+
+
+def resource_filters(query: str) -> Dict[str, Any]:
+    """Structured filters spelled out in a question ("stopped ... in eu-west-1")."""
+    words = set(re.findall(r"[a-z0-9-]+", query.lower()))
+    filters: Dict[str, Any] = {}
+
+    providers = sorted({PROVIDER_KEYWORDS[w] for w in words if w in PROVIDER_KEYWORDS})
+    if providers:
+        filters["provider"] = providers
+    regions = sorted(words & REGION_CODES)
+    if regions:
+        filters["region"] = regions
+    states = sorted(words & STATE_KEYWORDS)
+    if states:
+        filters["state"] = states
+    return filters
+
 
 class ChatService:
     def __init__(
@@ -15,10 +106,14 @@ class ChatService:
         neo4j_service: Neo4jService,
         weaviate_service: WeaviateService,
         llm_service: LLMService,
+        response_cache: Optional[SemanticResponseCache] = None,
     ):
         self.neo4j = neo4j_service
         self.weaviate = weaviate_service
         self.llm = llm_service
+        self.response_cache = response_cache
+        self.context_builder = ContextBuilder(llm_service)
+        self._summaries: Dict[str, asyncio.Task] = {}
 
     async def create_conversation(self, org_id: str) -> str:
         try:
@@ -27,9 +122,7 @@ class ChatService:
             CREATE (c:Conversation {id: $id, org_id: $org_id, created_at: datetime()})
             RETURN c.id
             """
-            results = await self.neo4j.execute_query(
-                query, {"id": conversation_id, "org_id": org_id}
-            )
+            results = await self.neo4j.write(query, {"id": conversation_id, "org_id": org_id})
             return conversation_id
         except Exception as e:
             logger.error(f"Failed to create conversation: {str(e)}")
@@ -41,93 +134,416 @@ class ChatService:
         org_id: str,
         role: str,
         content: str,
+        message_id: Optional[str] = None,
     ) -> str:
         try:
-            message_id = str(uuid.uuid4())
+            message_id = message_id or str(uuid.uuid4())
             query = """
-            MATCH (c:Conversation {id: $conv_id})
-            CREATE (m:Message {id: $msg_id, role: $role, content: $content, created_at: datetime()})
+            MATCH (c:Conversation {id: $conv_id, org_id: $org_id})
+            CREATE (m:Message {
+                id: $msg_id,
+                conversation_id: $conv_id,
+                role: $role,
+                content: $content,
+                created_at: datetime()
+            })
             CREATE (c)-[:HAS_MESSAGE]->(m)
             RETURN m.id
             """
-            results = await self.neo4j.execute_query(
+            results = await self.neo4j.write(
                 query,
                 {
                     "conv_id": conversation_id,
+                    "org_id": org_id,
                     "msg_id": message_id,
                     "role": role,
                     "content": content,
                 },
             )
+            if not results:
+                raise ResourceNotFoundError("Conversation", {"conversation_id": conversation_id})
             return message_id
+        except ResourceNotFoundError:
+            raise
         except Exception as e:
             logger.error(f"Failed to add message: {str(e)}")
             raise DatabaseError("Failed to add message")
 
+    async def conversation_exists(self, conversation_id: str, org_id: str) -> bool:
+        results = await self.neo4j.read(
+            CONVERSATION_EXISTS_QUERY, {"conv_id": conversation_id, "org_id": org_id}
+        )
+        return bool(results)
+
     async def get_conversation_context(
-        self, conversation_id: str, limit: int = 5
+        self, conversation_id: str, org_id: str, limit: int = 5
     ) -> List[Dict[str, str]]:
         try:
-            query = """
-            MATCH (c:Conversation {id: $conv_id})-[:HAS_MESSAGE]->(m:Message)
-            RETURN m.role as role, m.content as content
-            ORDER BY m.created_at DESC
-            LIMIT $limit
-            """
-            results = await self.neo4j.execute_query(
-                query, {"conv_id": conversation_id, "limit": limit}
+            results = await self.neo4j.read(
+                CONVERSATION_CONTEXT_QUERY,
+                {"conv_id": conversation_id, "org_id": org_id, "limit": limit, "exclude_id": None},
             )
-            return [{"role": r.get("role"), "content": r.get("content")} for r in reversed(results)]
+            history = self._format_history(results)
+            summary = results[0]["summary"] if results else None
+            if summary:
+                history.insert(0, {"role": "system", "content": SUMMARY_PREFIX + summary})
+            return history
         except Exception as e:
             logger.error(f"Failed to get conversation context: {str(e)}")
             return []
 
-    async def search_resources(self, org_id: str, query: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _format_history(results: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        return [
+            {"role": r.get("role"), "content": r.get("content")}
+            for r in reversed(results)
+            if r.get("role")
+        ]
+
+    async def summarize_conversation(self, conversation_id: str, org_id: str) -> bool:
+        """Fold older messages into the conversation's running summary.
+
+        All messages the summary doesn't cover yet, except the newest
+        `CHAT_SUMMARY_KEEP_MESSAGES`, are summarized together with the
+        current summary and stored on the `Conversation` node. Prompts then
+        carry the summary plus the recent messages, so history cost stays
+        flat however long the conversation gets. Returns whether the summary
+        moved on.
+        """
+        results = await self.neo4j.read(
+            UNSUMMARIZED_MESSAGES_QUERY, {"conv_id": conversation_id, "org_id": org_id}
+        )
+        keep = settings.CHAT_SUMMARY_KEEP_MESSAGES
+        if len(results) <= keep:
+            return False
+
+        folded = results[: len(results) - keep]
+        summary = await self.llm.summarize_conversation(
+            results[0]["summary"],
+            [{"role": r["role"], "content": r["content"]} for r in folded],
+        )
+        saved = await self.neo4j.write(
+            SAVE_SUMMARY_QUERY,
+            {
+                "conv_id": conversation_id,
+                "org_id": org_id,
+                "summary": summary,
+                "previous": results[0]["summary_through"],
+                "through": folded[-1]["created_at"],
+            },
+        )
+        logger.debug(f"Summarized {len(folded)} messages of conversation {conversation_id}")
+        return bool(saved)
+
+    def _schedule_summary(self, conversation_id: str, org_id: str) -> None:
+        if not settings.CHAT_SUMMARY_ENABLED or conversation_id in self._summaries:
+            return
+
+        async def run() -> None:
+            try:
+                await self.summarize_conversation(conversation_id, org_id)
+            except Exception as e:
+                # History falls back to the newest messages, losing only older context
+                logger.warning(f"Failed to summarize conversation {conversation_id}: {str(e)}")
+            finally:
+                self._summaries.pop(conversation_id, None)
+
+        self._summaries[conversation_id] = asyncio.create_task(run())
+
+    async def stop(self) -> None:
+        tasks = list(self._summaries.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def search_resources(
+        self,
+        org_id: str,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Hybrid (BM25 + vector) search over the org's resources.
+
+        Provider, region and state mentioned in the query become filters
+        alongside the explicit `filters`; if the inferred filters match
+        nothing, the search is retried with the explicit ones only.
+        """
         try:
+            inferred = resource_filters(query)
             embeddings = await self.llm.create_embeddings(query)
-            results = await self.weaviate.search_vectors(
-                collection="CloudResource", vector=embeddings, limit=5
-            )
+
+            async def search(where: Dict[str, Any]) -> List[Dict[str, Any]]:
+                return await self.weaviate.hybrid_search(
+                    collection=RESOURCE_COLLECTION,
+                    query=query,
+                    vector=embeddings,
+                    alpha=settings.RESOURCE_SEARCH_ALPHA,
+                    filters=where,
+                    properties=RESOURCE_SEARCH_PROPERTIES,
+                    limit=limit or settings.RESOURCE_SEARCH_LIMIT,
+                    tenant=org_id,
+                )
+
+            results = await search({**inferred, **(filters or {})})
+            if not results and inferred:
+                results = await search(filters or {})
             return results
         except Exception as e:
             logger.error(f"Failed to search resources: {str(e)}")
             return []
 
-    async def generate_response(
+    async def retrieve(
         self,
         conversation_id: str,
         org_id: str,
         user_message: str,
         context_resources: Optional[List[str]] = None,
-    ) -> str:
-        try:
-            context_data = []
-            if context_resources:
-                query = """
-                MATCH (r:CloudResource)
-                WHERE r.id IN $ids
-                RETURN r.name as name, r.metadata as metadata, r.resource_type as type
-                """
-                results = await self.neo4j.execute_query(query, {"ids": context_resources})
-                context_data = results
-
-            context_string = "\n".join(
-                [
-                    f"Resource: {r.get('name', 'N/A')}, Type: {r.get('type', 'N/A')}, Metadata: {r.get('metadata', {})}"
-                    for r in context_data
-                ]
+        persist_user_message: bool = False,
+    ) -> "Retrieval":
+        """Gather everything the prompt needs, concurrently.
+
+        History, explicitly selected resources, semantic search and (when
+        `persist_user_message` is set) storing the user message run at the
+        same time, each under its own timeout, so pre-LLM latency is bounded
+        by the slowest stage. Lookups that fail or time out degrade to empty
+        results; failing to store the user message is an error. The results
+        are then ranked and fitted into the prompt token budget.
+        """
+        retrieval = Retrieval()
+        user_message_id = str(uuid.uuid4()) if persist_user_message else None
+
+        async def timed(name: str, timeout: float, coro, default: Any = None, required=False):
+            started = time.perf_counter()
+            try:
+                return await asyncio.wait_for(coro, timeout)
+            except Exception as e:
+                reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                logger.warning(f"Chat retrieval stage {name} failed ({reason}): {str(e)}")
+                if required:
+                    if isinstance(e, ResourceNotFoundError):
+                        raise
+                    raise DatabaseError(f"Chat retrieval stage {name} failed")
+                retrieval.degraded[name] = reason
+                return default
+            finally:
+                retrieval.timings[name] = time.perf_counter() - started
+
+        stages = {
+            "history": timed(
+                "history",
+                settings.CHAT_HISTORY_TIMEOUT_SECONDS,
+                self.neo4j.read(
+                    CONVERSATION_CONTEXT_QUERY,
+                    {
+                        "conv_id": conversation_id,
+                        "org_id": org_id,
+                        "limit": settings.CHAT_HISTORY_MESSAGES,
+                        "exclude_id": user_message_id,
+                    },
+                ),
+                default=[],
             )
+        }
+        if context_resources:
+            stages["resources"] = timed(
+                "resources",
+                settings.CHAT_RESOURCES_TIMEOUT_SECONDS,
+                self.neo4j.read(
+                    CONTEXT_RESOURCES_QUERY, {"ids": context_resources, "org_id": org_id}
+                ),
+                default=[],
+            )
+        stages["search"] = timed(
+            "search",
+            settings.CHAT_SEARCH_TIMEOUT_SECONDS,
+            self.search_resources(org_id, user_message),
+            default=[],
+        )
+        if persist_user_message:
+            stages["persist"] = timed(
+                "persist",
+                settings.CHAT_PERSIST_TIMEOUT_SECONDS,
+                self.add_message(
+                    conversation_id, org_id, "user", user_message, message_id=user_message_id
+                ),
+                required=True,
+            )
+
+        started = time.perf_counter()
+        tasks = {name: asyncio.ensure_future(stage) for name, stage in stages.items()}
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        results = {name: task.result() for name, task in tasks.items()}
+        history = results["history"]
+        summary = history[0]["summary"] if history else None
+        # A full page of unsummarized messages means older ones no longer fit
+        retrieval.summary_due = (
+            len([r for r in history if r.get("role")]) >= settings.CHAT_HISTORY_MESSAGES
+        )
+        context_data = results.get("resources", [])
+        # Selected resources rank first; don't repeat them as search hits
+        selected = set(context_resources or ())
+        candidates = [r for r in results["search"] if r.get("resource_id") not in selected]
+        retrieval.timings["retrieval"] = time.perf_counter() - started
 
-            messages = await self.get_conversation_context(conversation_id)
-            messages.append({"role": "user", "content": user_message})
+        started = time.perf_counter()
+        prompt = self.context_builder.build(
+            user_message, self._format_history(history), context_data, candidates, summary
+        )
+        retrieval.timings["context"] = time.perf_counter() - started
+        retrieval.messages = prompt.messages
+        retrieval.context = prompt.context
+        retrieval.sources = prompt.sources
+        retrieval.prompt_tokens = prompt.tokens
+        logger.debug(
+            f"Prompt is {prompt.tokens['total']} tokens (context {prompt.tokens['context']}, "
+            f"history {prompt.tokens['history']}); omitted {prompt.omitted['resources']} "
+            f"resources and {prompt.omitted['messages']} messages"
+        )
+        retrieval.user_message_id = user_message_id
+        return retrieval
 
-            response = await self.llm.generate_response(
-                messages=messages, context=context_string if context_string else None
+    async def generate_response(
+        self,
+        conversation_id: str,
+        org_id: str,
+        user_message: str,
+        context_resources: Optional[List[str]] = None,
+        persist_user_message: bool = False,
+    ) -> "ChatReply":
+        try:
+            retrieval = await self.retrieve(
+                conversation_id, org_id, user_message, context_resources, persist_user_message
             )
 
-            await self.add_message(conversation_id, org_id, "assistant", response)
+            cache_key = await self._response_cache_key(user_message, retrieval)
+            response = self.response_cache.get(org_id, *cache_key) if cache_key else None
+            if response is None:
+                started = time.perf_counter()
+                response = await self.llm.generate_response(
+                    messages=retrieval.messages, context=retrieval.context
+                )
+                retrieval.timings["llm"] = time.perf_counter() - started
+                if cache_key:
+                    self.response_cache.set(org_id, *cache_key, response)
 
-            return response
+            message_id = await self.add_message(conversation_id, org_id, "assistant", response)
+            if retrieval.summary_due:
+                self._schedule_summary(conversation_id, org_id)
+
+            return ChatReply(content=response, message_id=message_id, retrieval=retrieval)
         except Exception as e:
             logger.error(f"Failed to generate response: {str(e)}")
             raise
+
+    async def stream_response(
+        self,
+        conversation_id: str,
+        org_id: str,
+        user_message: str,
+        context_resources: Optional[List[str]] = None,
+        persist_user_message: bool = False,
+        retrieval: Optional["Retrieval"] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a reply as `delta` events, then a final `done` event.
+
+        Retrieval is the same as `generate_response` (pass `retrieval` if it
+        already ran); the `done` event carries the stored message id and the
+        resources used as sources. The assistant message is persisted once,
+        after the last delta. A response cache hit is sent as a single
+        delta. Closing the generator early closes the upstream LLM stream
+        and stores nothing.
+        """
+        started = time.perf_counter()
+        if retrieval is None:
+            retrieval = await self.retrieve(
+                conversation_id, org_id, user_message, context_resources, persist_user_message
+            )
+
+        cache_key = await self._response_cache_key(user_message, retrieval)
+        response = self.response_cache.get(org_id, *cache_key) if cache_key else None
+        if response is not None:
+            yield {"type": "delta", "content": response}
+        else:
+            parts: List[str] = []
+            deltas = self.llm.stream_response(
+                messages=retrieval.messages, context=retrieval.context
+            )
+            async with aclosing(deltas):
+                async for delta in deltas:
+                    if not parts:
+                        logger.debug(f"First token after {time.perf_counter() - started:.3f}s")
+                    parts.append(delta)
+                    yield {"type": "delta", "content": delta}
+            response = "".join(parts)
+            if cache_key:
+                self.response_cache.set(org_id, *cache_key, response)
+
+        message_id = await self.add_message(conversation_id, org_id, "assistant", response)
+        if retrieval.summary_due:
+            self._schedule_summary(conversation_id, org_id)
+        yield {
+            "type": "done",
+            "message_id": message_id,
+            "conversation_id": conversation_id,
+            "sources": retrieval.sources,
+            "prompt_tokens": retrieval.prompt_tokens.get("total"),
+        }
+
+    async def _response_cache_key(
+        self, user_message: str, retrieval: "Retrieval"
+    ) -> Optional[Tuple[str, List[float]]]:
+        """(context fingerprint, question embedding), or None if caching is off.
+
+        The history part of the fingerprint excludes the question itself,
+        which is matched by similarity instead.
+        """
+        if self.response_cache is None:
+            return None
+
+        started = time.perf_counter()
+        try:
+            vector = await self.llm.create_embeddings(user_message)
+        except Exception as e:
+            logger.warning(f"Skipping response cache, failed to embed question: {str(e)}")
+            return None
+        finally:
+            retrieval.timings["cache"] = time.perf_counter() - started
+        return context_fingerprint(retrieval.context, retrieval.messages[:-1]), vector
+
+
+class Retrieval:
+    """Prompt inputs gathered before calling the LLM, with stage timings."""
+
+    def __init__(self):
+        self.messages: List[Dict[str, str]] = []
+        self.context: Optional[str] = None
+        self.sources: List[Dict[str, Any]] = []
+        self.prompt_tokens: Dict[str, int] = {}
+        self.summary_due = False
+        self.user_message_id: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.degraded: Dict[str, str] = {}
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value (durations in milliseconds)."""
+        entries = []
+        for name, seconds in self.timings.items():
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            if name in self.degraded:
+                entry += f';desc="{self.degraded[name]}"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+class ChatReply:
+    def __init__(self, content: str, message_id: str, retrieval: Retrieval):
+        self.content = content
+        self.message_id = message_id
+        self.retrieval = retrieval
@@ -0,0 +1,195 @@
+import json
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.llm import LLMService
+
+logger = logging.getLogger(__name__)
+
+# Longer metadata values (policies, tag blobs, ...) rarely help an answer
+METADATA_VALUE_CHARS = 80
+
+# Don't bother including a truncated item smaller than this
+MIN_ITEM_TOKENS = 16
+
+TRUNCATION_MARK = " …"
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+def _flatten(prefix: str, value: Any) -> Iterable[Tuple[str, Any]]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(f"{prefix}.{key}" if prefix else str(key), item)
+    else:
+        yield prefix, value
+
+
+def compact_metadata(metadata: Any, max_value_chars: int = METADATA_VALUE_CHARS) -> str:
+    """Terse `key=value` form of resource metadata.
+
+    Nested maps become dotted keys, lists are comma-joined, empty values are
+    dropped and long values are clipped.
+    """
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            return metadata[:max_value_chars]
+    if not isinstance(metadata, dict):
+        return ""
+
+    parts = []
+    for key, value in sorted(_flatten("", metadata)):
+        if value in (None, "", [], {}):
+            continue
+        if isinstance(value, list):
+            value = ",".join(str(v) for v in value)
+        value = str(value)
+        if len(value) > max_value_chars:
+            value = value[:max_value_chars] + "…"
+        parts.append(f"{key}={value}")
+    return " ".join(parts)
+
+
+def _terms(text: str) -> Set[str]:
+    return {word for word in re.findall(r"[a-z0-9-]+", text.lower()) if len(word) > 2}
+
+
+def _relevance(text: str, terms: Set[str]) -> int:
+    return len(_terms(text) & terms)
+
+
+class PromptContext:
+    """What fits in the prompt, with its size in tokens."""
+
+    def __init__(self):
+        self.context: Optional[str] = None
+        self.messages: List[Dict[str, str]] = []
+        self.sources: List[Dict[str, Any]] = []
+        self.tokens: Dict[str, int] = {}
+        self.omitted: Dict[str, int] = {"resources": 0, "messages": 0}
+
+
+class ContextBuilder:
+    """Fits retrieved resources and conversation history into a token budget.
+
+    The system prompt and question are always kept. Of the rest of
+    `LLM_MAX_CONTEXT_TOKENS`, up to half goes to history and whatever
+    history leaves unused goes to resources. History keeps the conversation
+    summary and the last exchange first, then the messages sharing the most
+    terms with the question;
+    selected resources are ranked the same way, while search results keep
+    their search ranking after them. Items are added in rank order and the
+    first one that doesn't fit is truncated.
+    """
+
+    def __init__(self, llm_service: LLMService, max_tokens: Optional[int] = None):
+        self.llm = llm_service
+        self.max_tokens = max_tokens or settings.LLM_MAX_CONTEXT_TOKENS
+
+    def build(
+        self,
+        question: str,
+        history: List[Dict[str, str]],
+        resources: Optional[List[Dict[str, Any]]] = None,
+        candidates: Optional[List[Dict[str, Any]]] = None,
+        summary: Optional[str] = None,
+    ) -> PromptContext:
+        prompt = PromptContext()
+        terms = _terms(question)
+        question_tokens = self.llm.count_tokens(question)
+        # System prompt and question are fixed costs
+        overhead = self.llm.prompt_tokens([{"role": "user", "content": question}], context=" ")
+        remaining = max(self.max_tokens - overhead, 0)
+
+        ranked = self._rank_history(history, terms)
+        if summary:
+            # Stands in for everything before the history, so it goes first
+            ranked.insert(0, (-1, {"role": "system", "content": SUMMARY_PREFIX + summary}))
+        kept, history_tokens = self._fit(ranked, remaining // 2, lambda m: m["content"])
+        prompt.omitted["messages"] = len(ranked) - len(kept)
+        # Back to chronological order for the model
+        prompt.messages = [
+            {"role": m["role"], "content": content}
+            for _, m, content in sorted(kept, key=lambda k: k[0])
+        ] + [{"role": "user", "content": question}]
+
+        items = [(resource_line(r), resource_source(r)) for r in resources or []]
+        items.sort(key=lambda item: -_relevance(item[0], terms))
+        items += [
+            (r["description"], candidate_source(r))
+            for r in candidates or []
+            if r.get("description")
+        ]
+        included, context_tokens = self._fit(
+            list(enumerate(items)), remaining - history_tokens, lambda item: item[0]
+        )
+        prompt.omitted["resources"] = len(items) - len(included)
+        prompt.context = "\n".join(content for _, _, content in included) or None
+        prompt.sources = [item[1] for _, item, _ in included]
+
+        prompt.tokens = {
+            "question": question_tokens,
+            "history": history_tokens,
+            "context": context_tokens,
+            "total": self.llm.prompt_tokens(prompt.messages, prompt.context),
+        }
+        return prompt
+
+    @staticmethod
+    def _rank_history(history: List[Dict[str, str]], terms: Set[str]) -> List[Tuple[int, Any]]:
+        indexed = list(enumerate(history))
+        last_exchange, older = indexed[-2:], indexed[:-2]
+        older.sort(key=lambda m: (-_relevance(m[1]["content"] or "", terms), -m[0]))
+        return list(reversed(last_exchange)) + older
+
+    def _fit(self, ranked: List[Tuple[int, Any]], budget: int, text) -> Tuple[List, int]:
+        """Take items in rank order until `budget` is spent; truncate the one that overflows."""
+        kept = []
+        used = 0
+        for position, item in ranked:
+            content = text(item) or ""
+            # +1 for the separator between items
+            tokens = self.llm.count_tokens(content) + 1
+            if used + tokens > budget:
+                left = budget - used
+                content = self._truncate(content, tokens, left) if left >= MIN_ITEM_TOKENS else ""
+                if content:
+                    kept.append((position, item, content))
+                    used += self.llm.count_tokens(content) + 1
+                break
+            kept.append((position, item, content))
+            used += tokens
+        return kept, used
+
+    def _truncate(self, content: str, tokens: int, budget: int) -> str:
+        # Cut proportionally, then trim until the tokenizer agrees
+        budget -= 1
+        chars = len(content) * budget // max(tokens, 1)
+        while chars > 0:
+            clipped = content[:chars].rstrip() + TRUNCATION_MARK
+            if self.llm.count_tokens(clipped) <= budget:
+                return clipped
+            chars = chars * 9 // 10
+        return ""
+
+
+def resource_line(row: Dict[str, Any]) -> str:
+    line = f"{row.get('type') or 'Resource'} {row.get('name') or 'N/A'} ({row.get('id')})"
+    details = compact_metadata(row.get("metadata"))
+    return f"{line}: {details}" if details else line
+
+
+def resource_source(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {"resource_id": row.get("id"), "name": row.get("name"), "resource_type": row.get("type")}
+
+
+def candidate_source(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "resource_id": row.get("resource_id"),
+        "name": row.get("name"),
+        "resource_type": row.get("resource_type"),
+    }
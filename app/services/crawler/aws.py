@@ -1,55 +1,871 @@
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
 from app.services.crawler.base import CloudCrawlerBase
+from app.services.crawler.recording import PageRecorder
 from app.models.graph import CloudResource
+from app.core.config import settings
+from app.core.constants import CloudProvider, Region, ResourceType
 from app.core.exceptions import CloudAPIError
 
 logger = logging.getLogger(__name__)
 
+# Region used for global services (IAM, S3 listing, CloudFront, Route 53)
+GLOBAL_REGION = "us-east-1"
+
+_DONE = object()
+
+
+class AWSCollector:
+    """How to list one AWS resource type.
+
+    `items`, `id`, `name` and the `metadata` values are JMESPath expressions
+    evaluated against each API page / item, so most services need no custom
+    code. Global services are crawled once instead of once per region, in
+    `region` if their API lives somewhere other than us-east-1. `arn` builds
+    a globally unique id for APIs that only return names. String `params`
+    may use `{account_id}`.
+    """
+
+    def __init__(
+        self,
+        resource_type: ResourceType.AWS,
+        service: str,
+        operation: str,
+        items: str,
+        id: str,
+        name: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+        is_global: bool = False,
+        params: Optional[Dict[str, Any]] = None,
+        arn: Optional[str] = None,
+        region: Optional[str] = None,
+    ):
+        self.resource_type = resource_type
+        self.service = service
+        self.operation = operation
+        self.items = items
+        self.id = id
+        self.name = name
+        self.metadata = metadata or {}
+        self.is_global = is_global
+        self.params = params or {}
+        self.arn = arn
+        self.region = region
+
+
+AWS_COLLECTORS: List[AWSCollector] = [
+    # Compute
+    AWSCollector(
+        ResourceType.AWS.EC2,
+        "ec2",
+        "describe_instances",
+        items="Reservations[].Instances[]",
+        id="InstanceId",
+        name="PrivateDnsName",
+        metadata={
+            "state": "State.Name",
+            "instance_type": "InstanceType",
+            "availability_zone": "Placement.AvailabilityZone",
+            "vpc_id": "VpcId",
+            "subnet_id": "SubnetId",
+        },
+    ),
+    AWSCollector(
+        ResourceType.AWS.AUTO_SCALING_GROUP,
+        "autoscaling",
+        "describe_auto_scaling_groups",
+        items="AutoScalingGroups[]",
+        id="AutoScalingGroupARN",
+        name="AutoScalingGroupName",
+        metadata={"desired_capacity": "DesiredCapacity", "max_size": "MaxSize"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.LAMBDA,
+        "lambda",
+        "list_functions",
+        items="Functions[]",
+        id="FunctionArn",
+        name="FunctionName",
+        metadata={"runtime": "Runtime", "memory_size": "MemorySize", "timeout": "Timeout"},
+    ),
+    AWSCollector(ResourceType.AWS.ECS, "ecs", "list_clusters", items="clusterArns[]", id="@"),
+    AWSCollector(
+        ResourceType.AWS.EKS,
+        "eks",
+        "list_clusters",
+        items="clusters[]",
+        id="@",
+        arn="arn:aws:eks:{region}:{account_id}:cluster/{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.APP_RUNNER,
+        "apprunner",
+        "list_services",
+        items="ServiceSummaryList[]",
+        id="ServiceArn",
+        name="ServiceName",
+        metadata={"state": "Status"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.BATCH,
+        "batch",
+        "describe_compute_environments",
+        items="computeEnvironments[]",
+        id="computeEnvironmentArn",
+        name="computeEnvironmentName",
+        metadata={"state": "state", "status": "status", "type": "type"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.LIGHTSAIL,
+        "lightsail",
+        "get_instances",
+        items="instances[]",
+        id="arn",
+        name="name",
+        metadata={"state": "state.name", "blueprint": "blueprintId", "bundle": "bundleId"},
+    ),
+    # Networking
+    AWSCollector(
+        ResourceType.AWS.VPC,
+        "ec2",
+        "describe_vpcs",
+        items="Vpcs[]",
+        id="VpcId",
+        name="Tags[?Key=='Name'].Value | [0]",
+        metadata={"cidr_block": "CidrBlock", "is_default": "IsDefault", "state": "State"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.SUBNET,
+        "ec2",
+        "describe_subnets",
+        items="Subnets[]",
+        id="SubnetId",
+        name="Tags[?Key=='Name'].Value | [0]",
+        metadata={
+            "vpc_id": "VpcId",
+            "cidr_block": "CidrBlock",
+            "availability_zone": "AvailabilityZone",
+            "map_public_ip_on_launch": "MapPublicIpOnLaunch",
+        },
+    ),
+    AWSCollector(
+        ResourceType.AWS.ROUTE_TABLE,
+        "ec2",
+        "describe_route_tables",
+        items="RouteTables[]",
+        id="RouteTableId",
+        name="Tags[?Key=='Name'].Value | [0]",
+        metadata={"vpc_id": "VpcId"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.INTERNET_GATEWAY,
+        "ec2",
+        "describe_internet_gateways",
+        items="InternetGateways[]",
+        id="InternetGatewayId",
+        name="Tags[?Key=='Name'].Value | [0]",
+        metadata={"vpc_ids": "Attachments[].VpcId"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.NAT_GATEWAY,
+        "ec2",
+        "describe_nat_gateways",
+        items="NatGateways[]",
+        id="NatGatewayId",
+        name="Tags[?Key=='Name'].Value | [0]",
+        metadata={"state": "State", "vpc_id": "VpcId", "subnet_id": "SubnetId"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.SECURITY_GROUP,
+        "ec2",
+        "describe_security_groups",
+        items="SecurityGroups[]",
+        id="GroupId",
+        name="GroupName",
+        metadata={"vpc_id": "VpcId", "description": "Description"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.APPLICATION_LOAD_BALANCER,
+        "elbv2",
+        "describe_load_balancers",
+        items="LoadBalancers[?Type=='application']",
+        id="LoadBalancerArn",
+        name="LoadBalancerName",
+        metadata={"scheme": "Scheme", "state": "State.Code", "vpc_id": "VpcId"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.NETWORK_LOAD_BALANCER,
+        "elbv2",
+        "describe_load_balancers",
+        items="LoadBalancers[?Type=='network']",
+        id="LoadBalancerArn",
+        name="LoadBalancerName",
+        metadata={"scheme": "Scheme", "state": "State.Code", "vpc_id": "VpcId"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.CLOUDFRONT,
+        "cloudfront",
+        "list_distributions",
+        items="DistributionList.Items[]",
+        id="ARN",
+        name="DomainName",
+        metadata={"status": "Status", "enabled": "Enabled"},
+        is_global=True,
+    ),
+    AWSCollector(
+        ResourceType.AWS.ROUTE53,
+        "route53",
+        "list_hosted_zones",
+        items="HostedZones[]",
+        id="Id",
+        name="Name",
+        metadata={"private_zone": "Config.PrivateZone"},
+        is_global=True,
+    ),
+    AWSCollector(
+        ResourceType.AWS.API_GATEWAY,
+        "apigateway",
+        "get_rest_apis",
+        items="items[]",
+        id="id",
+        name="name",
+        arn="arn:aws:apigateway:{region}::/restapis/{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.TRANSIT_GATEWAY,
+        "ec2",
+        "describe_transit_gateways",
+        items="TransitGateways[]",
+        id="TransitGatewayId",
+        name="Tags[?Key=='Name'].Value | [0]",
+        metadata={"state": "State", "owner_id": "OwnerId"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.VPC_PEERING,
+        "ec2",
+        "describe_vpc_peering_connections",
+        items="VpcPeeringConnections[]",
+        id="VpcPeeringConnectionId",
+        name="Tags[?Key=='Name'].Value | [0]",
+        metadata={
+            "state": "Status.Code",
+            "requester_vpc_id": "RequesterVpcInfo.VpcId",
+            "accepter_vpc_id": "AccepterVpcInfo.VpcId",
+        },
+    ),
+    AWSCollector(
+        ResourceType.AWS.NETWORK_ACL,
+        "ec2",
+        "describe_network_acls",
+        items="NetworkAcls[]",
+        id="NetworkAclId",
+        name="Tags[?Key=='Name'].Value | [0]",
+        metadata={"vpc_id": "VpcId", "is_default": "IsDefault"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.GATEWAY_LOAD_BALANCER,
+        "elbv2",
+        "describe_load_balancers",
+        items="LoadBalancers[?Type=='gateway']",
+        id="LoadBalancerArn",
+        name="LoadBalancerName",
+        metadata={"state": "State.Code", "vpc_id": "VpcId"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.GLOBAL_ACCELERATOR,
+        "globalaccelerator",
+        "list_accelerators",
+        items="Accelerators[]",
+        id="AcceleratorArn",
+        name="Name",
+        metadata={"state": "Status", "enabled": "Enabled"},
+        is_global=True,
+        region="us-west-2",
+    ),
+    # Storage
+    AWSCollector(
+        ResourceType.AWS.S3,
+        "s3",
+        "list_buckets",
+        items="Buckets[]",
+        id="Name",
+        name="Name",
+        is_global=True,
+    ),
+    AWSCollector(
+        ResourceType.AWS.EBS,
+        "ec2",
+        "describe_volumes",
+        items="Volumes[]",
+        id="VolumeId",
+        name="Tags[?Key=='Name'].Value | [0]",
+        metadata={
+            "state": "State",
+            "size_gb": "Size",
+            "volume_type": "VolumeType",
+            "availability_zone": "AvailabilityZone",
+            "attached_to": "Attachments[].InstanceId",
+        },
+    ),
+    AWSCollector(
+        ResourceType.AWS.EFS,
+        "efs",
+        "describe_file_systems",
+        items="FileSystems[]",
+        id="FileSystemArn",
+        name="Name",
+        metadata={"state": "LifeCycleState", "performance_mode": "PerformanceMode"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.FSX,
+        "fsx",
+        "describe_file_systems",
+        items="FileSystems[]",
+        id="ResourceARN",
+        name="FileSystemId",
+        metadata={
+            "state": "Lifecycle",
+            "file_system_type": "FileSystemType",
+            "storage_capacity_gb": "StorageCapacity",
+        },
+    ),
+    AWSCollector(
+        ResourceType.AWS.BACKUP,
+        "backup",
+        "list_backup_vaults",
+        items="BackupVaultList[]",
+        id="BackupVaultArn",
+        name="BackupVaultName",
+        metadata={"recovery_points": "NumberOfRecoveryPoints"},
+    ),
+    # Databases
+    AWSCollector(
+        ResourceType.AWS.RDS,
+        "rds",
+        "describe_db_instances",
+        items="DBInstances[]",
+        id="DBInstanceArn",
+        name="DBInstanceIdentifier",
+        metadata={
+            "state": "DBInstanceStatus",
+            "engine": "Engine",
+            "instance_class": "DBInstanceClass",
+            "multi_az": "MultiAZ",
+            "publicly_accessible": "PubliclyAccessible",
+        },
+    ),
+    AWSCollector(
+        ResourceType.AWS.AURORA,
+        "rds",
+        "describe_db_clusters",
+        # describe_db_clusters also returns DocumentDB and Neptune clusters
+        items="DBClusters[?starts_with(Engine, 'aurora')]",
+        id="DBClusterArn",
+        name="DBClusterIdentifier",
+        metadata={"state": "Status", "engine": "Engine"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.DYNAMODB,
+        "dynamodb",
+        "list_tables",
+        items="TableNames[]",
+        id="@",
+        arn="arn:aws:dynamodb:{region}:{account_id}:table/{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.ELASTICACHE,
+        "elasticache",
+        "describe_cache_clusters",
+        items="CacheClusters[]",
+        id="ARN",
+        name="CacheClusterId",
+        metadata={"state": "CacheClusterStatus", "engine": "Engine", "node_type": "CacheNodeType"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.REDSHIFT,
+        "redshift",
+        "describe_clusters",
+        items="Clusters[]",
+        id="ClusterIdentifier",
+        name="ClusterIdentifier",
+        metadata={"state": "ClusterStatus", "node_type": "NodeType"},
+        arn="arn:aws:redshift:{region}:{account_id}:cluster:{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.OPENSEARCH,
+        "opensearch",
+        "list_domain_names",
+        items="DomainNames[]",
+        id="DomainName",
+        metadata={"engine_type": "EngineType"},
+        arn="arn:aws:es:{region}:{account_id}:domain/{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.DOCUMENTDB,
+        "docdb",
+        "describe_db_clusters",
+        items="DBClusters[]",
+        id="DBClusterArn",
+        name="DBClusterIdentifier",
+        metadata={"state": "Status", "engine_version": "EngineVersion"},
+        params={"Filters": [{"Name": "engine", "Values": ["docdb"]}]},
+    ),
+    AWSCollector(
+        ResourceType.AWS.NEPTUNE,
+        "neptune",
+        "describe_db_clusters",
+        items="DBClusters[]",
+        id="DBClusterArn",
+        name="DBClusterIdentifier",
+        metadata={"state": "Status", "engine_version": "EngineVersion"},
+        params={"Filters": [{"Name": "engine", "Values": ["neptune"]}]},
+    ),
+    # Messaging & Streaming
+    AWSCollector(ResourceType.AWS.SQS, "sqs", "list_queues", items="QueueUrls[]", id="@"),
+    AWSCollector(ResourceType.AWS.SNS, "sns", "list_topics", items="Topics[]", id="TopicArn"),
+    AWSCollector(
+        ResourceType.AWS.KINESIS,
+        "kinesis",
+        "list_streams",
+        items="StreamNames[]",
+        id="@",
+        arn="arn:aws:kinesis:{region}:{account_id}:stream/{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.EVENTBRIDGE,
+        "events",
+        "list_event_buses",
+        items="EventBuses[]",
+        id="Arn",
+        name="Name",
+    ),
+    AWSCollector(
+        ResourceType.AWS.MSK,
+        "kafka",
+        "list_clusters_v2",
+        items="ClusterInfoList[]",
+        id="ClusterArn",
+        name="ClusterName",
+        metadata={"state": "State", "cluster_type": "ClusterType"},
+    ),
+    # Identity & Security
+    AWSCollector(
+        ResourceType.AWS.IAM_ROLE,
+        "iam",
+        "list_roles",
+        items="Roles[]",
+        id="Arn",
+        name="RoleName",
+        is_global=True,
+    ),
+    AWSCollector(
+        ResourceType.AWS.IAM_USER,
+        "iam",
+        "list_users",
+        items="Users[]",
+        id="Arn",
+        name="UserName",
+        is_global=True,
+    ),
+    AWSCollector(
+        ResourceType.AWS.IAM_GROUP,
+        "iam",
+        "list_groups",
+        items="Groups[]",
+        id="Arn",
+        name="GroupName",
+        is_global=True,
+    ),
+    AWSCollector(
+        ResourceType.AWS.IAM_POLICY,
+        "iam",
+        "list_policies",
+        items="Policies[]",
+        id="Arn",
+        name="PolicyName",
+        metadata={"attachment_count": "AttachmentCount"},
+        is_global=True,
+        params={"Scope": "Local"},
+    ),
+    AWSCollector(ResourceType.AWS.KMS_KEY, "kms", "list_keys", items="Keys[]", id="KeyArn"),
+    AWSCollector(
+        ResourceType.AWS.SECRETS_MANAGER,
+        "secretsmanager",
+        "list_secrets",
+        items="SecretList[]",
+        id="ARN",
+        name="Name",
+        metadata={"rotation_enabled": "RotationEnabled"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.CERTIFICATE_MANAGER,
+        "acm",
+        "list_certificates",
+        items="CertificateSummaryList[]",
+        id="CertificateArn",
+        name="DomainName",
+        metadata={"state": "Status", "in_use": "InUse"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.WAF,
+        "wafv2",
+        "list_web_acls",
+        items="WebACLs[]",
+        id="ARN",
+        name="Name",
+        params={"Scope": "REGIONAL"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.SHIELD,
+        "shield",
+        "list_protections",
+        items="Protections[]",
+        id="ProtectionArn",
+        name="Name",
+        metadata={"resource_arn": "ResourceArn"},
+        is_global=True,
+    ),
+    AWSCollector(
+        ResourceType.AWS.COGNITO,
+        "cognito-idp",
+        "list_user_pools",
+        items="UserPools[]",
+        id="Id",
+        name="Name",
+        metadata={"state": "Status"},
+        params={"MaxResults": 60},
+        arn="arn:aws:cognito-idp:{region}:{account_id}:userpool/{id}",
+    ),
+    # Observability
+    AWSCollector(
+        ResourceType.AWS.CLOUDTRAIL,
+        "cloudtrail",
+        "list_trails",
+        items="Trails[]",
+        id="TrailARN",
+        name="Name",
+        metadata={"home_region": "HomeRegion"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.CLOUDWATCH,
+        "cloudwatch",
+        "describe_alarms",
+        items="MetricAlarms[]",
+        id="AlarmArn",
+        name="AlarmName",
+        metadata={"state": "StateValue", "metric": "MetricName", "namespace": "Namespace"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.XRAY,
+        "xray",
+        "get_groups",
+        items="Groups[]",
+        id="GroupARN",
+        name="GroupName",
+    ),
+    # Data & Analytics
+    AWSCollector(
+        ResourceType.AWS.ATHENA,
+        "athena",
+        "list_work_groups",
+        items="WorkGroups[]",
+        id="Name",
+        metadata={"state": "State"},
+        arn="arn:aws:athena:{region}:{account_id}:workgroup/{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.GLUE,
+        "glue",
+        "get_databases",
+        items="DatabaseList[]",
+        id="Name",
+        arn="arn:aws:glue:{region}:{account_id}:database/{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.EMR,
+        "emr",
+        "list_clusters",
+        items="Clusters[]",
+        id="ClusterArn",
+        name="Name",
+        metadata={"state": "Status.State"},
+        params={"ClusterStates": ["STARTING", "BOOTSTRAPPING", "RUNNING", "WAITING"]},
+    ),
+    AWSCollector(
+        ResourceType.AWS.QUICKSIGHT,
+        "quicksight",
+        "list_dashboards",
+        items="DashboardSummaryList[]",
+        id="Arn",
+        name="Name",
+        params={"AwsAccountId": "{account_id}"},
+    ),
+    # DevOps
+    AWSCollector(
+        ResourceType.AWS.CLOUDFORMATION,
+        "cloudformation",
+        "describe_stacks",
+        items="Stacks[]",
+        id="StackId",
+        name="StackName",
+        metadata={"state": "StackStatus"},
+    ),
+    AWSCollector(
+        ResourceType.AWS.CODEBUILD,
+        "codebuild",
+        "list_projects",
+        items="projects[]",
+        id="@",
+        arn="arn:aws:codebuild:{region}:{account_id}:project/{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.CODEPIPELINE,
+        "codepipeline",
+        "list_pipelines",
+        items="pipelines[]",
+        id="name",
+        metadata={"pipeline_type": "pipelineType"},
+        arn="arn:aws:codepipeline:{region}:{account_id}:{id}",
+    ),
+    AWSCollector(
+        ResourceType.AWS.CODEDEPLOY,
+        "codedeploy",
+        "list_applications",
+        items="applications[]",
+        id="@",
+        arn="arn:aws:codedeploy:{region}:{account_id}:application:{id}",
+    ),
+]
+
+# Fargate is a launch type rather than a resource: Fargate workloads are
+# ECS services and tasks, which are crawled with their cluster.
+
+AWS_COLLECTORS_BY_TYPE = {c.resource_type.value: c for c in AWS_COLLECTORS}
+
 
 class AWSCrawler(CloudCrawlerBase):
-    def __init__(self, neo4j_service):
-        super().__init__(neo4j_service)
-        self.provider = "aws"
+    def __init__(self, neo4j_service, **kwargs):
+        super().__init__(neo4j_service, **kwargs)
+        self.provider = CloudProvider.AWS.value
 
     async def crawl_resources(
         self, org_id: str, account_id: str, credentials: dict
     ) -> list[CloudResource]:
+        return [r async for r in self.iter_resources(org_id, account_id, credentials)]
+
+    async def iter_resources(
+        self,
+        org_id: str,
+        account_id: str,
+        credentials: dict,
+        failed_scopes: Optional[Set[str]] = None,
+        regions: Optional[Iterable[str]] = None,
+        resource_types: Optional[Iterable[ResourceType.AWS]] = None,
+        recorder: Optional[PageRecorder] = None,
+    ) -> AsyncIterator[CloudResource]:
+        """Crawl every (region, service) pair concurrently.
+
+        boto3 is blocking, so each pair is paginated on a bounded thread pool
+        (`AWS_CRAWLER_MAX_WORKERS`). Pages are handed back through a bounded
+        queue and yielded as they arrive, which lets ingest start before the
+        crawl finishes and pauses the workers if ingest falls behind. With a
+        `recorder`, the raw pages are recorded for offline replay as well.
+        """
+        regions = list(regions or credentials.get("regions") or [r.code for r in Region.AWS])
+        jobs = self._jobs(resource_types, regions)
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.CRAWLER_QUEUE_SIZE)
+        stop = threading.Event()
+        errors: List[str] = []
+        executor = ThreadPoolExecutor(
+            max_workers=settings.AWS_CRAWLER_MAX_WORKERS, thread_name_prefix="aws-crawler"
+        )
+
+        def emit(batch: List[CloudResource]) -> None:
+            _put_threadsafe(queue, loop, stop, batch)
+
+        async def run_job(collector: AWSCollector, region: str) -> None:
+            try:
+                await loop.run_in_executor(
+                    executor,
+                    self._collect,
+                    org_id,
+                    account_id,
+                    credentials,
+                    collector,
+                    region,
+                    emit,
+                    stop,
+                    recorder,
+                )
+            except Exception as e:
+                # A service can be unavailable or disabled in a region; keep going.
+                logger.warning(
+                    f"AWS crawl of {collector.service}.{collector.operation} in {region} failed: {str(e)}"
+                )
+                errors.append(f"{collector.resource_type.value}/{region}: {str(e)}")
+                if failed_scopes is not None:
+                    failed_scopes.add(collector.resource_type.value)
+                if recorder:
+                    recorder.failed(collector.resource_type.value)
+
+        async def produce() -> None:
+            try:
+                await asyncio.gather(*(run_job(c, r) for c, r in jobs))
+            finally:
+                await queue.put(_DONE)
+
+        producer = asyncio.create_task(produce())
         try:
-            import boto3
-
-            access_key = credentials.get("access_key")
-            secret_key = credentials.get("secret_key")
-            region = credentials.get("region", "us-east-1")
-
-            ec2 = boto3.client(
-                "ec2",
-                region_name=region,
-                aws_access_key_id=access_key,
-                aws_secret_access_key=secret_key,
-            )
-
-            resources = []
-            instances = ec2.describe_instances()
-
-            for reservation in instances.get("Reservations", []):
-                for instance in reservation.get("Instances", []):
-                    resource = CloudResource(
-                        id=instance["InstanceId"],
-                        org_id=org_id,
-                        name=instance.get("PrivateDnsName", instance["InstanceId"]),
-                        resource_type="ec2",
-                        provider="aws",
-                        account_id=account_id,
-                        metadata={
-                            "state": instance["State"]["Name"],
-                            "instance_type": instance["InstanceType"],
-                            "availability_zone": instance["Placement"]["AvailabilityZone"],
-                        },
-                    )
-                    resources.append(resource)
-
-            return resources
-        except Exception as e:
-            logger.error(f"AWS crawl error: {str(e)}")
-            raise CloudAPIError("AWS", str(e))
+            async with aclosing(_drain(queue)) as resources:
+                async for resource in resources:
+                    yield resource
+        finally:
+            stop.set()
+            if not producer.done():
+                producer.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if jobs and len(errors) == len(jobs):
+            logger.error(f"AWS crawl error: {errors[0]}")
+            raise CloudAPIError("AWS", errors[0], {"errors": errors[:20]})
+
+    @staticmethod
+    def _jobs(
+        resource_types: Optional[Iterable[ResourceType.AWS]], regions: List[str]
+    ) -> List[Tuple[AWSCollector, str]]:
+        """(collector, region) pairs to crawl; global services run once."""
+        wanted = set(resource_types) if resource_types else None
+        jobs = []
+        for collector in AWS_COLLECTORS:
+            if wanted is not None and collector.resource_type not in wanted:
+                continue
+            if collector.is_global:
+                jobs.append((collector, collector.region or GLOBAL_REGION))
+            else:
+                jobs.extend((collector, region) for region in regions)
+        return jobs
+
+    def _collect(
+        self,
+        org_id: str,
+        account_id: str,
+        credentials: dict,
+        collector: AWSCollector,
+        region: str,
+        emit: Callable[[List[CloudResource]], None],
+        stop: threading.Event,
+        recorder: Optional[PageRecorder] = None,
+    ) -> None:
+        """Paginate one (service, region) pair; runs on a worker thread."""
+        import boto3
+        import jmespath
+        from botocore.config import Config
+
+        # boto3 sessions are not thread-safe, so each job gets its own
+        session = boto3.session.Session(
+            aws_access_key_id=credentials.get("access_key"),
+            aws_secret_access_key=credentials.get("secret_key"),
+            aws_session_token=credentials.get("session_token"),
+            region_name=region,
+        )
+        client = session.client(
+            collector.service,
+            config=Config(retries={"mode": "adaptive", "max_attempts": 5}),
+        )
+
+        params = {
+            key: value.format(account_id=account_id) if isinstance(value, str) else value
+            for key, value in collector.params.items()
+        }
+        if client.can_paginate(collector.operation):
+            pages = client.get_paginator(collector.operation).paginate(**params)
+        else:
+            pages = [getattr(client, collector.operation)(**params)]
+
+        for page in pages:
+            if stop.is_set():
+                return
+            if recorder:
+                page = {k: v for k, v in page.items() if k != "ResponseMetadata"}
+                recorder.page(collector.resource_type.value, region, page)
+            items = jmespath.search(collector.items, page) or []
+            batch = [
+                self._to_resource(org_id, account_id, region, collector, item) for item in items
+            ]
+            if batch:
+                emit(batch)
+
+    def resources_from_page(
+        self, org_id: str, account_id: str, record: Dict[str, Any]
+    ) -> List[CloudResource]:
+        import jmespath
+
+        collector = AWS_COLLECTORS_BY_TYPE[record["type"]]
+        items = jmespath.search(collector.items, record["page"]) or []
+        return [
+            self._to_resource(org_id, account_id, record["scope"], collector, item)
+            for item in items
+        ]
+
+    def _to_resource(
+        self,
+        org_id: str,
+        account_id: str,
+        region: str,
+        collector: AWSCollector,
+        item: Any,
+    ) -> CloudResource:
+        import jmespath
+
+        resource_id = jmespath.search(collector.id, item)
+        name = jmespath.search(collector.name, item) if collector.name else None
+        if collector.arn:
+            name = name or resource_id
+            resource_id = collector.arn.format(region=region, account_id=account_id, id=resource_id)
+        metadata = {key: jmespath.search(expr, item) for key, expr in collector.metadata.items()}
+        metadata["region"] = None if collector.is_global else region
+
+        return CloudResource(
+            id=resource_id,
+            org_id=org_id,
+            name=name or str(resource_id),
+            resource_type=collector.resource_type.value,
+            provider=self.provider,
+            account_id=account_id,
+            metadata=metadata,
+        )
+
+
+def _put_threadsafe(
+    queue: asyncio.Queue,
+    loop: asyncio.AbstractEventLoop,
+    stop: threading.Event,
+    batch: List[CloudResource],
+) -> None:
+    # Blocks the worker thread while the queue is full (backpressure),
+    # but gives up once the consumer has gone away.
+    future = asyncio.run_coroutine_threadsafe(queue.put(batch), loop)
+    while True:
+        try:
+            future.result(timeout=0.5)
+            return
+        except FutureTimeoutError:
+            if stop.is_set():
+                future.cancel()
+                return
+
+
+async def _drain(queue: asyncio.Queue) -> AsyncIterator[CloudResource]:
+    """Yield resources from queued batches until the producer signals it is done."""
+    while True:
+        batch = await queue.get()
+        if batch is _DONE:
+            return
+        for resource in batch:
+            yield resource
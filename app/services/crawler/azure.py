@@ -1,54 +1,399 @@
+import asyncio
+import importlib
 import logging
-from typing import Optional, Dict, Any
+from contextlib import AsyncExitStack
+from enum import Enum
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
 from app.services.crawler.base import CloudCrawlerBase
+from app.services.crawler.recording import PageRecorder
 from app.models.graph import CloudResource
+from app.core.config import settings
 from app.core.exceptions import CloudAPIError
+from app.core.constants import CloudProvider, ResourceType
 
 logger = logging.getLogger(__name__)
 
+# Async management client per resource family: (module, class)
+AZURE_CLIENTS = {
+    "compute": ("azure.mgmt.compute.aio", "ComputeManagementClient"),
+    "network": ("azure.mgmt.network.aio", "NetworkManagementClient"),
+    "storage": ("azure.mgmt.storage.aio", "StorageManagementClient"),
+    "sql": ("azure.mgmt.sql.aio", "SqlManagementClient"),
+    "cosmosdb": ("azure.mgmt.cosmosdb.aio", "CosmosDBManagementClient"),
+}
+
+_DONE = object()
+
+
+class AzureCollector:
+    """How to list one Azure resource type.
+
+    `operation` is the dotted path of a list method on the `client` family's
+    management client and `metadata` maps keys to dotted attribute paths on
+    each item. With `children`, each listed item is a parent and the child
+    list method is called with its resource group and name (e.g. databases
+    per SQL server); only the children are collected.
+    """
+
+    def __init__(
+        self,
+        resource_type: ResourceType.AZURE,
+        client: str,
+        operation: str,
+        metadata: Optional[Dict[str, str]] = None,
+        children: Optional[str] = None,
+        skip_names: Iterable[str] = (),
+    ):
+        self.resource_type = resource_type
+        self.client = client
+        self.operation = operation
+        self.metadata = metadata or {}
+        self.children = children
+        self.skip_names = set(skip_names)
+
+
+AZURE_COLLECTORS: List[AzureCollector] = [
+    # Compute
+    AzureCollector(
+        ResourceType.AZURE.VIRTUAL_MACHINE,
+        "compute",
+        "virtual_machines.list_all",
+        metadata={
+            "vm_size": "hardware_profile.vm_size",
+            "os_type": "storage_profile.os_disk.os_type",
+            "provisioning_state": "provisioning_state",
+            "zones": "zones",
+        },
+    ),
+    AzureCollector(
+        ResourceType.AZURE.VM_SCALE_SET,
+        "compute",
+        "virtual_machine_scale_sets.list_all",
+        metadata={"sku": "sku.name", "capacity": "sku.capacity"},
+    ),
+    AzureCollector(
+        ResourceType.AZURE.MANAGED_DISK,
+        "compute",
+        "disks.list",
+        metadata={
+            "state": "disk_state",
+            "size_gb": "disk_size_gb",
+            "sku": "sku.name",
+            "attached_to": "managed_by",
+        },
+    ),
+    # Networking
+    AzureCollector(
+        ResourceType.AZURE.VIRTUAL_NETWORK,
+        "network",
+        "virtual_networks.list_all",
+        metadata={"address_prefixes": "address_space.address_prefixes"},
+    ),
+    AzureCollector(
+        ResourceType.AZURE.SUBNET,
+        "network",
+        "virtual_networks.list_all",
+        children="subnets.list",
+        metadata={
+            "address_prefix": "address_prefix",
+            "network_security_group": "network_security_group.id",
+        },
+    ),
+    AzureCollector(
+        ResourceType.AZURE.NETWORK_SECURITY_GROUP,
+        "network",
+        "network_security_groups.list_all",
+        metadata={"provisioning_state": "provisioning_state"},
+    ),
+    AzureCollector(
+        ResourceType.AZURE.LOAD_BALANCER,
+        "network",
+        "load_balancers.list_all",
+        metadata={"sku": "sku.name"},
+    ),
+    AzureCollector(
+        ResourceType.AZURE.APPLICATION_GATEWAY,
+        "network",
+        "application_gateways.list_all",
+        metadata={"state": "operational_state", "sku": "sku.tier"},
+    ),
+    AzureCollector(
+        ResourceType.AZURE.PRIVATE_ENDPOINT,
+        "network",
+        "private_endpoints.list_by_subscription",
+        metadata={"subnet": "subnet.id"},
+    ),
+    # Storage
+    AzureCollector(
+        ResourceType.AZURE.BLOB_STORAGE,
+        "storage",
+        "storage_accounts.list",
+        metadata={
+            "kind": "kind",
+            "sku": "sku.name",
+            "access_tier": "access_tier",
+            "allow_blob_public_access": "allow_blob_public_access",
+        },
+    ),
+    # Databases
+    AzureCollector(
+        ResourceType.AZURE.SQL_DATABASE,
+        "sql",
+        "servers.list",
+        children="databases.list_by_server",
+        skip_names=("master",),
+        metadata={"state": "status", "sku": "sku.name", "max_size_bytes": "max_size_bytes"},
+    ),
+    AzureCollector(
+        ResourceType.AZURE.SQL_MANAGED_INSTANCE,
+        "sql",
+        "managed_instances.list",
+        metadata={"state": "state", "sku": "sku.name"},
+    ),
+    AzureCollector(
+        ResourceType.AZURE.COSMOS_DB,
+        "cosmosdb",
+        "database_accounts.list",
+        metadata={"kind": "kind", "endpoint": "document_endpoint"},
+    ),
+]
+
+AZURE_COLLECTORS_BY_TYPE = {c.resource_type.value: c for c in AZURE_COLLECTORS}
+
+
+class _Model(SimpleNamespace):
+    """Attribute access over a recorded `as_dict()` model; unset attributes are None."""
+
+    def __getattr__(self, name: str) -> Any:
+        return None
+
+    @classmethod
+    def of(cls, value: Any) -> Any:
+        if isinstance(value, dict):
+            return cls(**{key: cls.of(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return [cls.of(item) for item in value]
+        return value
+
+
+def _attr(item: Any, path: str) -> Any:
+    for name in path.split("."):
+        if item is None:
+            return None
+        item = getattr(item, name, None)
+    return item.value if isinstance(item, Enum) else item
+
+
+def resource_group(resource_id: str) -> Optional[str]:
+    """Resource group name from an ARM id (`/subscriptions/.../resourceGroups/<rg>/...`)."""
+    parts = resource_id.split("/")
+    lowered = [part.lower() for part in parts]
+    if "resourcegroups" in lowered:
+        index = lowered.index("resourcegroups") + 1
+        return parts[index] if index < len(parts) else None
+    return None
+
 
 class AzureCrawler(CloudCrawlerBase):
-    def __init__(self, neo4j_service):
-        super().__init__(neo4j_service)
-        self.provider = "azure"
+    def __init__(self, neo4j_service, **kwargs):
+        super().__init__(neo4j_service, **kwargs)
+        self.provider = CloudProvider.AZURE.value
 
     async def crawl_resources(
         self, org_id: str, account_id: str, credentials: dict
     ) -> list[CloudResource]:
-        try:
-            from azure.identity import ClientSecretCredential
-            from azure.mgmt.compute import ComputeManagementClient
-
-            client_id = credentials.get("client_id")
-            client_secret = credentials.get("client_secret")
-            tenant_id = credentials.get("tenant_id")
-            subscription_id = credentials.get("subscription_id")
-
-            credential = ClientSecretCredential(
-                client_id=client_id,
-                client_secret=client_secret,
-                tenant_id=tenant_id,
+        return [r async for r in self.iter_resources(org_id, account_id, credentials)]
+
+    async def iter_resources(
+        self,
+        org_id: str,
+        account_id: str,
+        credentials: dict,
+        failed_scopes: Optional[Set[str]] = None,
+        resource_types: Optional[Iterable[ResourceType.AZURE]] = None,
+        recorder: Optional[PageRecorder] = None,
+    ) -> AsyncIterator[CloudResource]:
+        """Yield Azure resources page by page.
+
+        Collectors run on the async management clients (`azure.mgmt.*.aio`),
+        at most `AZURE_CRAWLER_MAX_CONCURRENCY` at a time, and page through
+        their list operations lazily. Pages are handed back through a bounded
+        queue and yielded as they arrive, so ingest starts before the crawl
+        finishes and paging pauses if ingest falls behind. Nothing here
+        blocks the event loop. With a `recorder`, the raw pages are recorded
+        for offline replay as well.
+        """
+        subscription_id = credentials.get("subscription_id") or account_id
+        wanted = set(resource_types) if resource_types else None
+        collectors = [c for c in AZURE_COLLECTORS if wanted is None or c.resource_type in wanted]
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.CRAWLER_QUEUE_SIZE)
+        semaphore = asyncio.Semaphore(settings.AZURE_CRAWLER_MAX_CONCURRENCY)
+        errors: List[str] = []
+
+        async with AsyncExitStack() as stack:
+            try:
+                credential = await stack.enter_async_context(self._credential(credentials))
+                clients = {}
+                for family in sorted({c.client for c in collectors}):
+                    module, name = AZURE_CLIENTS[family]
+                    client_class = getattr(importlib.import_module(module), name)
+                    clients[family] = await stack.enter_async_context(
+                        client_class(credential, subscription_id)
+                    )
+            except Exception as e:
+                logger.error(f"Azure crawl error: {str(e)}")
+                raise CloudAPIError("Azure", str(e))
+
+            async def run(collector: AzureCollector) -> None:
+                try:
+                    async with semaphore:
+                        await self._collect(
+                            clients[collector.client],
+                            collector,
+                            org_id,
+                            account_id,
+                            queue.put,
+                            recorder,
+                        )
+                except Exception as e:
+                    # A provider may not be registered on the subscription; keep going.
+                    logger.warning(f"Azure crawl of {collector.operation} failed: {str(e)}")
+                    errors.append(f"{collector.resource_type.value}: {str(e)}")
+                    if failed_scopes is not None:
+                        failed_scopes.add(collector.resource_type.value)
+                    if recorder:
+                        recorder.failed(collector.resource_type.value)
+
+            async def produce() -> None:
+                await asyncio.gather(*(run(c) for c in collectors))
+                await queue.put(_DONE)
+
+            producer = asyncio.create_task(produce())
+            try:
+                while True:
+                    batch = await queue.get()
+                    if batch is _DONE:
+                        break
+                    for resource in batch:
+                        yield resource
+            finally:
+                if not producer.done():
+                    producer.cancel()
+                    await asyncio.gather(producer, return_exceptions=True)
+
+        if collectors and len(errors) == len(collectors):
+            logger.error(f"Azure crawl error: {errors[0]}")
+            raise CloudAPIError("Azure", errors[0], {"errors": errors[:20]})
+
+    @staticmethod
+    def _credential(credentials: dict):
+        from azure.identity.aio import ClientSecretCredential, DefaultAzureCredential
+
+        if credentials.get("client_secret"):
+            return ClientSecretCredential(
+                tenant_id=credentials.get("tenant_id"),
+                client_id=credentials.get("client_id"),
+                client_secret=credentials.get("client_secret"),
             )
+        # Scheduled crawls: environment, workload or managed identity
+        return DefaultAzureCredential()
+
+    async def _collect(
+        self,
+        client: Any,
+        collector: AzureCollector,
+        org_id: str,
+        account_id: str,
+        emit: Callable[[List[CloudResource]], Awaitable[None]],
+        recorder: Optional[PageRecorder] = None,
+    ) -> None:
+        async for parents in _pages(_attr(client, collector.operation)()):
+            if not collector.children:
+                await self._emit(parents, collector, org_id, account_id, emit, recorder)
+                continue
+
+            list_children = _attr(client, collector.children)
+            for parent in parents:
+                pager = list_children(resource_group(parent.id), parent.name)
+                async for items in _pages(pager):
+                    await self._emit(items, collector, org_id, account_id, emit, recorder, parent)
+
+    async def _emit(
+        self,
+        items: List[Any],
+        collector: AzureCollector,
+        org_id: str,
+        account_id: str,
+        emit: Callable[[List[CloudResource]], Awaitable[None]],
+        recorder: Optional[PageRecorder] = None,
+        parent: Any = None,
+    ) -> None:
+        if recorder:
+            recorder.page(
+                collector.resource_type.value,
+                None,
+                [item.as_dict() for item in items],
+                parent=(
+                    {"id": parent.id, "name": parent.name, "location": parent.location}
+                    if parent is not None
+                    else None
+                ),
+            )
+        batch = self._convert(items, collector, org_id, account_id, parent)
+        if batch:
+            await emit(batch)
+
+    def resources_from_page(
+        self, org_id: str, account_id: str, record: Dict[str, Any]
+    ) -> List[CloudResource]:
+        collector = AZURE_COLLECTORS_BY_TYPE[record["type"]]
+        parent = _Model.of(record["parent"]) if record.get("parent") else None
+        items = [_Model.of(item) for item in record["page"]]
+        return self._convert(items, collector, org_id, account_id, parent)
+
+    def _convert(
+        self,
+        items: List[Any],
+        collector: AzureCollector,
+        org_id: str,
+        account_id: str,
+        parent: Any = None,
+    ) -> List[CloudResource]:
+        return [
+            self._to_resource(org_id, account_id, collector, item, parent)
+            for item in items
+            if item.name not in collector.skip_names
+        ]
+
+    def _to_resource(
+        self,
+        org_id: str,
+        account_id: str,
+        collector: AzureCollector,
+        item: Any,
+        parent: Any = None,
+    ) -> CloudResource:
+        metadata = {key: _attr(item, path) for key, path in collector.metadata.items()}
+        # Child resources (subnets, databases) may not carry a location of their own
+        metadata["region"] = getattr(item, "location", None) or getattr(parent, "location", None)
+        metadata["resource_group"] = resource_group(item.id)
+        if parent is not None:
+            metadata["parent"] = parent.id
+
+        return CloudResource(
+            id=item.id,
+            org_id=org_id,
+            name=item.name or item.id,
+            resource_type=collector.resource_type.value,
+            provider=self.provider,
+            account_id=account_id,
+            metadata=metadata,
+        )
+
 
-            compute_client = ComputeManagementClient(credential, subscription_id)
-
-            resources = []
-            for vm in compute_client.virtual_machines.list_all():
-                resource = CloudResource(
-                    id=vm.id,
-                    org_id=org_id,
-                    name=vm.name,
-                    resource_type="azure_vm",
-                    provider="azure",
-                    account_id=account_id,
-                    metadata={
-                        "type": vm.type,
-                        "location": vm.location,
-                    },
-                )
-                resources.append(resource)
-
-            return resources
-        except Exception as e:
-            logger.error(f"Azure crawl error: {str(e)}")
-            raise CloudAPIError("Azure", str(e))
+async def _pages(pager: Any) -> AsyncIterator[List[Any]]:
+    # AsyncItemPaged fetches the next page only when asked for it
+    async for page in pager.by_page():
+        yield [item async for item in page]
@@ -1,16 +1,73 @@
+import asyncio
+import hashlib
+import json
 import logging
-import uuid
-from typing import Optional
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Set
 from app.services.neo4j import Neo4jService
-from app.core.exceptions import ResourceNotFoundError
-from app.models.graph import CloudResource
+from app.core.config import settings
+from app.models.graph import CloudResource, utc_now
+from app.services.indexing import ResourceIndexer
+from app.services.cache import CacheInvalidationChannel
+from app.services.response_cache import SemanticResponseCache
 
 logger = logging.getLogger(__name__)
 
+ENSURE_ACCOUNT_QUERY = """
+MERGE (org:Organization {id: $org_id})
+MERGE (account:CloudAccount {org_id: $org_id, id: $account_id})
+MERGE (org)-[:HAS_ACCOUNT]->(account)
+"""
+
+UPSERT_RESOURCES_QUERY = """
+MATCH (account:CloudAccount {org_id: $org_id, id: $account_id})
+UNWIND $rows AS row
+MERGE (resource:CloudResource {org_id: $org_id, account_id: $account_id, id: row.id})
+ON CREATE SET resource.created_at = datetime()
+SET resource.name = row.name,
+    resource.type = row.type,
+    resource.provider = row.provider,
+    resource.metadata = row.metadata,
+    resource.fingerprint = row.fingerprint,
+    resource.updated_at = datetime()
+MERGE (account)-[:HAS_RESOURCE]->(resource)
+RETURN count(resource) AS stored
+"""
+
+STORED_FINGERPRINTS_QUERY = """
+MATCH (r:CloudResource {org_id: $org_id, account_id: $account_id})
+RETURN r.id AS id, r.type AS type, r.fingerprint AS fingerprint
+"""
+
+DELETE_RESOURCES_QUERY = """
+MATCH (r:CloudResource {org_id: $org_id, account_id: $account_id})
+WHERE r.id IN $ids
+DETACH DELETE r
+RETURN count(*) AS deleted
+"""
+
+# The API reads `last_synced` from the org's `:Account`; the crawl graph keeps a copy
+MARK_SYNCED_QUERY = """
+OPTIONAL MATCH (:Organization {id: $org_id})-[:OWNS]->(account:Account {account_id: $account_id})
+SET account.last_synced = $now
+WITH count(*) AS accounts
+OPTIONAL MATCH (crawled:CloudAccount {org_id: $org_id, id: $account_id})
+SET crawled.last_synced = $now
+"""
+
 
 class CloudCrawlerBase:
-    def __init__(self, neo4j_service: Neo4jService):
+    def __init__(
+        self,
+        neo4j_service: Neo4jService,
+        indexer: Optional[ResourceIndexer] = None,
+        response_cache: Optional[SemanticResponseCache] = None,
+        response_cache_invalidation: Optional[CacheInvalidationChannel] = None,
+    ):
         self.neo4j = neo4j_service
+        self.indexer = indexer
+        self.response_cache = response_cache
+        self.response_cache_invalidation = response_cache_invalidation
         self.provider = None
 
     async def crawl_resources(
@@ -18,37 +75,270 @@ class CloudCrawlerBase:
     ) -> list[CloudResource]:
         raise NotImplementedError
 
-    async def store_resource(
-        self, org_id: str, account_id: str, resource: CloudResource
-    ) -> Optional[str]:
+    async def iter_resources(
+        self,
+        org_id: str,
+        account_id: str,
+        credentials: dict,
+        failed_scopes: Optional[Set[str]] = None,
+    ) -> AsyncIterator[CloudResource]:
+        """Yield resources as they are crawled.
+
+        Crawlers that can page through their provider APIs override this so
+        ingest starts before the crawl finishes. Crawlers that tolerate
+        partial failures add the resource types they could not list to
+        `failed_scopes`, so a delta sync does not treat them as deleted.
+        """
+        for resource in await self.crawl_resources(org_id, account_id, credentials):
+            yield resource
+
+    def resources_from_page(
+        self, org_id: str, account_id: str, record: Dict[str, Any]
+    ) -> List[CloudResource]:
+        """Convert one page recorded by a `PageRecorder` back into resources."""
+        raise NotImplementedError
+
+    async def sync_resources(
+        self,
+        org_id: str,
+        account_id: str,
+        credentials: dict,
+        incremental: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        if incremental is None:
+            incremental = settings.CRAWLER_INCREMENTAL
+
+        report = None
         try:
-            resource_id = str(uuid.uuid4())
-            query = """
-            MERGE (org:Organization {id: $org_id})
-            MERGE (account:CloudAccount {id: $account_id})
-            MERGE (resource:CloudResource {id: $resource_id})
-            SET resource.name = $name,
-                resource.type = $type,
-                resource.provider = $provider,
-                resource.metadata = $metadata,
-                resource.created_at = datetime()
-            CREATE (org)-[:HAS_ACCOUNT]->(account)
-            CREATE (account)-[:HAS_RESOURCE]->(resource)
-            RETURN resource.id
-            """
-            results = await self.neo4j.execute_query(
-                query,
+            if not incremental:
+                report = await self.store_resources(
+                    org_id, account_id, self.iter_resources(org_id, account_id, credentials)
+                )
+            else:
+                report = await self.sync_changed_resources(org_id, account_id, credentials)
+        finally:
+            # A failed sync may have written some batches before giving up
+            if report is None or report["stored"] or report.get("deleted"):
+                await self._invalidate_responses(org_id)
+
+        await self.neo4j.write(
+            MARK_SYNCED_QUERY,
+            {"org_id": org_id, "account_id": account_id, "now": utc_now().isoformat()},
+        )
+        return report
+
+    async def sync_changed_resources(
+        self, org_id: str, account_id: str, credentials: dict
+    ) -> Dict[str, Any]:
+        """Delta sync: only write resources that were created, changed or deleted.
+
+        Each crawled resource is fingerprinted and compared with the
+        fingerprint stored on its node. Unchanged resources are skipped;
+        stored resources that were not seen are deleted, except for resource
+        types the crawler reported as failed.
+        """
+        stored: Dict[str, Dict[str, Any]] = {}
+        async for r in self.neo4j.iter_query(
+            STORED_FINGERPRINTS_QUERY, {"org_id": org_id, "account_id": account_id}
+        ):
+            stored[r["id"]] = r
+
+        seen: Set[str] = set()
+        failed_scopes: Set[str] = set()
+        counts = {"created": 0, "changed": 0, "unchanged": 0}
+
+        async def changed_resources() -> AsyncIterator[CloudResource]:
+            async for resource in self.iter_resources(
+                org_id, account_id, credentials, failed_scopes=failed_scopes
+            ):
+                seen.add(resource.id)
+                previous = stored.get(resource.id)
+                if previous is None:
+                    counts["created"] += 1
+                elif previous["fingerprint"] != self.fingerprint(resource):
+                    counts["changed"] += 1
+                else:
+                    counts["unchanged"] += 1
+                    continue
+                yield resource
+
+        report = await self.store_resources(org_id, account_id, changed_resources())
+
+        deleted_ids = [
+            resource_id
+            for resource_id, r in stored.items()
+            if resource_id not in seen and r["type"] not in failed_scopes
+        ]
+        report["deleted"] = await self.delete_resources(org_id, account_id, deleted_ids)
+        if self.indexer and deleted_ids:
+            try:
+                await self.indexer.remove_resources(org_id, self.provider, account_id, deleted_ids)
+            except Exception as e:
+                logger.error(f"Failed to remove deleted resources from the index: {str(e)}")
+        report.update(counts)
+        report["skipped_scopes"] = sorted(failed_scopes)
+
+        logger.info(
+            f"Delta sync for account {account_id}: {counts['created']} created, "
+            f"{counts['changed']} changed, {report['deleted']} deleted, "
+            f"{counts['unchanged']} unchanged"
+        )
+        return report
+
+    async def _invalidate_responses(self, org_id: str) -> None:
+        """Drop cached chat answers that may describe the old inventory."""
+        if self.response_cache is not None:
+            self.response_cache.invalidate_org(org_id)
+        if self.response_cache_invalidation is not None:
+            await self.response_cache_invalidation.publish()
+
+    async def delete_resources(
+        self,
+        org_id: str,
+        account_id: str,
+        resource_ids: List[str],
+        batch_size: Optional[int] = None,
+    ) -> int:
+        batch_size = batch_size or settings.CRAWLER_INGEST_BATCH_SIZE
+        deleted = 0
+        for i in range(0, len(resource_ids), batch_size):
+            results = await self.neo4j.write(
+                DELETE_RESOURCES_QUERY,
                 {
                     "org_id": org_id,
                     "account_id": account_id,
-                    "resource_id": resource_id,
-                    "name": resource.name,
-                    "type": resource.resource_type,
-                    "provider": resource.provider,
-                    "metadata": resource.metadata,
+                    "ids": resource_ids[i : i + batch_size],
                 },
             )
-            return results[0]["resource.id"] if results else None
+            deleted += results[0]["deleted"] if results else 0
+        return deleted
+
+    @staticmethod
+    def fingerprint(resource: CloudResource) -> str:
+        normalized = json.dumps(
+            {
+                "name": resource.name,
+                "type": resource.resource_type,
+                "metadata": resource.metadata,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    @classmethod
+    def to_row(cls, resource: CloudResource) -> Dict[str, Any]:
+        # Neo4j properties cannot hold maps, so metadata is stored as JSON.
+        return {
+            "id": resource.id,
+            "name": resource.name,
+            "type": resource.resource_type,
+            "provider": resource.provider,
+            "metadata": json.dumps(resource.metadata, sort_keys=True, default=str),
+            "fingerprint": cls.fingerprint(resource),
+        }
+
+    async def store_resource(
+        self, org_id: str, account_id: str, resource: CloudResource
+    ) -> Optional[str]:
+        report = await self.store_resources(org_id, account_id, [resource])
+        return resource.id if report["stored"] else None
+
+    async def store_resources(
+        self,
+        org_id: str,
+        account_id: str,
+        resources: Iterable[CloudResource] | AsyncIterable[CloudResource],
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Upsert resources in parameterized UNWIND batches.
+
+        The Organization/CloudAccount pair is merged once, then batches of
+        `batch_size` rows run as separate write transactions, at most
+        `max_concurrency` at a time. `resources` may be an async iterator, in
+        which case batches are written while the crawl is still running.
+        Everything is MERGEd, so re-running an ingest is idempotent. With an
+        indexer configured, the same resources are also embedded into the
+        vector index alongside the graph writes. Returns a report with
+        per-batch timings.
+        """
+        batch_size = batch_size or settings.CRAWLER_INGEST_BATCH_SIZE
+        max_concurrency = max_concurrency or settings.CRAWLER_INGEST_CONCURRENCY
+
+        started = time.perf_counter()
+        await self.neo4j.write(ENSURE_ACCOUNT_QUERY, {"org_id": org_id, "account_id": account_id})
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        tasks: List[asyncio.Task] = []
+        indexing = self.indexer.pipeline() if self.indexer else None
+
+        async def run_batch(index: int, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+            try:
+                batch_started = time.perf_counter()
+                results = await self.neo4j.write(
+                    UPSERT_RESOURCES_QUERY,
+                    {"org_id": org_id, "account_id": account_id, "rows": batch},
+                )
+                elapsed = time.perf_counter() - batch_started
+                logger.debug(f"Stored batch {index} ({len(batch)} resources) in {elapsed:.3f}s")
+                return {
+                    "batch": index,
+                    "size": len(batch),
+                    "stored": results[0]["stored"] if results else 0,
+                    "seconds": round(elapsed, 4),
+                }
+            finally:
+                semaphore.release()
+
+        async def submit(batch: List[Dict[str, Any]]) -> None:
+            # Waiting for a free slot here is what throttles the producer.
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(run_batch(len(tasks), batch)))
+
+        try:
+            batch: List[Dict[str, Any]] = []
+            async for resource in _iterate(resources):
+                batch.append(self.to_row(resource))
+                if indexing:
+                    await indexing.add(resource)
+                if len(batch) >= batch_size:
+                    await submit(batch)
+                    batch = []
+            if batch:
+                await submit(batch)
+
+            batch_reports = await asyncio.gather(*tasks)
+            indexing_report = await indexing.finish() if indexing else None
         except Exception as e:
-            logger.error(f"Failed to store resource: {str(e)}")
+            for task in tasks:
+                task.cancel()
+            if indexing:
+                indexing.cancel()
+            logger.error(f"Failed to store resources: {str(e)}")
             raise
+
+        elapsed = time.perf_counter() - started
+        stored = sum(b["stored"] for b in batch_reports)
+        logger.info(
+            f"Stored {stored} resources for account {account_id} "
+            f"in {len(batch_reports)} batches ({elapsed:.2f}s)"
+        )
+        report = {
+            "stored": stored,
+            "batches": batch_reports,
+            "seconds": round(elapsed, 4),
+        }
+        if indexing_report:
+            report["indexing"] = indexing_report
+        return report
+
+
+async def _iterate(items: Iterable[Any] | AsyncIterable[Any]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
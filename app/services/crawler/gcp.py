@@ -1,55 +1,443 @@
+import asyncio
+import gzip
+import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 from app.services.crawler.base import CloudCrawlerBase
+from app.services.crawler.recording import PageRecorder
 from app.models.graph import CloudResource
+from app.core.config import settings
 from app.core.exceptions import CloudAPIError
+from app.core.constants import CloudProvider, ResourceType
 
 logger = logging.getLogger(__name__)
 
+COMPUTE_API_PREFIX = "https://www.googleapis.com/compute/v1/"
+
+# Items fetched / export lines parsed per worker-thread hop
+CHUNK_SIZE = 500
+
+_DONE = object()
+
+
+class GCPCollector:
+    """How to map one GCP resource type.
+
+    `asset_type` matches Cloud Asset Inventory records, and `metadata` maps
+    keys to dotted paths in the resource's JSON (camelCase) representation,
+    which is what both the asset export and the Compute API's `to_dict`
+    produce. Types with a `client` are also crawled through the Compute API;
+    `aggregated_list` results are unpacked from `field` across zones and
+    regions.
+    """
+
+    def __init__(
+        self,
+        resource_type: ResourceType.GCP,
+        asset_type: str,
+        metadata: Optional[Dict[str, str]] = None,
+        client: Optional[str] = None,
+        field: Optional[str] = None,
+    ):
+        self.resource_type = resource_type
+        self.asset_type = asset_type
+        self.metadata = metadata or {}
+        self.client = client
+        self.field = field
+
+
+GCP_COLLECTORS: List[GCPCollector] = [
+    # Compute
+    GCPCollector(
+        ResourceType.GCP.COMPUTE_ENGINE,
+        "compute.googleapis.com/Instance",
+        metadata={"state": "status", "machine_type": "machineType", "zone": "zone"},
+        client="InstancesClient",
+        field="instances",
+    ),
+    GCPCollector(
+        ResourceType.GCP.GKE,
+        "container.googleapis.com/Cluster",
+        metadata={"state": "status", "version": "currentMasterVersion", "network": "network"},
+    ),
+    GCPCollector(
+        ResourceType.GCP.CLOUD_RUN,
+        "run.googleapis.com/Service",
+        metadata={"url": "status.url"},
+    ),
+    GCPCollector(
+        ResourceType.GCP.CLOUD_FUNCTIONS,
+        "cloudfunctions.googleapis.com/CloudFunction",
+        metadata={"state": "status", "runtime": "runtime"},
+    ),
+    # Networking
+    GCPCollector(
+        ResourceType.GCP.VPC,
+        "compute.googleapis.com/Network",
+        metadata={
+            "auto_create_subnetworks": "autoCreateSubnetworks",
+            "routing_mode": "routingConfig.routingMode",
+        },
+        client="NetworksClient",
+    ),
+    GCPCollector(
+        ResourceType.GCP.SUBNET,
+        "compute.googleapis.com/Subnetwork",
+        metadata={
+            "ip_cidr_range": "ipCidrRange",
+            "network": "network",
+            "private_google_access": "privateIpGoogleAccess",
+        },
+        client="SubnetworksClient",
+        field="subnetworks",
+    ),
+    GCPCollector(
+        ResourceType.GCP.FIREWALL,
+        "compute.googleapis.com/Firewall",
+        metadata={
+            "network": "network",
+            "direction": "direction",
+            "disabled": "disabled",
+            "source_ranges": "sourceRanges",
+        },
+        client="FirewallsClient",
+    ),
+    GCPCollector(
+        ResourceType.GCP.CLOUD_LOAD_BALANCER,
+        "compute.googleapis.com/ForwardingRule",
+        metadata={
+            "ip_address": "IPAddress",
+            "scheme": "loadBalancingScheme",
+            "target": "target",
+        },
+        client="ForwardingRulesClient",
+        field="forwarding_rules",
+    ),
+    # Storage
+    GCPCollector(
+        ResourceType.GCP.PERSISTENT_DISK,
+        "compute.googleapis.com/Disk",
+        metadata={"state": "status", "size_gb": "sizeGb", "disk_type": "type", "users": "users"},
+        client="DisksClient",
+        field="disks",
+    ),
+    GCPCollector(
+        ResourceType.GCP.CLOUD_STORAGE,
+        "storage.googleapis.com/Bucket",
+        metadata={
+            "storage_class": "storageClass",
+            "public_access_prevention": "iamConfiguration.publicAccessPrevention",
+        },
+    ),
+    # Databases
+    GCPCollector(
+        ResourceType.GCP.CLOUD_SQL,
+        "sqladmin.googleapis.com/Instance",
+        metadata={"state": "state", "database_version": "databaseVersion", "tier": "settings.tier"},
+    ),
+    GCPCollector(
+        ResourceType.GCP.MEMORYSTORE,
+        "redis.googleapis.com/Instance",
+        metadata={"state": "state", "tier": "tier"},
+    ),
+    # Messaging
+    GCPCollector(ResourceType.GCP.PUBSUB, "pubsub.googleapis.com/Topic"),
+    # Identity
+    GCPCollector(
+        ResourceType.GCP.SERVICE_ACCOUNT,
+        "iam.googleapis.com/ServiceAccount",
+        metadata={"email": "email", "disabled": "disabled"},
+    ),
+]
+
+COLLECTORS_BY_ASSET_TYPE = {c.asset_type: c for c in GCP_COLLECTORS}
+COLLECTORS_BY_TYPE = {c.resource_type.value: c for c in GCP_COLLECTORS}
+
+
+def _get(data: Dict[str, Any], path: str) -> Any:
+    for key in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return _short(data)
+
+
+def _short(value: Any) -> Any:
+    # Compute API references are full URLs; the last segment is what people use
+    if isinstance(value, str) and value.startswith(COMPUTE_API_PREFIX):
+        return value.rsplit("/", 1)[-1]
+    if isinstance(value, list):
+        return [_short(v) for v in value]
+    return value
+
+
+def region_of(location: Optional[str]) -> Optional[str]:
+    """`us-central1-a` -> `us-central1`; global/multi-region locations -> None."""
+    if not location or location == "global" or "-" not in location:
+        return None
+    parts = location.split("-")
+    return "-".join(parts[:2]) if len(parts) > 2 else location
+
+
+def full_resource_name(self_link: str) -> str:
+    """Compute API selfLink -> Cloud Asset Inventory resource name, so both modes agree on ids."""
+    if self_link.startswith(COMPUTE_API_PREFIX):
+        return "//compute.googleapis.com/" + self_link[len(COMPUTE_API_PREFIX) :]
+    return self_link
+
+
+def _read_assets(handle, limit: int) -> Tuple[List[Dict[str, Any]], int, bool]:
+    assets, malformed = [], 0
+    for _ in range(limit):
+        line = handle.readline()
+        if not line:
+            return assets, malformed, True
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            assets.append(json.loads(line))
+        except ValueError:
+            malformed += 1
+    return assets, malformed, False
+
+
+def _take(items: Iterator[Any], limit: int) -> List[Any]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= limit:
+            break
+    return chunk
+
 
 class GCPCrawler(CloudCrawlerBase):
-    def __init__(self, neo4j_service):
-        super().__init__(neo4j_service)
-        self.provider = "gcp"
+    def __init__(self, neo4j_service, **kwargs):
+        super().__init__(neo4j_service, **kwargs)
+        self.provider = CloudProvider.GCP.value
 
     async def crawl_resources(
         self, org_id: str, account_id: str, credentials: dict
     ) -> list[CloudResource]:
-        try:
-            from google.cloud import compute_v1
-            from google.oauth2 import service_account
+        return [r async for r in self.iter_resources(org_id, account_id, credentials)]
 
-            credentials_json = credentials.get("service_account_json")
-            project_id = credentials.get("project_id")
+    async def iter_resources(
+        self,
+        org_id: str,
+        account_id: str,
+        credentials: dict,
+        failed_scopes: Optional[Set[str]] = None,
+        recorder: Optional[PageRecorder] = None,
+    ) -> AsyncIterator[CloudResource]:
+        """Yield GCP resources from an asset export or the Compute API.
 
-            gcp_credentials = service_account.Credentials.from_service_account_info(
-                credentials_json
+        With `asset_export_path` in the credentials, the resources come from
+        a Cloud Asset Inventory export (newline-delimited JSON, optionally
+        gzipped) read from local disk; no API calls are made. Otherwise the
+        Compute API collectors run concurrently.
+        """
+        if credentials.get("asset_export_path"):
+            resources = self.iter_asset_export(org_id, account_id, credentials["asset_export_path"])
+        else:
+            resources = self.iter_api_resources(
+                org_id, account_id, credentials, failed_scopes, recorder
             )
+        async for resource in resources:
+            yield resource
 
-            instances_client = compute_v1.InstancesClient(credentials=gcp_credentials)
-
-            resources = []
-            request = compute_v1.AggregatedListInstancesRequest(project=project_id)
-
-            for zone, response in instances_client.aggregated_list(request=request):
-                if response.instances:
-                    for instance in response.instances:
-                        resource = CloudResource(
-                            id=instance.id,
-                            org_id=org_id,
-                            name=instance.name,
-                            resource_type="gcp_compute",
-                            provider="gcp",
-                            account_id=account_id,
-                            metadata={
-                                "status": instance.status,
-                                "machine_type": instance.machine_type,
-                                "zone": zone,
-                            },
-                        )
-                        resources.append(resource)
-
-            return resources
+    async def iter_asset_export(
+        self, org_id: str, account_id: str, path: str
+    ) -> AsyncIterator[CloudResource]:
+        """Stream resources out of a Cloud Asset Inventory export file.
+
+        The file is read and parsed `CHUNK_SIZE` lines at a time in a worker
+        thread, so memory stays flat for exports of any size and the event
+        loop is never blocked on disk. Asset types without a collector and
+        malformed lines are skipped.
+        """
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            handle = await asyncio.to_thread(opener, path, "rt", encoding="utf-8")
+        except OSError as e:
+            logger.error(f"GCP crawl error: {str(e)}")
+            raise CloudAPIError("GCP", f"Cannot read asset export {path}: {str(e)}")
+
+        counts = {"resources": 0, "skipped": 0, "malformed": 0}
+        try:
+            done = False
+            while not done:
+                assets, malformed, done = await asyncio.to_thread(_read_assets, handle, CHUNK_SIZE)
+                counts["malformed"] += malformed
+                for asset in assets:
+                    resource = self._from_asset(org_id, account_id, asset)
+                    if resource is None:
+                        counts["skipped"] += 1
+                        continue
+                    counts["resources"] += 1
+                    yield resource
+        finally:
+            handle.close()
+
+        logger.info(
+            f"Read {counts['resources']} resources from asset export {path} "
+            f"({counts['skipped']} unsupported assets, {counts['malformed']} malformed lines)"
+        )
+
+    async def iter_api_resources(
+        self,
+        org_id: str,
+        account_id: str,
+        credentials: dict,
+        failed_scopes: Optional[Set[str]] = None,
+        recorder: Optional[PageRecorder] = None,
+    ) -> AsyncIterator[CloudResource]:
+        """Crawl the Compute API, one concurrent task per resource type.
+
+        The client libraries are blocking, so pages are pulled `CHUNK_SIZE`
+        items at a time in worker threads, at most
+        `GCP_CRAWLER_MAX_CONCURRENCY` collectors at once. Chunks are handed
+        back through a bounded queue as they arrive. With a `recorder`, the
+        raw items are recorded for offline replay as well.
+        """
+        try:
+            from google.cloud import compute_v1
+            from google.oauth2 import service_account
+
+            project_id = credentials.get("project_id") or account_id
+            gcp_credentials = None
+            if credentials.get("service_account_json"):
+                gcp_credentials = service_account.Credentials.from_service_account_info(
+                    credentials["service_account_json"]
+                )
+            # Without a service account, the clients use Application Default Credentials
         except Exception as e:
             logger.error(f"GCP crawl error: {str(e)}")
             raise CloudAPIError("GCP", str(e))
+
+        collectors = [c for c in GCP_COLLECTORS if c.client]
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.CRAWLER_QUEUE_SIZE)
+        semaphore = asyncio.Semaphore(settings.GCP_CRAWLER_MAX_CONCURRENCY)
+        errors: List[str] = []
+
+        async def collect(collector: GCPCollector) -> None:
+            client = getattr(compute_v1, collector.client)(credentials=gcp_credentials)
+            if collector.field:
+                pager = await asyncio.to_thread(client.aggregated_list, project=project_id)
+                items = (
+                    item
+                    for _, scoped in pager
+                    for item in getattr(scoped, collector.field, None) or []
+                )
+            else:
+                items = iter(await asyncio.to_thread(client.list, project=project_id))
+
+            while True:
+                chunk = await asyncio.to_thread(_take, items, CHUNK_SIZE)
+                if not chunk:
+                    return
+                page = [
+                    type(item).to_dict(
+                        item, preserving_proto_field_name=False, use_integers_for_enums=False
+                    )
+                    for item in chunk
+                ]
+                if recorder:
+                    recorder.page(collector.resource_type.value, None, page)
+                await queue.put([self._from_api(org_id, account_id, collector, d) for d in page])
+
+        async def run(collector: GCPCollector) -> None:
+            try:
+                async with semaphore:
+                    await collect(collector)
+            except Exception as e:
+                # An API may be disabled on the project; keep going.
+                logger.warning(f"GCP crawl of {collector.asset_type} failed: {str(e)}")
+                errors.append(f"{collector.resource_type.value}: {str(e)}")
+                if failed_scopes is not None:
+                    failed_scopes.add(collector.resource_type.value)
+                if recorder:
+                    recorder.failed(collector.resource_type.value)
+
+        async def produce() -> None:
+            await asyncio.gather(*(run(c) for c in collectors))
+            await queue.put(_DONE)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is _DONE:
+                    break
+                for resource in batch:
+                    yield resource
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+        if collectors and len(errors) == len(collectors):
+            logger.error(f"GCP crawl error: {errors[0]}")
+            raise CloudAPIError("GCP", errors[0], {"errors": errors[:20]})
+
+    def _from_asset(
+        self, org_id: str, account_id: str, asset: Dict[str, Any]
+    ) -> Optional[CloudResource]:
+        collector = COLLECTORS_BY_ASSET_TYPE.get(asset.get("assetType"))
+        if collector is None or not asset.get("name"):
+            return None
+
+        resource = asset.get("resource") or {}
+        data = resource.get("data") or {}
+        return self._to_resource(
+            org_id,
+            account_id,
+            collector,
+            resource_id=asset["name"],
+            name=data.get("name") or asset["name"].rsplit("/", 1)[-1],
+            data=data,
+            location=resource.get("location"),
+        )
+
+    def resources_from_page(
+        self, org_id: str, account_id: str, record: Dict[str, Any]
+    ) -> List[CloudResource]:
+        collector = COLLECTORS_BY_TYPE[record["type"]]
+        return [self._from_api(org_id, account_id, collector, data) for data in record["page"]]
+
+    def _from_api(
+        self, org_id: str, account_id: str, collector: GCPCollector, data: Dict[str, Any]
+    ) -> CloudResource:
+        location = _short(data.get("zone") or data.get("region"))
+        return self._to_resource(
+            org_id,
+            account_id,
+            collector,
+            resource_id=full_resource_name(data.get("selfLink") or str(data.get("id"))),
+            name=data.get("name"),
+            data=data,
+            location=location,
+        )
+
+    def _to_resource(
+        self,
+        org_id: str,
+        account_id: str,
+        collector: GCPCollector,
+        resource_id: str,
+        name: Optional[str],
+        data: Dict[str, Any],
+        location: Optional[str],
+    ) -> CloudResource:
+        metadata = {key: _get(data, path) for key, path in collector.metadata.items()}
+        metadata["region"] = region_of(location)
+        metadata["location"] = location
+
+        return CloudResource(
+            id=resource_id,
+            org_id=org_id,
+            name=name or resource_id,
+            resource_type=collector.resource_type.value,
+            provider=self.provider,
+            account_id=account_id,
+            metadata=metadata,
+        )
@@ -0,0 +1,98 @@
+import gzip
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.constants import CloudProvider
+from app.core.exceptions import CloudAPIError
+from app.models.graph import utc_now
+
+logger = logging.getLogger(__name__)
+
+RECORDING_FORMAT = "cloud-companion-pages"
+RECORDING_VERSION = 1
+
+
+class PageRecorder:
+    """Records the raw API pages of a crawl to gzipped NDJSON.
+
+    The first line is a header naming the provider and account; every
+    following line is one page as the provider returned it, with the
+    resource type it was listed for, its scope (e.g. the AWS region) and
+    its offset in seconds from the start of the recording. Resource types
+    the crawl could not list are recorded too, so a replay reports them as
+    failed scopes. Pages can be written from worker threads.
+    """
+
+    def __init__(self, path: str, provider: str, account_id: str):
+        self.path = path
+        self.provider = provider
+        self.account_id = account_id
+        self.pages = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._started = 0.0
+
+    def __enter__(self) -> "PageRecorder":
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._started = time.monotonic()
+        self._write(
+            {
+                "format": RECORDING_FORMAT,
+                "version": RECORDING_VERSION,
+                "provider": self.provider,
+                "account_id": self.account_id,
+                "recorded_at": utc_now().isoformat(),
+            }
+        )
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._file.close()
+        logger.info(f"Recorded {self.pages} pages to {self.path}")
+
+    def page(self, resource_type: str, scope: Optional[str], page: Any, parent: Any = None) -> None:
+        record = {
+            "offset": round(time.monotonic() - self._started, 4),
+            "type": resource_type,
+            "scope": scope,
+            "page": page,
+        }
+        if parent is not None:
+            record["parent"] = parent
+        self._write(record)
+        self.pages += 1
+
+    def failed(self, resource_type: str) -> None:
+        self._write({"offset": round(time.monotonic() - self._started, 4), "failed": resource_type})
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+    except (OSError, ValueError) as e:
+        raise CloudAPIError("Replay", f"Cannot read recording {path}: {str(e)}")
+    if header.get("format") != RECORDING_FORMAT or header.get("provider") not in [
+        p.value for p in CloudProvider
+    ]:
+        raise CloudAPIError("Replay", f"{path} is not a crawl recording")
+    return header
+
+
+def read_records(handle, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    records = []
+    for _ in range(limit):
+        line = handle.readline()
+        if not line:
+            return records, True
+        if line.strip():
+            records.append(json.loads(line))
+    return records, False
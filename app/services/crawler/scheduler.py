@@ -0,0 +1,249 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.constants import CloudProvider
+from app.core.exceptions import CloudAPIError
+from app.models.graph import CrawlJob, utc_now
+from app.services.crawler.base import CloudCrawlerBase
+from app.services.repositories.crawl_job import CrawlJobRepository
+
+logger = logging.getLogger(__name__)
+
+
+def ambient_credentials(job: CrawlJob) -> Dict[str, Any]:
+    """Credentials for scheduled crawls.
+
+    Cloud credentials are never persisted, so scheduled crawls rely on the
+    SDKs' default credential chains (environment, instance/workload identity)
+    and only pass the account scope.
+    """
+    if job.provider == CloudProvider.AZURE.value:
+        return {"subscription_id": job.account_id}
+    if job.provider == CloudProvider.GCP.value:
+        credentials = {"project_id": job.account_id}
+        if settings.GCP_ASSET_EXPORT_PATH:
+            credentials["asset_export_path"] = settings.GCP_ASSET_EXPORT_PATH.format(
+                project_id=job.account_id
+            )
+        return credentials
+    return {}
+
+
+class CrawlScheduler:
+    """Runs periodic per-account syncs in the background.
+
+    Jobs are persisted as `:CrawlJob` nodes, so schedules survive restarts and
+    several API workers can run a scheduler each: a job is only executed by
+    the worker that wins its lease. Concurrency is capped globally and per
+    provider, and failures back off exponentially with jitter.
+    """
+
+    def __init__(
+        self,
+        repo: CrawlJobRepository,
+        crawlers: Dict[str, CloudCrawlerBase],
+        credentials_resolver: Callable[[CrawlJob], Dict[str, Any]] = ambient_credentials,
+    ):
+        self.repo = repo
+        self.crawlers = crawlers
+        self.credentials_resolver = credentials_resolver
+        self.interval = settings.CRAWL_INTERVAL_SECONDS
+        self.jitter = settings.CRAWL_INTERVAL_JITTER
+        self.tick_interval = settings.CRAWL_SCHEDULER_TICK_SECONDS
+        self.lease_seconds = settings.CRAWL_LEASE_SECONDS
+        self.backoff_base = settings.CRAWL_BACKOFF_BASE_SECONDS
+        self.backoff_max = settings.CRAWL_BACKOFF_MAX_SECONDS
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._global_limit = asyncio.Semaphore(settings.CRAWL_MAX_CONCURRENCY)
+        self._provider_limits = {
+            provider: asyncio.Semaphore(limit)
+            for provider, limit in settings.CRAWL_PROVIDER_CONCURRENCY.items()
+        }
+        self._running: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------------------------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Crawl scheduler started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        tasks = [self._task, *self._running.values()]
+        for task in self._running.values():
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._task = None
+        self._running.clear()
+        logger.info("Crawl scheduler stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Crawl scheduler tick failed: {str(e)}")
+            await asyncio.sleep(self.tick_interval)
+
+    # ---------------------------------------------------------------------------
+    # Scheduling
+    # ---------------------------------------------------------------------------
+
+    async def ensure_jobs(self) -> int:
+        """Create jobs for accounts that have none, spread over one interval."""
+        accounts = await self.repo.list_unscheduled_accounts()
+        if not accounts:
+            return 0
+
+        now = utc_now()
+        jobs = [
+            CrawlJob(
+                org_id=a["org_id"],
+                provider=a["provider"],
+                account_id=a["account_id"],
+                next_run_at=now + timedelta(seconds=random.uniform(0, self.interval)),
+            )
+            for a in accounts
+        ]
+        await self.repo.create_jobs(jobs)
+        logger.info(f"Scheduled {len(jobs)} new crawl jobs")
+        return len(jobs)
+
+    async def tick(self) -> List[str]:
+        await self.ensure_jobs()
+
+        now = utc_now()
+        dispatched = []
+        for job in await self.repo.list_jobs():
+            if job.id in self._running or job.next_run_at > now:
+                continue
+            if job.status == "running" and job.lease_expires_at and job.lease_expires_at > now:
+                continue
+
+            self._running[job.id] = asyncio.create_task(self._dispatch(job))
+            dispatched.append(job.id)
+
+        return dispatched
+
+    async def _dispatch(self, job: CrawlJob) -> None:
+        try:
+            await self.run_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Crawl job {job.id} failed: {str(e)}")
+        finally:
+            self._running.pop(job.id, None)
+
+    def _provider_limit(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._provider_limits:
+            self._provider_limits[provider] = asyncio.Semaphore(settings.CRAWL_MAX_CONCURRENCY)
+        return self._provider_limits[provider]
+
+    def next_interval(self) -> float:
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def backoff(self, failures: int) -> float:
+        # "Equal jitter": at least half the exponential delay, at most all of it
+        delay = min(self.backoff_max, self.backoff_base * 2 ** max(failures - 1, 0))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    # ---------------------------------------------------------------------------
+    # Execution
+    # ---------------------------------------------------------------------------
+
+    async def run_job(
+        self,
+        job: CrawlJob,
+        incremental: Optional[bool] = None,
+        credentials: Optional[Dict[str, Any]] = None,
+        force: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """Claim and run one job; returns None if it was not claimed.
+
+        Scheduled dispatch only claims jobs that are still due. Manual runs
+        pass `force` to run the job now whatever its `next_run_at`.
+        """
+        crawler = self.crawlers.get(job.provider)
+        if crawler is None:
+            logger.warning(f"No crawler registered for provider {job.provider}")
+            return None
+
+        async with self._global_limit, self._provider_limit(job.provider):
+            now = utc_now()
+            claimed = await self.repo.claim_job(
+                job.id, self.owner, now, now + timedelta(seconds=self.lease_seconds), force=force
+            )
+            if claimed is None:
+                logger.debug(f"Crawl job {job.id} is leased by another worker or no longer due")
+                return None
+
+            job = claimed
+            report = None
+            try:
+                credentials = {**self.credentials_resolver(job), **(credentials or {})}
+                report = await crawler.sync_resources(
+                    job.org_id, job.account_id, credentials, incremental=incremental
+                )
+            except asyncio.CancelledError:
+                # Shutting down: hand the job back instead of waiting out the lease
+                job.status = "pending"
+                job.next_run_at = utc_now() + timedelta(
+                    seconds=random.uniform(0, self.tick_interval)
+                )
+                raise
+            except CloudAPIError as e:
+                job.failures += 1
+                job.status = "failed"
+                job.last_error = e.message
+                job.next_run_at = utc_now() + timedelta(seconds=self.backoff(job.failures))
+                logger.warning(
+                    f"Crawl job {job.id} failed ({job.failures} in a row), "
+                    f"retrying at {job.next_run_at.isoformat()}: {e.message}"
+                )
+            except Exception as e:
+                job.failures += 1
+                job.status = "failed"
+                job.last_error = str(e)
+                job.next_run_at = utc_now() + timedelta(seconds=self.backoff(job.failures))
+                logger.error(f"Crawl job {job.id} failed: {str(e)}")
+            else:
+                job.failures = 0
+                job.status = "succeeded"
+                job.last_error = None
+                job.last_report = json.dumps({k: v for k, v in report.items() if k != "batches"})
+                job.next_run_at = utc_now() + timedelta(seconds=self.next_interval())
+            finally:
+                job.lease_owner = None
+                job.lease_expires_at = None
+                await self.repo.save_job(job)
+
+            return report
+
+    async def trigger(self, job_id: str) -> CrawlJob | None:
+        """Make a job due now; a running scheduler picks it up on its next tick."""
+        return await self.repo.trigger_job(job_id, utc_now())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": len(self._running),
+            "active": self._task is not None,
+        }
@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of the limits so eviction doesn't run on every write
+EVICTION_LOW_WATER = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def embedding_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent embedding cache backed by a local SQLite file.
+
+    Entries are keyed by (model, hash of the whitespace-normalized text) and
+    vectors are stored as packed float32 arrays. Least recently used entries
+    are evicted once `max_entries` or `max_bytes` is exceeded. SQLite calls
+    run in a worker thread so lookups don't block the event loop.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000, max_bytes: int = 512 * 1024**2):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.entries = 0
+        self.bytes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._refresh_size()
+            logger.info(f"Opened embedding cache at {self.path} ({self.entries} entries)")
+        return self._conn
+
+    def _refresh_size(self) -> None:
+        # Only on open; writes and evictions keep the totals up to date after that
+        self.entries, self.bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings"
+        ).fetchone()
+
+    async def get_many(self, model: str, texts: Sequence[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for `texts`, keyed by the input text."""
+        if not texts:
+            return {}
+        try:
+            return await asyncio.to_thread(self._get_many, model, texts)
+        except sqlite3.Error as e:
+            # A broken cache only costs extra model calls
+            logger.warning(f"Embedding cache lookup failed: {str(e)}")
+            return {}
+
+    async def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        try:
+            await asyncio.to_thread(self._put_many, model, vectors)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache write failed: {str(e)}")
+
+    def _get_many(self, model: str, texts: Sequence[str]) -> Dict[str, List[float]]:
+        keys = {text: embedding_key(model, text) for text in texts}
+        vectors: Dict[str, List[float]] = {}
+
+        with self._lock:
+            conn = self._connection()
+            for key, blob in self._select(conn, "vector", set(keys.values())):
+                vector = array("f")
+                vector.frombytes(blob)
+                vectors[key] = vector.tolist()
+
+            if vectors:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in vectors],
+                )
+                conn.commit()
+
+            found = {text: vectors[key] for text, key in keys.items() if key in vectors}
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def _put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        now = time.time()
+        rows = {}
+        for text, vector in vectors.items():
+            key = embedding_key(model, text)
+            blob = array("f", vector).tobytes()
+            rows[key] = (key, model, blob, len(blob), now)
+
+        with self._lock:
+            conn = self._connection()
+            # Entries being replaced, so the running totals stay exact without a table scan
+            replaced = dict(self._select(conn, "size", rows))
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows.values(),
+            )
+            self.writes += len(rows)
+            self.entries += len(rows) - len(replaced)
+            self.bytes += sum(row[3] for row in rows.values()) - sum(replaced.values())
+            if self.entries > self.max_entries or self.bytes > self.max_bytes:
+                self._evict(conn)
+            conn.commit()
+
+    @staticmethod
+    def _select(
+        conn: sqlite3.Connection, column: str, keys: Iterable[str]
+    ) -> List[Tuple[str, Any]]:
+        """(key, `column`) rows for the given keys."""
+        keys = list(keys)
+        rows = []
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows += conn.execute(
+                f"SELECT key, {column} FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+        return rows
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        target_entries = int(self.max_entries * EVICTION_LOW_WATER)
+        target_bytes = int(self.max_bytes * EVICTION_LOW_WATER)
+        entries, total = self.entries, self.bytes
+
+        victims = []
+        # Read oldest first and stop at the low-water mark
+        rows = conn.execute("SELECT key, size FROM embeddings ORDER BY last_used")
+        for key, size in rows:
+            if entries <= target_entries and total <= target_bytes:
+                break
+            victims.append((key,))
+            entries -= 1
+            total -= size
+        rows.close()
+
+        conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+        self.evictions += len(victims)
+        self.entries, self.bytes = entries, total
+        logger.debug(f"Evicted {len(victims)} embeddings from cache")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.entries,
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.models.graph import CloudResource, utc_now
+from app.services.llm import LLMService
+from app.services.neo4j import Neo4jService
+from app.services.weaviate import WeaviateService
+
+logger = logging.getLogger(__name__)
+
+# Multi-tenant collection: one tenant per organization (tenant name = org id)
+RESOURCE_COLLECTION = "CloudResource"
+
+RESOURCE_PROPERTIES = {
+    "resource_id": "text",
+    "org_id": "text",
+    "account_id": "text",
+    "provider": "text",
+    "resource_type": "text",
+    "name": "text",
+    "region": "text",
+    "state": "text",
+    "description": "text",
+}
+
+# Matched as whole values (exact filters), not split into words
+RESOURCE_KEYWORD_PROPERTIES = (
+    "resource_id",
+    "org_id",
+    "account_id",
+    "provider",
+    "resource_type",
+    "region",
+    "state",
+)
+
+# What retrieval returns to the chat context
+RESOURCE_SEARCH_PROPERTIES = [
+    "resource_id",
+    "name",
+    "resource_type",
+    "provider",
+    "region",
+    "state",
+    "description",
+]
+
+IDLE_ORGANIZATIONS_QUERY = """
+MATCH (o:Organization)
+OPTIONAL MATCH (c:Conversation {org_id: o.id})-[:HAS_MESSAGE]->(m:Message)
+WITH o, max(m.created_at) AS last_active
+WHERE last_active IS NULL OR last_active < $cutoff
+RETURN o.id AS org_id
+"""
+
+ACCOUNT_RESOURCES_QUERY = """
+MATCH (r:CloudResource {org_id: $org_id, account_id: $account_id})
+RETURN r
+"""
+
+
+def describe_resource(resource: CloudResource) -> str:
+    """Short text form of a resource used for its embedding."""
+    details = ", ".join(
+        f"{key}={value}"
+        for key, value in sorted(resource.metadata.items())
+        if value not in (None, "", [], {})
+    )
+    return (
+        f"{resource.resource_type} {resource.name} ({resource.id}) "
+        f"in {resource.provider} account {resource.account_id}"
+        + (f": {details}" if details else "")
+    )
+
+
+def resource_uuid(provider: str, account_id: str, resource_id: str) -> str:
+    """Stable object id, so re-indexing a resource replaces its vector."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{provider}:{account_id}:{resource_id}"))
+
+
+def resource_from_node(node: Dict[str, Any]) -> CloudResource:
+    metadata = node.get("metadata") or {}
+    if isinstance(metadata, str):
+        metadata = json.loads(metadata)
+
+    return CloudResource(
+        id=node["id"],
+        org_id=node.get("org_id"),
+        name=node.get("name"),
+        resource_type=node.get("type"),
+        provider=node.get("provider"),
+        account_id=node.get("account_id"),
+        metadata=metadata,
+    )
+
+
+def resource_properties(resource: CloudResource, description: str) -> Dict[str, Any]:
+    return {
+        "resource_id": resource.id,
+        "org_id": resource.org_id,
+        "account_id": resource.account_id,
+        "provider": resource.provider,
+        "resource_type": resource.resource_type,
+        "name": resource.name,
+        "region": resource.metadata.get("region"),
+        "state": resource.metadata.get("state"),
+        "description": description,
+    }
+
+
+class ResourceIndexer:
+    """Embeds resources in bulk and stores them in the vector index."""
+
+    def __init__(
+        self,
+        neo4j_service: Neo4jService,
+        llm_service: LLMService,
+        weaviate_service: WeaviateService,
+    ):
+        self.neo4j = neo4j_service
+        self.llm = llm_service
+        self.weaviate = weaviate_service
+        self.batch_size = settings.INDEXING_BATCH_SIZE
+
+    async def index_resources(self, resources: Sequence[CloudResource]) -> Dict[str, Any]:
+        if not resources:
+            return {"indexed": 0, "failed": 0, "failed_objects": [], "seconds": 0.0}
+
+        started = time.perf_counter()
+        descriptions = [describe_resource(r) for r in resources]
+        vectors = await self.llm.create_embeddings_batch(descriptions)
+        embedded = time.perf_counter()
+
+        by_tenant: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for r, description, vector in zip(resources, descriptions, vectors, strict=True):
+            by_tenant[r.org_id].append(
+                {
+                    "uuid": resource_uuid(r.provider, r.account_id, r.id),
+                    "properties": resource_properties(r, description),
+                    "vector": vector,
+                }
+            )
+
+        reports = [
+            await self.weaviate.batch_upsert(RESOURCE_COLLECTION, objects, tenant=org_id)
+            for org_id, objects in by_tenant.items()
+        ]
+        indexed = sum(r["inserted"] for r in reports)
+        failed_objects = [obj for r in reports for obj in r["failed_objects"]]
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Indexed {indexed} resources in {elapsed:.2f}s "
+            f"(embedding {embedded - started:.2f}s)"
+        )
+        return {
+            "indexed": indexed,
+            "failed": len(failed_objects),
+            "failed_objects": failed_objects,
+            "seconds": round(elapsed, 4),
+        }
+
+    async def remove_resources(
+        self, org_id: str, provider: str, account_id: str, resource_ids: List[str]
+    ) -> int:
+        return await self.weaviate.delete_objects(
+            RESOURCE_COLLECTION,
+            [resource_uuid(provider, account_id, resource_id) for resource_id in resource_ids],
+            tenant=org_id,
+        )
+
+    async def ensure_schema(self) -> List[str]:
+        """Create the resource collection and a tenant for every organization."""
+        await self.weaviate.ensure_collection(
+            RESOURCE_COLLECTION,
+            RESOURCE_PROPERTIES,
+            keyword_properties=RESOURCE_KEYWORD_PROPERTIES,
+        )
+        results = await self.neo4j.read("MATCH (o:Organization) RETURN o.id AS org_id")
+        return await self.weaviate.ensure_tenants(
+            RESOURCE_COLLECTION, [r["org_id"] for r in results]
+        )
+
+    async def deactivate_idle_tenants(self, idle_days: Optional[int] = None) -> List[str]:
+        """Unload the vectors of organizations with no chat activity in `idle_days`."""
+        idle_days = settings.WEAVIATE_TENANT_IDLE_DAYS if idle_days is None else idle_days
+        results = await self.neo4j.read(
+            IDLE_ORGANIZATIONS_QUERY, {"cutoff": utc_now() - timedelta(days=idle_days)}
+        )
+        return await self.weaviate.deactivate_tenants(
+            RESOURCE_COLLECTION, [r["org_id"] for r in results]
+        )
+
+    def pipeline(self, batch_size: Optional[int] = None) -> "IndexingPipeline":
+        return IndexingPipeline(self, batch_size or self.batch_size)
+
+    async def index_account(
+        self, org_id: str, account_id: str, batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Re-embed an account's whole inventory, streaming it from the graph."""
+        pipeline = self.pipeline(batch_size)
+        async for record in self.neo4j.iter_query(
+            ACCOUNT_RESOURCES_QUERY, {"org_id": org_id, "account_id": account_id}
+        ):
+            await pipeline.add(resource_from_node(record["r"]))
+        return await pipeline.finish()
+
+
+class IndexingPipeline:
+    """Feeds a stream of resources to the indexer in batches.
+
+    One batch is embedded and imported in the background while the next one
+    fills up; `add` only waits when a full batch is ready and the previous
+    one is still in flight, which bounds memory. Indexing errors are logged
+    and counted rather than raised, since the graph is the source of truth.
+    """
+
+    def __init__(self, indexer: ResourceIndexer, batch_size: int):
+        self.indexer = indexer
+        self.batch_size = batch_size
+        self._batch: List[CloudResource] = []
+        self._task: Optional[asyncio.Task] = None
+        self._task_size = 0
+        self._started = time.perf_counter()
+        self.indexed = 0
+        self.failed = 0
+        self.batches = 0
+
+    async def add(self, resource: CloudResource) -> None:
+        self._batch.append(resource)
+        if len(self._batch) >= self.batch_size:
+            await self._flush()
+
+    async def finish(self) -> Dict[str, Any]:
+        if self._batch:
+            await self._flush()
+        await self._wait()
+        return {
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "seconds": round(time.perf_counter() - self._started, 4),
+        }
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _flush(self) -> None:
+        await self._wait()
+        batch, self._batch = self._batch, []
+        self._task = asyncio.create_task(self.indexer.index_resources(batch))
+        self._task_size = len(batch)
+
+    async def _wait(self) -> None:
+        if self._task is None:
+            return
+        try:
+            report = await self._task
+            self.indexed += report["indexed"]
+            self.failed += report["failed"]
+        except Exception as e:
+            logger.error(f"Failed to index {self._task_size} resources: {str(e)}")
+            self.failed += self._task_size
+        finally:
+            self._task = None
+            self.batches += 1
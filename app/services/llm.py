@@ -1,19 +1,57 @@
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from app.core.config import settings
 from app.core.exceptions import LLMError
+from app.services.embedding_cache import EmbeddingCache, normalize_text
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a cloud troubleshooting conversation. "
+    "Update the current summary with the new messages. Keep resource names and ids, "
+    "error messages, what was tried and what was decided; drop pleasantries. "
+    "Reply with the updated summary only."
+)
+
 
 class LLMService:
-    def __init__(self):
+    def __init__(self, embedding_cache: Optional[EmbeddingCache] = None):
         self.provider = settings.LLM_PROVIDER
         self.model = settings.LLM_MODEL
         self.api_key = settings.LLM_API_KEY
         self.base_url = settings.LLM_BASE_URL
         self.temperature = settings.LLM_TEMPERATURE
         self.max_tokens = settings.LLM_MAX_TOKENS
+        self.embedding_model = settings.LLM_EMBEDDING_MODEL
+        self.embedding_batch_size = settings.LLM_EMBEDDING_BATCH_SIZE
+        self.embedding_batch_tokens = settings.LLM_EMBEDDING_BATCH_TOKENS
+        self.embedding_max_input_tokens = settings.LLM_EMBEDDING_MAX_INPUT_TOKENS
+        self.embedding_concurrency = settings.LLM_EMBEDDING_CONCURRENCY
+        self.embedding_cache = embedding_cache
+        self._token_counter = None
+
+    def _build_messages(
+        self, messages: List[Dict[str, str]], context: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        system_message = (
+            f"You are Cloud Companion, an AI assistant for cloud troubleshooting. "
+            f"Use the following context to provide step-by-step solutions:\n{context}"
+            if context
+            else "You are Cloud Companion, an AI assistant for cloud troubleshooting."
+        )
+        return [{"role": "system", "content": system_message}, *messages]
+
+    def _completion_args(self, messages: List[Dict[str, str]], **overrides) -> Dict[str, Any]:
+        return {
+            "model": f"{self.provider}/{self.model}",
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "api_base": self.base_url if self.provider == "ollama" else None,
+            "api_key": self.api_key or "not-needed",
+            **overrides,
+        }
 
     async def generate_response(
         self,
@@ -23,25 +61,8 @@ class LLMService:
         try:
             from litellm import acompletion
 
-            system_message = (
-                f"You are Cloud Companion, an AI assistant for cloud troubleshooting. "
-                f"Use the following context to provide step-by-step solutions:\n{context}"
-                if context
-                else "You are Cloud Companion, an AI assistant for cloud troubleshooting."
-            )
-
-            formatted_messages = [
-                {"role": "system", "content": system_message},
-                *messages,
-            ]
-
             response = await acompletion(
-                model=f"{self.provider}/{self.model}",
-                messages=formatted_messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                api_base=self.base_url if self.provider == "ollama" else None,
-                api_key=self.api_key or "not-needed",
+                **self._completion_args(self._build_messages(messages, context))
             )
 
             return response.choices[0].message.content
@@ -49,18 +70,173 @@ class LLMService:
             logger.error(f"LLM generation error: {str(e)}")
             raise LLMError(f"Failed to generate response: {str(e)}")
 
+    async def summarize_conversation(
+        self, summary: Optional[str], messages: List[Dict[str, str]]
+    ) -> str:
+        """Fold `messages` into the running `summary` of a conversation."""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = [
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {
+                "role": "user",
+                "content": f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}",
+            },
+        ]
+        try:
+            from litellm import acompletion
+
+            response = await acompletion(
+                **self._completion_args(prompt, max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS)
+            )
+
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.error(f"LLM summarization error: {str(e)}")
+            raise LLMError(f"Failed to summarize conversation: {str(e)}")
+
+    async def stream_response(
+        self,
+        messages: List[Dict[str, str]],
+        context: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Yield the completion as text deltas as the model produces them."""
+        try:
+            from litellm import acompletion
+
+            response = await acompletion(
+                **self._completion_args(self._build_messages(messages, context), stream=True)
+            )
+
+            try:
+                async for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+            finally:
+                # Runs on early close/cancellation too: drop the upstream
+                # connection so the model server stops generating.
+                await _close_stream(response)
+        except Exception as e:
+            logger.error(f"LLM streaming error: {str(e)}")
+            raise LLMError(f"Failed to stream response: {str(e)}")
+
+    @property
+    def embedding_model_id(self) -> str:
+        return f"{self.provider}/{self.embedding_model}"
+
     async def create_embeddings(self, text: str) -> List[float]:
+        vectors = await self.create_embeddings_batch([text])
+        return vectors[0]
+
+    async def create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed many texts with few model round trips.
+
+        Texts are packed into chunks bounded by `LLM_EMBEDDING_BATCH_SIZE`
+        items and `LLM_EMBEDDING_BATCH_TOKENS` (estimated) tokens, and chunks
+        run with at most `LLM_EMBEDDING_CONCURRENCY` requests in flight.
+        Vectors are returned in the order of `texts`. With an embedding cache
+        configured, only texts the cache has not seen are sent to the model.
+        """
+        if not texts:
+            return []
+
+        max_chars = self.embedding_max_input_tokens * 4
+        texts = [normalize_text(text)[:max_chars] for text in texts]
+
+        vectors: Dict[str, List[float]] = {}
+        if self.embedding_cache:
+            vectors = await self.embedding_cache.get_many(self.embedding_model_id, texts)
+
+        missing = list(dict.fromkeys(text for text in texts if text not in vectors))
+        if missing:
+            chunks = self._chunk_for_embedding(missing)
+            semaphore = asyncio.Semaphore(self.embedding_concurrency)
+
+            async def embed_chunk(chunk: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    chunk_vectors = await self._embed(chunk)
+                # A short response would shift every later vector onto the wrong text
+                if len(chunk_vectors) != len(chunk):
+                    raise LLMError(
+                        "Embedding response does not match the request",
+                        {"inputs": len(chunk), "embeddings": len(chunk_vectors)},
+                    )
+                return chunk_vectors
+
+            results = await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks))
+            embedded = dict(
+                zip(missing, (v for chunk_vectors in results for v in chunk_vectors), strict=True)
+            )
+            if self.embedding_cache:
+                await self.embedding_cache.put_many(self.embedding_model_id, embedded)
+            vectors.update(embedded)
+
+        return [vectors[text] for text in texts]
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        # ~4 characters per token is close enough for budgeting requests
+        return len(text) // 4 + 1
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens in `text` for the chat model, estimated if no tokenizer is available."""
+        if not text:
+            return 0
+        if self._token_counter is None:
+            try:
+                from litellm import token_counter
+
+                self._token_counter = token_counter
+            except ImportError:
+                self._token_counter = False
+        if self._token_counter:
+            try:
+                return self._token_counter(model=self.model, text=text)
+            except Exception as e:
+                logger.debug(f"Token counting failed, estimating instead: {str(e)}")
+                self._token_counter = False
+        return self.estimate_tokens(text)
+
+    def prompt_tokens(self, messages: List[Dict[str, str]], context: Optional[str] = None) -> int:
+        return sum(
+            self.count_tokens(m["content"] or "") for m in self._build_messages(messages, context)
+        )
+
+    def _chunk_for_embedding(self, texts: List[str]) -> List[List[str]]:
+        chunks: List[List[str]] = []
+        chunk: List[str] = []
+        chunk_tokens = 0
+
+        for text in texts:
+            tokens = self.estimate_tokens(text)
+            if chunk and (
+                len(chunk) >= self.embedding_batch_size
+                or chunk_tokens + tokens > self.embedding_batch_tokens
+            ):
+                chunks.append(chunk)
+                chunk, chunk_tokens = [], 0
+            chunk.append(text)
+            chunk_tokens += tokens
+
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    async def _embed(self, inputs: List[str]) -> List[List[float]]:
         try:
             from litellm import aembedding
 
             response = await aembedding(
-                model=f"{self.provider}/embedding",
-                input=[text],
+                model=self.embedding_model_id,
+                input=inputs,
                 api_base=self.base_url if self.provider == "ollama" else None,
                 api_key=self.api_key or "not-needed",
             )
 
-            return response.data[0].embedding
+            data = sorted(response.data, key=lambda d: _field(d, "index") or 0)
+            return [_field(d, "embedding") for d in data]
         except Exception as e:
             logger.error(f"Embedding generation error: {str(e)}")
             raise LLMError(f"Failed to generate embeddings: {str(e)}")
@@ -72,3 +248,20 @@ class LLMService:
         except Exception as e:
             logger.error(f"LLM health check failed: {str(e)}")
         return False
+
+
+def _field(item: Any, name: str) -> Any:
+    # litellm returns embedding entries as dicts or objects depending on provider
+    return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+
+async def _close_stream(response: Any) -> None:
+    # litellm wraps the provider stream; close whichever layer supports it
+    for stream in (response, getattr(response, "completion_stream", None)):
+        close = getattr(stream, "aclose", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception as e:
+                logger.debug(f"Failed to close LLM stream: {str(e)}")
+            return
@@ -1,11 +1,14 @@
+from contextlib import asynccontextmanager
 from app.core import logging
-from neo4j import AsyncGraphDatabase, Query
+from neo4j import AsyncGraphDatabase, Query, READ_ACCESS, WRITE_ACCESS
 from app.core.config import settings
 from app.core.exceptions import DatabaseError
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 logger = logging.get_logger("neo4j")
 
+Statement = Tuple[str, Optional[Dict[str, Any]]]
+
 
 class Neo4jService:
     def __init__(self):
@@ -13,11 +16,26 @@ class Neo4jService:
         self.user = settings.NEO4J_USER
         self.password = settings.NEO4J_PASSWORD
         self.database = settings.NEO4J_DATABASE
+        self.max_connection_pool_size = settings.NEO4J_MAX_CONNECTION_POOL_SIZE
+        self.connection_acquisition_timeout = settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT
+        self.max_connection_lifetime = settings.NEO4J_MAX_CONNECTION_LIFETIME
+        self.fetch_size = settings.NEO4J_FETCH_SIZE
         self.driver = None
+        self._active_sessions = 0
+        self._peak_active_sessions = 0
 
     async def connect(self) -> None:
+        if self.driver:
+            return
+
         try:
-            self.driver = AsyncGraphDatabase.driver(self.uri, auth=(self.user, self.password))
+            self.driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                max_connection_pool_size=self.max_connection_pool_size,
+                connection_acquisition_timeout=self.connection_acquisition_timeout,
+                max_connection_lifetime=self.max_connection_lifetime,
+            )
             await self.driver.verify_connectivity()
             logger.info("Connected to Neo4j")
         except Exception as e:
@@ -27,8 +45,22 @@ class Neo4jService:
     async def close(self) -> None:
         if self.driver:
             await self.driver.close()
+            self.driver = None
             logger.info("Disconnected from Neo4j")
 
+    @asynccontextmanager
+    async def session(self, **kwargs):
+        if not self.driver:
+            raise DatabaseError("Neo4j driver not initialized")
+
+        self._active_sessions += 1
+        self._peak_active_sessions = max(self._peak_active_sessions, self._active_sessions)
+        try:
+            async with self.driver.session(database=self.database, **kwargs) as session:
+                yield session
+        finally:
+            self._active_sessions -= 1
+
     async def execute_query(
         self, query: str | Query, parameters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
@@ -36,7 +68,7 @@ class Neo4jService:
             raise DatabaseError("Neo4j driver not initialized")
 
         try:
-            async with self.driver.session(database=self.database) as session:
+            async with self.session() as session:
                 result = await session.run(query, parameters or {})
                 records = await result.fetch(-1)
                 return [record.data() for record in records]
@@ -44,13 +76,89 @@ class Neo4jService:
             logger.error(f"Neo4j query error: {str(e)}")
             raise DatabaseError("Database query failed", {"error": str(e)})
 
+    async def iter_query(
+        self,
+        query: str | Query,
+        parameters: Optional[Dict[str, Any]] = None,
+        fetch_size: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield records lazily instead of materializing the whole result.
+
+        The driver pulls `fetch_size` records per round trip, so memory use is
+        bounded by the batch size rather than the result size. The session is
+        held open until the iterator is exhausted or closed.
+        """
+        if not self.driver:
+            raise DatabaseError("Neo4j driver not initialized")
+
+        try:
+            async with self.session(
+                default_access_mode=READ_ACCESS,
+                fetch_size=fetch_size or self.fetch_size,
+            ) as session:
+                result = await session.run(query, parameters or {})
+                async for record in result:
+                    yield record.data()
+        except Exception as e:
+            logger.error(f"Neo4j streaming query error: {str(e)}")
+            raise DatabaseError("Database query failed", {"error": str(e)})
+
+    async def read(
+        self, query: str, parameters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        results = await self.read_many([(query, parameters)])
+        return results[0]
+
+    async def write(
+        self, query: str, parameters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        results = await self.write_many([(query, parameters)])
+        return results[0]
+
+    async def read_many(self, statements: Sequence[Statement]) -> List[List[Dict[str, Any]]]:
+        """Run several read statements in one managed read transaction.
+
+        Read transactions are routed to followers/read replicas when the
+        driver is connected through a routing (``neo4j://``) URI.
+        """
+        return await self._run_transaction(READ_ACCESS, statements)
+
+    async def write_many(self, statements: Sequence[Statement]) -> List[List[Dict[str, Any]]]:
+        """Run several write statements in one managed write transaction."""
+        return await self._run_transaction(WRITE_ACCESS, statements)
+
+    async def _run_transaction(
+        self, access_mode: str, statements: Sequence[Statement]
+    ) -> List[List[Dict[str, Any]]]:
+        if not self.driver:
+            raise DatabaseError("Neo4j driver not initialized")
+
+        try:
+            async with self.session(default_access_mode=access_mode) as session:
+                if access_mode == READ_ACCESS:
+                    return await session.execute_read(self._run_statements, statements)
+                return await session.execute_write(self._run_statements, statements)
+        except Exception as e:
+            logger.error(f"Neo4j transaction error: {str(e)}")
+            raise DatabaseError("Database transaction failed", {"error": str(e)})
+
+    @staticmethod
+    async def _run_statements(tx, statements: Sequence[Statement]) -> List[List[Dict[str, Any]]]:
+        # Managed transactions are retried on transient errors, so this must
+        # stay free of side effects outside the transaction.
+        results = []
+        for query, parameters in statements:
+            result = await tx.run(query, parameters or {})
+            results.append(await result.data())
+        return results
+
     async def create_node(self, label: str, properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         query = f"""
         CREATE (n:{label} $props)
         RETURN n
         """
         try:
-            results = await self.execute_query(query, {"props": properties})
+            results = await self.write(query, {"props": properties})
             return results[0]["n"] if results else None
         except Exception as e:
             logger.error(f"Failed to create node: {str(e)}")
@@ -60,12 +168,32 @@ class Neo4jService:
         props_match = ", ".join([f"{k}: ${k}" for k in properties.keys()])
         query = f"MATCH (n:{label} {{{props_match}}}) RETURN n"
         try:
-            results = await self.execute_query(query, properties)
+            results = await self.read(query, properties)
             return results[0]["n"] if results else None
         except Exception as e:
             logger.error(f"Failed to find node: {str(e)}")
             raise
 
+    def pool_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "max_size": self.max_connection_pool_size,
+            "active_sessions": self._active_sessions,
+            "peak_active_sessions": self._peak_active_sessions,
+        }
+
+        # The driver exposes no public pool metrics, so read its pool defensively.
+        pool = getattr(self.driver, "_pool", None)
+        try:
+            connections = [c for conns in pool.connections.values() for c in conns]
+            in_use = sum(1 for c in connections if c.in_use)
+            stats["open_connections"] = len(connections)
+            stats["in_use_connections"] = in_use
+            stats["utilization"] = round(in_use / self.max_connection_pool_size, 4)
+        except Exception:
+            pass
+
+        return stats
+
     async def health_check(self) -> bool:
         try:
             if self.driver:
@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.models.graph import CrawlJob
+from app.services.neo4j import Neo4jService
+
+
+class CrawlJobRepository:
+    """Persistence for crawl scheduler state (`:CrawlJob` per `:Account`)."""
+
+    def __init__(self, driver: Neo4jService):
+        self.driver = driver
+
+    async def list_unscheduled_accounts(self) -> List[Dict[str, Any]]:
+        query = """
+        MATCH (o:Organization)-[:OWNS]->(a:Account)
+        WHERE NOT (a)-[:HAS_CRAWL_JOB]->(:CrawlJob)
+        RETURN o.id AS org_id, a.provider AS provider, a.account_id AS account_id
+        """
+        return await self.driver.read(query)
+
+    async def create_jobs(self, jobs: List[CrawlJob]) -> None:
+        query = """
+        UNWIND $jobs AS job
+        MATCH (o:Organization {id: job.org_id})-[:OWNS]->(a:Account {
+            provider: job.provider,
+            account_id: job.account_id
+        })
+        MERGE (j:CrawlJob {id: job.id})
+        ON CREATE SET j += job
+        MERGE (a)-[:HAS_CRAWL_JOB]->(j)
+        """
+        await self.driver.write(query, {"jobs": [job.to_dict() for job in jobs]})
+
+    async def list_jobs(self, org_id: Optional[str] = None) -> List[CrawlJob]:
+        query = """
+        MATCH (j:CrawlJob)
+        WHERE $org_id IS NULL OR j.org_id = $org_id
+        RETURN j
+        ORDER BY j.next_run_at
+        """
+        results = await self.driver.read(query, {"org_id": org_id})
+        return [CrawlJob(**r["j"]) for r in results]
+
+    async def get_job(self, job_id: str) -> CrawlJob | None:
+        query = """
+        MATCH (j:CrawlJob {id: $id})
+        RETURN j
+        """
+        results = await self.driver.read(query, {"id": job_id})
+        return CrawlJob(**results[0]["j"]) if results else None
+
+    async def claim_job(
+        self,
+        job_id: str,
+        owner: str,
+        now: datetime,
+        lease_expires_at: datetime,
+        force: bool = False,
+    ) -> CrawlJob | None:
+        """Atomically take the job lease; returns None if another worker holds it.
+
+        Writing `claim_lock` takes the node's write lock before the lease is
+        checked, so concurrent claims serialize on it and every claim after
+        the first sees the lease the winner wrote. Unless `force` is set, the
+        job must also still be due: a worker that listed it before another
+        one ran it and moved `next_run_at` on gets None.
+        """
+        query = """
+        MATCH (j:CrawlJob {id: $id})
+        SET j.claim_lock = true
+        REMOVE j.claim_lock
+        WITH j
+        WHERE (j.status <> 'running' OR j.lease_expires_at IS NULL OR j.lease_expires_at < $now)
+          AND ($force OR j.next_run_at <= $now)
+        SET j.status = 'running',
+            j.lease_owner = $owner,
+            j.lease_expires_at = $lease_expires_at,
+            j.last_run_at = $now
+        RETURN j
+        """
+        results = await self.driver.write(
+            query,
+            {
+                "id": job_id,
+                "owner": owner,
+                "now": now.isoformat(),
+                "lease_expires_at": lease_expires_at.isoformat(),
+                "force": force,
+            },
+        )
+        return CrawlJob(**results[0]["j"]) if results else None
+
+    async def save_job(self, job: CrawlJob) -> None:
+        query = """
+        MATCH (j:CrawlJob {id: $id})
+        SET j += $props
+        """
+        await self.driver.write(query, {"id": job.id, "props": job.to_dict()})
+
+    async def trigger_job(self, job_id: str, now: datetime) -> CrawlJob | None:
+        query = """
+        MATCH (j:CrawlJob {id: $id})
+        SET j.next_run_at = $now
+        RETURN j
+        """
+        results = await self.driver.write(query, {"id": job_id, "now": now.isoformat()})
+        return CrawlJob(**results[0]["j"]) if results else None
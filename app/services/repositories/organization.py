@@ -1,11 +1,19 @@
-from typing import List
+from typing import List, Optional
 from app.services.neo4j import Neo4jService
+from app.services.cache import TTLCache, CacheInvalidationChannel, cached
 from app.models.graph import Organization, APIKey, Account
 
 
 class OrganizationRepository:
-    def __init__(self, driver: Neo4jService):
+    def __init__(
+        self,
+        driver: Neo4jService,
+        api_key_cache: Optional[TTLCache] = None,
+        api_key_invalidation: Optional[CacheInvalidationChannel] = None,
+    ):
         self.driver = driver
+        self.api_key_cache = api_key_cache
+        self.api_key_invalidation = api_key_invalidation
 
     # ---------------------------------------------------------------------------
     # Organization methods
@@ -16,7 +24,7 @@ class OrganizationRepository:
         CREATE (o:Organization $props)
         RETURN o
         """
-        results = await self.driver.execute_query(query, {"props": org.to_dict()})
+        results = await self.driver.write(query, {"props": org.to_dict()})
         return Organization(**results[0]["o"]) if results else None
 
     async def get_org_by_name(self, name: str) -> Organization | None:
@@ -24,7 +32,7 @@ class OrganizationRepository:
         MATCH (o:Organization {name: $name})
         RETURN o
         """
-        results = await self.driver.execute_query(query, {"name": name})
+        results = await self.driver.read(query, {"name": name})
         return Organization(**results[0]["o"]) if results else None
 
     async def list_organizations(self) -> List[Organization]:
@@ -32,7 +40,7 @@ class OrganizationRepository:
         MATCH (o:Organization)
         RETURN o
         """
-        results = await self.driver.execute_query(query)
+        results = await self.driver.read(query)
         return [Organization(**r["o"]) for r in results]
 
     async def delete_org(self, org_id: str) -> None:
@@ -40,7 +48,7 @@ class OrganizationRepository:
         MATCH (o:Organization {id: $id})
         DETACH DELETE o
         """
-        await self.driver.execute_query(query, {"id": org_id})
+        await self.driver.write(query, {"id": org_id})
 
     # ---------------------------------------------------------------------------
     # APIKey methods
@@ -53,9 +61,9 @@ class OrganizationRepository:
         CREATE (o)-[:HAS_API_KEY]->(k)
         RETURN k
         """
-        results = await self.driver.execute_query(
-            query, {"org_id": key.org_id, "props": key.to_dict()}
-        )
+        results = await self.driver.write(query, {"org_id": key.org_id, "props": key.to_dict()})
+        # The hash may have been cached as a negative lookup
+        await self._invalidate_api_key(key.hashed_key)
         return APIKey(**results[0]["k"]) if results else None
 
     async def list_api_keys(self, org_id: str) -> List[APIKey]:
@@ -63,24 +71,39 @@ class OrganizationRepository:
         MATCH (o:Organization {id: $org_id})-[:HAS_API_KEY]->(k)
         RETURN k
         """
-        results = await self.driver.execute_query(query, {"org_id": org_id})
+        results = await self.driver.read(query, {"org_id": org_id})
         return [APIKey(**r["k"]) for r in results]
 
     async def revoke_api_key(self, key_id: str):
         query = """
         MATCH (k:APIKey {id: $id})
         SET k.is_active = false
+        RETURN k.hashed_key AS hashed_key
         """
-        await self.driver.execute_query(query, {"id": key_id})
+        results = await self.driver.write(query, {"id": key_id})
+        for r in results:
+            await self._invalidate_api_key(r["hashed_key"])
 
     async def find_api_key_by_hash(self, hashed: str) -> APIKey | None:
+        if self.api_key_cache is None:
+            return await self._load_api_key_by_hash(hashed)
+
+        return await cached(self.api_key_cache, hashed, lambda: self._load_api_key_by_hash(hashed))
+
+    async def _load_api_key_by_hash(self, hashed: str) -> APIKey | None:
         query = """
         MATCH (k:APIKey {hashed_key: $hash})
         RETURN k
         """
-        results = await self.driver.execute_query(query, {"hash": hashed})
+        results = await self.driver.read(query, {"hash": hashed})
         return APIKey(**results[0]["k"]) if results else None
 
+    async def _invalidate_api_key(self, hashed: str) -> None:
+        if self.api_key_cache is not None:
+            self.api_key_cache.invalidate(hashed)
+        if self.api_key_invalidation is not None:
+            await self.api_key_invalidation.publish()
+
     # ---------------------------------------------------------------------------
     # Account methods
     # ---------------------------------------------------------------------------
@@ -92,7 +115,7 @@ class OrganizationRepository:
         CREATE (o)-[:OWNS]->(c)
         RETURN c
         """
-        results = await self.driver.execute_query(
+        results = await self.driver.write(
             query,
             {
                 "org_id": account.org_id,
@@ -106,5 +129,5 @@ class OrganizationRepository:
         MATCH (o:Organization {id: $org_id})-[:OWNS]->(c)
         RETURN c
         """
-        results = await self.driver.execute_query(query, {"org_id": org_id})
+        results = await self.driver.read(query, {"org_id": org_id})
         return [Account(**r["c"]) for r in results]
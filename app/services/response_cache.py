@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def context_fingerprint(context: Optional[str], history: Sequence[Dict[str, str]]) -> str:
+    """Hash of everything besides the question that shapes an answer."""
+    payload = json.dumps({"context": context, "history": list(history)}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _unit(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+class SemanticResponseCache:
+    """In-process cache of LLM answers, matched by question similarity.
+
+    Entries are bucketed by (org id, context fingerprint): an answer is only
+    reused when the retrieved context and conversation history are
+    identical, and the new question's embedding is within `threshold`
+    cosine similarity of the cached one. Only vectors in the matching bucket
+    are compared, so lookups stay cheap as the cache grows. Entries expire
+    after `ttl` seconds and the least recently used are evicted beyond
+    `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600.0, threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        # entry id -> (bucket, expires_at, unit vector, answer)
+        self._entries: "OrderedDict[int, Tuple[Tuple[str, str], float, List[float], str]]" = (
+            OrderedDict()
+        )
+        self._buckets: Dict[Tuple[str, str], Set[int]] = {}
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, org_id: str, fingerprint: str, vector: Sequence[float]) -> Optional[str]:
+        bucket = (org_id, fingerprint)
+        query = _unit(vector)
+        now = time.monotonic()
+        best_id, best_score = None, self.threshold
+
+        for entry_id in list(self._buckets.get(bucket, ())):
+            _, expires_at, cached, _ = self._entries[entry_id]
+            if expires_at <= now:
+                self._remove(entry_id)
+                continue
+            if len(cached) != len(query):
+                # Cached under a different embedding model; it can never match
+                continue
+            score = sum(a * b for a, b in zip(query, cached, strict=True))
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(best_id)
+        self.hits += 1
+        logger.debug(f"Response cache hit for org {org_id} (similarity {best_score:.3f})")
+        return self._entries[best_id][3]
+
+    def set(self, org_id: str, fingerprint: str, vector: Sequence[float], answer: str) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+
+        bucket = (org_id, fingerprint)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (bucket, time.monotonic() + self.ttl, _unit(vector), answer)
+        self._buckets.setdefault(bucket, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_org(self, org_id: str) -> None:
+        for bucket in [b for b in self._buckets if b[0] == org_id]:
+            for entry_id in list(self._buckets[bucket]):
+                self._remove(entry_id)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._buckets.clear()
+
+    def _remove(self, entry_id: int) -> None:
+        bucket = self._entries.pop(entry_id)[0]
+        ids = self._buckets[bucket]
+        ids.discard(entry_id)
+        if not ids:
+            del self._buckets[bucket]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -1,79 +1,434 @@
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+from urllib.parse import urlparse
 from app.core.config import settings
 from app.core.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class WeaviateService:
+    """Vector store access through the async Weaviate v4 client.
+
+    Every call awaits the client instead of blocking the event loop, runs
+    with the configured timeouts, and retries connection errors and timeouts
+    with exponential backoff. Bulk imports use the v4 batcher on a second,
+    sync client in a worker thread, since the async client has no batcher.
+    """
+
     def __init__(self):
         self.url = settings.WEAVIATE_URL
+        self.grpc_port = settings.WEAVIATE_GRPC_PORT
+        self.api_key = settings.WEAVIATE_API_KEY
+        self.batch_size = settings.WEAVIATE_BATCH_SIZE
+        self.batch_concurrency = settings.WEAVIATE_BATCH_CONCURRENCY
+        self.inactive_tenant_status = settings.WEAVIATE_INACTIVE_TENANT_STATUS
+        self.max_retries = settings.WEAVIATE_MAX_RETRIES
+        self.retry_backoff = settings.WEAVIATE_RETRY_BACKOFF_SECONDS
         self.client = None
+        self.batch_client = None
 
     async def connect(self) -> None:
+        if self.client is not None:
+            return
+
         try:
             import weaviate
 
-            self.client = weaviate.connect_to_local(
-                host=self.url.replace("http://", "").split(":")[0],
-                grpc_port=int(self.url.split(":")[-1]) + 1000 if ":" in self.url else 50051,
+            client = weaviate.use_async_with_local(**self._connection_args())
+            await self._with_retries(client.connect)
+            # Imports go through the v4 batcher, which only the sync client has
+            self.batch_client = await asyncio.to_thread(
+                weaviate.connect_to_local, **self._connection_args()
             )
+            self.client = client
             logger.info("Connected to Weaviate")
         except Exception as e:
             logger.error(f"Failed to connect to Weaviate: {str(e)}")
             raise DatabaseError("Failed to connect to Weaviate", {"error": str(e)})
 
     async def close(self) -> None:
+        if self.batch_client:
+            await asyncio.to_thread(self.batch_client.close)
+            self.batch_client = None
         if self.client:
-            self.client.close()
+            await self.client.close()
+            self.client = None
             logger.info("Disconnected from Weaviate")
 
+    def _connection_args(self) -> Dict[str, Any]:
+        from weaviate.classes.init import AdditionalConfig, Timeout
+
+        url = urlparse(self.url)
+        return {
+            "host": url.hostname or "localhost",
+            "port": url.port or 8080,
+            "grpc_port": self.grpc_port,
+            "auth_credentials": self.api_key or None,
+            "additional_config": AdditionalConfig(
+                timeout=Timeout(
+                    init=settings.WEAVIATE_TIMEOUT_INIT_SECONDS,
+                    query=settings.WEAVIATE_TIMEOUT_QUERY_SECONDS,
+                    insert=settings.WEAVIATE_TIMEOUT_INSERT_SECONDS,
+                )
+            ),
+        }
+
+    async def _with_retries(self, operation: Callable[[], Awaitable[T]]) -> T:
+        from weaviate.exceptions import (
+            WeaviateConnectionError,
+            WeaviateGRPCUnavailableError,
+            WeaviateTimeoutError,
+        )
+
+        retryable = (
+            WeaviateConnectionError,
+            WeaviateGRPCUnavailableError,
+            WeaviateTimeoutError,
+            asyncio.TimeoutError,
+        )
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await operation()
+            except retryable as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * 2**attempt
+                logger.warning(f"Weaviate call failed ({str(e)}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def _collection(self, name: str, tenant: Optional[str] = None):
+        if not self.client:
+            raise DatabaseError("Weaviate client not initialized")
+
+        collection = self.client.collections.get(name)
+        return collection.with_tenant(tenant) if tenant else collection
+
+    # ---------------------------------------------------------------------------
+    # Schema and tenants
+    # ---------------------------------------------------------------------------
+
+    async def ensure_collection(
+        self,
+        name: str,
+        properties: Dict[str, str],
+        keyword_properties: Sequence[str] = (),
+        multi_tenant: bool = True,
+    ) -> bool:
+        """Create a collection with self-provided vectors if it does not exist.
+
+        `properties` maps property names to Weaviate data types ("text",
+        "int", ...). `keyword_properties` are tokenized as whole values so
+        they can be filtered on exactly. Multi-tenant collections create
+        tenants on first write and reactivate inactive tenants on access.
+        """
+        if not self.client:
+            raise DatabaseError("Weaviate client not initialized")
+
+        try:
+            from weaviate.classes.config import Configure, DataType, Property, Tokenization
+
+            if await self._with_retries(lambda: self.client.collections.exists(name)):
+                return False
+
+            await self.client.collections.create(
+                name,
+                properties=[
+                    Property(
+                        name=prop,
+                        data_type=DataType(data_type),
+                        tokenization=Tokenization.FIELD if prop in keyword_properties else None,
+                    )
+                    for prop, data_type in properties.items()
+                ],
+                vector_config=Configure.Vectors.self_provided(),
+                multi_tenancy_config=Configure.multi_tenancy(
+                    enabled=multi_tenant,
+                    auto_tenant_creation=multi_tenant or None,
+                    auto_tenant_activation=multi_tenant or None,
+                ),
+            )
+            logger.info(f"Created Weaviate collection {name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to create collection {name}: {str(e)}")
+            raise DatabaseError("Failed to create Weaviate collection", {"error": str(e)})
+
+    async def list_tenants(self, collection: str) -> Dict[str, str]:
+        """Tenant names and their activity status."""
+        try:
+            target = self._collection(collection)
+            tenants = await self._with_retries(target.tenants.get)
+            return {name: tenant.activity_status.value for name, tenant in tenants.items()}
+        except DatabaseError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to list tenants of {collection}: {str(e)}")
+            raise DatabaseError("Failed to list Weaviate tenants", {"error": str(e)})
+
+    async def ensure_tenants(self, collection: str, tenants: List[str]) -> List[str]:
+        """Create the tenants that do not exist yet; returns the created names."""
+        try:
+            from weaviate.classes.tenants import Tenant
+
+            existing = await self.list_tenants(collection)
+            missing = [name for name in dict.fromkeys(tenants) if name not in existing]
+            if missing:
+                await self._collection(collection).tenants.create([Tenant(name=n) for n in missing])
+                logger.info(f"Created {len(missing)} tenants in {collection}")
+            return missing
+        except DatabaseError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to create tenants in {collection}: {str(e)}")
+            raise DatabaseError("Failed to create Weaviate tenants", {"error": str(e)})
+
+    async def deactivate_tenants(self, collection: str, tenants: List[str]) -> List[str]:
+        """Move active tenants to `WEAVIATE_INACTIVE_TENANT_STATUS`.
+
+        INACTIVE tenants are unloaded from memory but kept on local disk;
+        OFFLOADED tenants are moved to cloud storage (requires an offload
+        module). Either way they are reactivated on their next access.
+        """
+        try:
+            existing = await self.list_tenants(collection)
+            active = [name for name in tenants if existing.get(name) in ("ACTIVE", "HOT")]
+            if not active:
+                return []
+
+            target = self._collection(collection).tenants
+            if self.inactive_tenant_status == "OFFLOADED":
+                await target.offload(active)
+            else:
+                await target.deactivate(active)
+            logger.info(
+                f"Set {len(active)} tenants in {collection} to {self.inactive_tenant_status}"
+            )
+            return active
+        except DatabaseError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to deactivate tenants in {collection}: {str(e)}")
+            raise DatabaseError("Failed to deactivate Weaviate tenants", {"error": str(e)})
+
+    # ---------------------------------------------------------------------------
+    # Objects
+    # ---------------------------------------------------------------------------
+
     async def add_vector(
         self,
         collection: str,
         properties: Dict[str, Any],
         vector: List[float],
+        uuid: Optional[str] = None,
+        tenant: Optional[str] = None,
     ) -> Optional[str]:
         if not self.client:
             raise DatabaseError("Weaviate client not initialized")
 
         try:
-            uuid = self.client.data_object.create(
-                data_object=properties,
-                class_name=collection,
-                vector=vector,
+            target = self._collection(collection, tenant)
+            result = await self._with_retries(
+                lambda: target.data.insert(properties=properties, vector=vector, uuid=uuid)
             )
-            return uuid
+            return str(result)
         except Exception as e:
             logger.error(f"Failed to add vector: {str(e)}")
             raise DatabaseError("Failed to add vector to Weaviate", {"error": str(e)})
 
+    async def batch_upsert(
+        self,
+        collection: str,
+        objects: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        concurrent_requests: Optional[int] = None,
+        tenant: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Write objects with the v4 batcher.
+
+        Each object is a dict with `uuid`, `properties` and `vector`; an
+        object whose uuid already exists is replaced. A `batch_size` of 0
+        lets the client size batches dynamically. Returns counts, the objects
+        Weaviate rejected and throughput.
+        """
+        if not self.batch_client:
+            raise DatabaseError("Weaviate client not initialized")
+        if not objects:
+            return {
+                "inserted": 0,
+                "failed": 0,
+                "failed_objects": [],
+                "seconds": 0.0,
+                "objects_per_second": 0.0,
+            }
+
+        batch_size = self.batch_size if batch_size is None else batch_size
+        concurrent_requests = concurrent_requests or self.batch_concurrency
+
+        started = time.perf_counter()
+        try:
+            # The batcher is blocking and runs its own sender threads
+            errors = await asyncio.to_thread(
+                self._run_batch, collection, tenant, objects, batch_size, concurrent_requests
+            )
+        except Exception as e:
+            logger.error(f"Failed to batch import into {collection}: {str(e)}")
+            raise DatabaseError("Failed to batch import into Weaviate", {"error": str(e)})
+        elapsed = time.perf_counter() - started
+
+        failed_objects = [{"uuid": str(e.object_.uuid), "message": e.message} for e in errors]
+        if failed_objects:
+            logger.warning(
+                f"{len(failed_objects)} of {len(objects)} objects failed to import "
+                f"into {collection}: {failed_objects[0]['message']}"
+            )
+
+        return {
+            "inserted": len(objects) - len(failed_objects),
+            "failed": len(failed_objects),
+            "failed_objects": failed_objects,
+            "seconds": round(elapsed, 4),
+            "objects_per_second": round(len(objects) / elapsed, 1) if elapsed else 0.0,
+        }
+
+    def _run_batch(
+        self,
+        collection: str,
+        tenant: Optional[str],
+        objects: List[Dict[str, Any]],
+        batch_size: int,
+        concurrent_requests: int,
+    ) -> List[Any]:
+        target = self.batch_client.collections.get(collection)
+        if tenant:
+            target = target.with_tenant(tenant)
+        if batch_size == 0:
+            batcher = target.batch.dynamic()
+        else:
+            batcher = target.batch.fixed_size(
+                batch_size=batch_size, concurrent_requests=concurrent_requests
+            )
+
+        with batcher as batch:
+            for obj in objects:
+                batch.add_object(
+                    properties=obj["properties"], uuid=obj["uuid"], vector=obj["vector"]
+                )
+        return target.batch.failed_objects
+
+    async def delete_objects(
+        self, collection: str, uuids: List[str], tenant: Optional[str] = None
+    ) -> int:
+        if not self.client:
+            raise DatabaseError("Weaviate client not initialized")
+        if not uuids:
+            return 0
+
+        try:
+            from weaviate.classes.query import Filter
+
+            deleted = 0
+            target = self._collection(collection, tenant)
+            # delete_many is capped by the server's QUERY_MAXIMUM_RESULTS
+            for i in range(0, len(uuids), 1000):
+                where = Filter.by_id().contains_any(uuids[i : i + 1000])
+                result = await self._with_retries(
+                    lambda where=where: target.data.delete_many(where=where)
+                )
+                deleted += result.successful
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to delete objects: {str(e)}")
+            raise DatabaseError("Failed to delete objects from Weaviate", {"error": str(e)})
+
     async def search_vectors(
         self,
         collection: str,
         vector: List[float],
         limit: int = 10,
+        tenant: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         if not self.client:
             raise DatabaseError("Weaviate client not initialized")
 
         try:
-            results = (
-                self.client.query.get(collection)
-                .with_near_vector({"vector": vector})
-                .with_limit(limit)
-                .do()
+            from weaviate.classes.query import MetadataQuery
+
+            target = self._collection(collection, tenant)
+            response = await self._with_retries(
+                lambda: target.query.near_vector(
+                    near_vector=vector, limit=limit, return_metadata=MetadataQuery(distance=True)
+                )
             )
-            return results.get("data", {}).get("Get", {}).get(collection, [])
+            return [
+                {**obj.properties, "uuid": str(obj.uuid), "distance": obj.metadata.distance}
+                for obj in response.objects
+            ]
         except Exception as e:
             logger.error(f"Failed to search vectors: {str(e)}")
             raise DatabaseError("Failed to search vectors in Weaviate", {"error": str(e)})
 
+    async def hybrid_search(
+        self,
+        collection: str,
+        query: str,
+        vector: Optional[List[float]] = None,
+        alpha: float = 0.5,
+        filters: Optional[Dict[str, Any]] = None,
+        properties: Optional[List[str]] = None,
+        limit: int = 10,
+        tenant: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Combined BM25 and vector search.
+
+        `alpha` weights the two (0 is pure keyword, 1 pure vector). `filters`
+        maps property names to a value (equality) or a list of values (any
+        of); filters are applied before ranking. Only `properties` are
+        returned, plus the object uuid and its fused score.
+        """
+        if not self.client:
+            raise DatabaseError("Weaviate client not initialized")
+
+        try:
+            from weaviate.classes.query import Filter, MetadataQuery
+
+            conditions = []
+            for prop, value in (filters or {}).items():
+                if value is None or value == []:
+                    continue
+                if isinstance(value, (list, tuple, set)):
+                    conditions.append(Filter.by_property(prop).contains_any(list(value)))
+                else:
+                    conditions.append(Filter.by_property(prop).equal(value))
+
+            target = self._collection(collection, tenant)
+            response = await self._with_retries(
+                lambda: target.query.hybrid(
+                    query=query,
+                    vector=vector,
+                    alpha=alpha,
+                    filters=Filter.all_of(conditions) if conditions else None,
+                    limit=limit,
+                    return_properties=properties,
+                    return_metadata=MetadataQuery(score=True),
+                )
+            )
+            return [
+                {**obj.properties, "uuid": str(obj.uuid), "score": obj.metadata.score}
+                for obj in response.objects
+            ]
+        except Exception as e:
+            logger.error(f"Failed to run hybrid search: {str(e)}")
+            raise DatabaseError("Failed to run hybrid search in Weaviate", {"error": str(e)})
+
     async def health_check(self) -> bool:
         try:
             if self.client:
-                return self.client.is_ready()
+                return await self.client.is_ready()
         except Exception as e:
             logger.error(f"Weaviate health check failed: {str(e)}")
         return False
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Just enough of an HTTP and WebSocket client to drive the ASGI app in-process.
+# Unlike httpx's ASGITransport, response chunks are seen as the app sends them,
+# so time-to-first-token can be measured on streamed replies.
+
+
+def _scope(scope_type: str, path: str, headers: Dict[str, str], query: str = "") -> Dict[str, Any]:
+    return {
+        "type": scope_type,
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "scheme": "ws" if scope_type == "websocket" else "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+        "subprotocols": [],
+    }
+
+
+async def asgi_request(
+    app: Callable,
+    method: str,
+    path: str,
+    headers: Dict[str, str],
+    body: bytes = b"",
+    query: str = "",
+    on_chunk: Optional[Callable[[bytes], None]] = None,
+) -> Tuple[int, Dict[str, str], bytes]:
+    """Send one HTTP request; `on_chunk` is called with each body chunk as it is sent."""
+    scope = _scope("http", path, headers, query)
+    scope["method"] = method
+    finished = asyncio.Event()
+    request_sent = False
+    response: Dict[str, Any] = {"status": None, "headers": {}, "body": []}
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if chunk:
+                response["body"].append(chunk)
+                if on_chunk:
+                    on_chunk(chunk)
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    return response["status"], response["headers"], b"".join(response["body"])
+
+
+class ASGIWebSocket:
+    def __init__(self, app: Callable, path: str, headers: Dict[str, str]):
+        self.app = app
+        self.scope = _scope("websocket", path, headers)
+        self._incoming: asyncio.Queue = asyncio.Queue()
+        self._outgoing: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        self._task = asyncio.create_task(
+            self.app(self.scope, self._incoming.get, self._outgoing.put)
+        )
+        await self._incoming.put({"type": "websocket.connect"})
+        message = await self._outgoing.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"WebSocket rejected: {message}")
+
+    async def send_json(self, data: Any) -> None:
+        await self._incoming.put({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def receive_json(self) -> Any:
+        message = await self._outgoing.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError(f"WebSocket closed: {message.get('reason') or message}")
+        return json.loads(message.get("text") or message["bytes"])
+
+    async def close(self) -> None:
+        await self._incoming.put({"type": "websocket.disconnect", "code": 1000})
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
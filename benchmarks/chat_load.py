@@ -0,0 +1,332 @@
+"""Offline load test for the chat endpoints.
+
+Drives `POST /chat/message` (plain and `stream=true`) and the chat
+WebSocket in-process, with a fake LiteLLM backend, an in-memory stand-in
+for Weaviate and a seeded Neo4j (given with `--uri`, or a container with
+`--testcontainers`). Reports latency percentiles, time to first token,
+requests/second and per-stage retrieval timings at each concurrency level.
+
+    python -m benchmarks.chat_load --uri bolt://localhost:7687 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from app.api.deps import hash_api_key
+from app.core.application import Application
+from app.core.config import settings
+from app.core.migrate import run_migrations
+from app.models.graph import APIKey, Organization, utc_now
+from app.services.crawler.base import CloudCrawlerBase
+from benchmarks.asgi import ASGIWebSocket, asgi_request
+from benchmarks.fakes import FakeLiteLLM, InMemoryVectorStore
+from benchmarks.harness import (
+    Report,
+    add_neo4j_arguments,
+    check_baseline,
+    percentile,
+    start_neo4j,
+    summarize,
+)
+from benchmarks.neo4j_suite import SEED_MESSAGES_QUERY, Neo4jSuite, make_resources
+
+logger = logging.getLogger(__name__)
+
+MODES = ["post", "sse", "ws"]
+
+QUESTIONS = [
+    "Which instances in eu-west-1 are stopped?",
+    "Why can't web-{n} reach the internet?",
+    "List the running instances in us-east-1",
+    "What changed on web-{n} recently?",
+    "How do I troubleshoot high latency on the load balancer in front of web-{n}?",
+]
+
+# Every nth request asks about explicitly selected resources instead of searching
+CONTEXT_RESOURCES_EVERY = 4
+
+
+class ChatLoadTest:
+    def __init__(self, application: Application, fastapi_app: Any, prefix: str, resources: int):
+        self.application = application
+        self.app = fastapi_app
+        self.prefix = prefix
+        self.resources = resources
+        self.org_id = f"{prefix}-org-chat"
+        self.account_id = f"{prefix}-acct-chat"
+        self.api_key = f"{prefix}-key"
+        self.conversations: List[str] = []
+        self.retrievals: List[Any] = []
+        self.message_path = fastapi_app.url_path_for("send_message")
+
+    async def seed(self, conversations: int, history: int) -> None:
+        """API key, resources (graph and vector index) and one conversation per worker."""
+        await self.application.repo.organization.create_org(
+            Organization(name=self.org_id, id=self.org_id)
+        )
+        await self.application.repo.organization.create_api_key(
+            APIKey(
+                org_id=self.org_id,
+                name="chat-load",
+                hashed_key=hash_api_key(self.api_key),
+                expires_at=utc_now() + timedelta(days=1),
+            )
+        )
+
+        crawler = CloudCrawlerBase(self.application.neo4j, indexer=self.application.indexer)
+        await crawler.store_resources(
+            self.org_id,
+            self.account_id,
+            make_resources(self.org_id, self.account_id, self.resources),
+        )
+
+        for _ in range(conversations):
+            conversation_id = await self.application.chat.create_conversation(self.org_id)
+            if history:
+                await self.application.neo4j.write(
+                    SEED_MESSAGES_QUERY, {"conv_id": conversation_id, "count": history}
+                )
+            self.conversations.append(conversation_id)
+
+    def record_retrievals(self) -> None:
+        # Keep every Retrieval so stage timings (including "llm") can be read afterwards
+        retrieve = self.application.chat.retrieve
+
+        async def recorded(*args, **kwargs):
+            retrieval = await retrieve(*args, **kwargs)
+            self.retrievals.append(retrieval)
+            return retrieval
+
+        self.application.chat.retrieve = recorded
+
+    def message(self, n: int) -> Dict[str, Any]:
+        resource = n % self.resources
+        payload: Dict[str, Any] = {"content": QUESTIONS[n % len(QUESTIONS)].format(n=resource)}
+        if n % CONTEXT_RESOURCES_EVERY == 0:
+            payload["context_resources"] = [f"{self.account_id}/i-{resource:08x}"]
+        return payload
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"content-type": "application/json", "x-api-key": self.api_key}
+
+    async def post(self, conversation_id: str, payload: Dict[str, Any], stream: bool) -> float:
+        """Send one message; returns the time to the first delta (or the whole reply)."""
+        started = time.perf_counter()
+        first: Optional[float] = None
+
+        def on_chunk(chunk: bytes) -> None:
+            nonlocal first
+            if first is None and b"event: delta" in chunk:
+                first = time.perf_counter() - started
+
+        status, _, body = await asgi_request(
+            self.app,
+            "POST",
+            self.message_path,
+            self.headers,
+            json.dumps({**payload, "conversation_id": conversation_id}).encode(),
+            query="stream=true" if stream else "",
+            on_chunk=on_chunk if stream else None,
+        )
+        if status != 200 or b"event: error" in body:
+            raise RuntimeError(f"Chat request failed ({status}): {body[:200]!r}")
+        return first if first is not None else time.perf_counter() - started
+
+    async def websocket_message(self, socket: ASGIWebSocket, payload: Dict[str, Any]) -> float:
+        started = time.perf_counter()
+        first: Optional[float] = None
+        await socket.send_json(payload)
+        while True:
+            event = await socket.receive_json()
+            if event["type"] == "delta" and first is None:
+                first = time.perf_counter() - started
+            elif event["type"] == "error":
+                raise RuntimeError(f"Chat request failed: {event.get('detail')}")
+            elif event["type"] == "done":
+                return first if first is not None else time.perf_counter() - started
+
+    async def run_level(self, mode: str, concurrency: int, requests: int) -> Dict[str, Any]:
+        latencies: List[float] = []
+        first_tokens: List[float] = []
+        errors: List[str] = []
+        pending = iter(range(requests))
+        self.retrievals.clear()
+
+        async def worker(index: int) -> None:
+            conversation_id = self.conversations[index]
+            socket = None
+            if mode == "ws":
+                path = self.app.url_path_for("websocket_endpoint", conversation_id=conversation_id)
+                socket = ASGIWebSocket(self.app, path, {"x-api-key": self.api_key})
+                await socket.connect()
+            try:
+                for n in pending:
+                    started = time.perf_counter()
+                    try:
+                        if socket is not None:
+                            first = await self.websocket_message(socket, self.message(n))
+                        else:
+                            first = await self.post(conversation_id, self.message(n), mode == "sse")
+                    except Exception as e:
+                        errors.append(str(e))
+                        continue
+                    latencies.append(time.perf_counter() - started)
+                    if mode != "post":
+                        first_tokens.append(first)
+            finally:
+                if socket is not None:
+                    await socket.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        seconds = time.perf_counter() - started
+
+        result = summarize(latencies)
+        result.update(
+            {
+                "concurrency": concurrency,
+                "requests": requests,
+                "errors": len(errors),
+                "seconds": round(seconds, 3),
+                "requests_per_second": round(len(latencies) / seconds, 2) if seconds else 0.0,
+            }
+        )
+        if first_tokens:
+            result["ttft"] = summarize(first_tokens)
+        result["stages"] = self.stage_timings()
+        if errors:
+            logger.warning(f"{len(errors)} {mode} requests failed, e.g. {errors[0]}")
+        return result
+
+    def stage_timings(self) -> Dict[str, Dict[str, float]]:
+        """p50/p95 per retrieval stage, in milliseconds, across the level's requests."""
+        samples: Dict[str, List[float]] = defaultdict(list)
+        for retrieval in self.retrievals:
+            for stage, seconds in retrieval.timings.items():
+                samples[stage].append(seconds)
+        return {
+            stage: {
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+            }
+            for stage, values in sorted(samples.items())
+        }
+
+
+def build_application(llm: FakeLiteLLM, store: InMemoryVectorStore) -> Tuple[Application, Any]:
+    from app.main import create_application
+
+    application = Application(run_scheduler=False)
+    application.weaviate = store
+    application.chat.weaviate = store
+    application.indexer.weaviate = store
+    llm.install()
+
+    fastapi_app = create_application()
+    fastapi_app.state.app = application
+    return application, fastapi_app
+
+
+async def run(args: argparse.Namespace) -> Report:
+    llm = FakeLiteLLM(
+        tokens_per_second=args.tokens_per_second,
+        first_token_seconds=args.first_token_ms / 1000,
+        response_tokens=args.response_tokens,
+        embedding_seconds=args.embedding_ms / 1000,
+    )
+    store = InMemoryVectorStore(search_seconds=args.search_ms / 1000)
+    # The fake embeddings must never reach the app's persistent embedding cache
+    cache_dir = tempfile.TemporaryDirectory(prefix="chat-load-")
+    settings.EMBEDDING_CACHE_PATH = os.path.join(cache_dir.name, "embeddings.sqlite3")
+    application, fastapi_app = build_application(llm, store)
+    # create_application() sets up request logging; keep the output readable
+    logging.getLogger().setLevel(logging.WARNING)
+
+    await application.start()
+    prefix = f"bench-{uuid4().hex[:8]}"
+    try:
+        await run_migrations(application.neo4j)
+        test = ChatLoadTest(application, fastapi_app, prefix, args.resources)
+        await test.seed(max(args.concurrency), args.history)
+        test.record_retrievals()
+
+        report = Report(
+            "chat_load",
+            {
+                "modes": args.modes,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "resources": args.resources,
+                "history": args.history,
+                "tokens_per_second": args.tokens_per_second,
+                "first_token_ms": args.first_token_ms,
+                "response_tokens": args.response_tokens,
+                "embedding_ms": args.embedding_ms,
+                "search_ms": args.search_ms,
+                "response_cache": settings.RESPONSE_CACHE_ENABLED,
+                "embedding_cache": (
+                    "temporary" if settings.EMBEDDING_CACHE_ENABLED else "disabled"
+                ),
+            },
+        )
+        for mode in args.modes:
+            for concurrency in args.concurrency:
+                result = await test.run_level(mode, concurrency, args.requests)
+                report.add(f"{mode}.c{concurrency}", result)
+        report.environment["fake_llm"] = {
+            "completions": llm.completions,
+            "embeddings": llm.embeddings,
+        }
+        return report
+    finally:
+        if not args.keep:
+            await Neo4jSuite(application.neo4j, prefix).cleanup()
+        await application.stop()
+        llm.uninstall()
+        cache_dir.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per level")
+    parser.add_argument("--resources", type=int, default=1_000, help="Resources to seed")
+    parser.add_argument("--history", type=int, default=20, help="Messages per conversation")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--first-token-ms", type=float, default=200.0)
+    parser.add_argument("--response-tokens", type=int, default=60)
+    parser.add_argument("--embedding-ms", type=float, default=0.0)
+    parser.add_argument("--search-ms", type=float, default=5.0)
+    add_neo4j_arguments(parser)
+    parser.add_argument("--keep", action="store_true", help="Don't delete the seeded data")
+    parser.add_argument("--baseline", help="Earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    container = start_neo4j(args)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if container is not None:
+            container.stop()
+    report.write(args.output)
+
+    if args.baseline:
+        check_baseline(args.baseline, report, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
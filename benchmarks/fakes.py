@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import heapq
+import math
+import re
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+VOCABULARY = (
+    "check the security group rules instance subnet route table for the load balancer "
+    "target health and restart the service after confirming the logs show no errors"
+).split()
+
+
+def _terms(text: str) -> Set[str]:
+    return set(re.findall(r"[a-z0-9-]+", text.lower()))
+
+
+def fake_embedding(text: str, dimensions: int = 64) -> List[float]:
+    """Deterministic bag-of-words vector: texts sharing words point the same way."""
+    vector = [0.0] * dimensions
+    for term in _terms(text):
+        vector[int(hashlib.sha1(term.encode()).hexdigest()[:8], 16) % dimensions] += 1.0
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+class FakeLiteLLM:
+    """Deterministic, offline stand-in for the litellm calls the app makes.
+
+    `install()` swaps `litellm.acompletion` and `litellm.aembedding`, so
+    `LLMService` runs unchanged. Replies are `response_tokens` words picked
+    from a hash of the prompt. The first token arrives after
+    `first_token_seconds`, then tokens arrive at `tokens_per_second` (0 for
+    no delay); non-streaming calls wait for the whole reply.
+    """
+
+    def __init__(
+        self,
+        tokens_per_second: float = 50.0,
+        first_token_seconds: float = 0.2,
+        response_tokens: int = 60,
+        embedding_seconds: float = 0.0,
+        embedding_dimensions: int = 64,
+    ):
+        self.tokens_per_second = tokens_per_second
+        self.first_token_seconds = first_token_seconds
+        self.response_tokens = response_tokens
+        self.embedding_seconds = embedding_seconds
+        self.embedding_dimensions = embedding_dimensions
+        self.completions = 0
+        self.embeddings = 0
+        self._originals: Dict[str, Any] = {}
+
+    def install(self) -> None:
+        import litellm
+
+        for name in ("acompletion", "aembedding"):
+            self._originals[name] = getattr(litellm, name)
+            setattr(litellm, name, getattr(self, name))
+
+    def uninstall(self) -> None:
+        import litellm
+
+        for name, original in self._originals.items():
+            setattr(litellm, name, original)
+        self._originals.clear()
+
+    def reply(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> List[str]:
+        seed = hashlib.sha256(messages[-1]["content"].encode()).digest()
+        count = min(self.response_tokens, max_tokens or self.response_tokens)
+        return [
+            (" " if i else "") + VOCABULARY[seed[i % len(seed)] % len(VOCABULARY)]
+            for i in range(count)
+        ]
+
+    def _token_delay(self, index: int) -> float:
+        if index == 0:
+            return self.first_token_seconds
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    async def acompletion(
+        self,
+        messages: List[Dict[str, str]],
+        stream: bool = False,
+        max_tokens: Optional[int] = None,
+        **kwargs,
+    ) -> Any:
+        self.completions += 1
+        tokens = self.reply(messages, max_tokens)
+        if stream:
+            return _FakeStream(tokens, self._token_delay)
+
+        await asyncio.sleep(sum(self._token_delay(i) for i in range(len(tokens))))
+        message = SimpleNamespace(content="".join(tokens))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def aembedding(self, input: List[str], **kwargs) -> Any:
+        self.embeddings += 1
+        if self.embedding_seconds:
+            await asyncio.sleep(self.embedding_seconds)
+        data = [
+            {"index": i, "embedding": fake_embedding(text, self.embedding_dimensions)}
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=data)
+
+
+class _FakeStream:
+    def __init__(self, tokens: List[str], delay):
+        self.tokens = tokens
+        self.delay = delay
+        self.index = 0
+        self.closed = False
+
+    def __aiter__(self) -> "_FakeStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self.closed or self.index >= len(self.tokens):
+            raise StopAsyncIteration
+        await asyncio.sleep(self.delay(self.index))
+        delta = SimpleNamespace(content=self.tokens[self.index])
+        self.index += 1
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class InMemoryVectorStore:
+    """Stands in for `WeaviateService` on the chat and indexing paths.
+
+    Objects are kept per (collection, tenant). Hybrid search scores every
+    matching object as `alpha` * vector similarity + (1 - `alpha`) *
+    keyword overlap, after an optional fixed `search_seconds` delay to
+    model the network round trip.
+    """
+
+    def __init__(self, search_seconds: float = 0.0):
+        self.search_seconds = search_seconds
+        self.objects: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]] = defaultdict(list)
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def health_check(self) -> bool:
+        return True
+
+    async def batch_upsert(
+        self, collection: str, objects: List[Dict[str, Any]], tenant: Optional[str] = None
+    ) -> Dict[str, Any]:
+        stored = self.objects[(collection, tenant)]
+        for obj in objects:
+            stored.append(
+                {**obj, "terms": _terms(" ".join(str(v) for v in obj["properties"].values() if v))}
+            )
+        return {"inserted": len(objects), "failed_objects": []}
+
+    async def hybrid_search(
+        self,
+        collection: str,
+        query: str,
+        vector: Optional[List[float]] = None,
+        alpha: float = 0.5,
+        filters: Optional[Dict[str, Any]] = None,
+        properties: Optional[List[str]] = None,
+        limit: int = 10,
+        tenant: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        if self.search_seconds:
+            await asyncio.sleep(self.search_seconds)
+
+        terms = _terms(query)
+        scored = []
+        for obj in self.objects[(collection, tenant)]:
+            if not _matches(obj["properties"], filters):
+                continue
+            keyword = len(terms & obj["terms"]) / len(terms) if terms else 0.0
+            semantic = (
+                sum(a * b for a, b in zip(vector, obj["vector"], strict=True)) if vector else 0.0
+            )
+            scored.append((alpha * semantic + (1 - alpha) * keyword, obj))
+
+        results = []
+        for score, obj in heapq.nlargest(limit, scored, key=lambda s: s[0]):
+            props = obj["properties"]
+            selected = {p: props.get(p) for p in properties} if properties else dict(props)
+            results.append({**selected, "uuid": str(obj["uuid"]), "score": score})
+        return results
+
+
+def _matches(properties: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+    for prop, value in (filters or {}).items():
+        if value is None or value == []:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            if properties.get(prop) not in value:
+                return False
+        elif properties.get(prop) != value:
+            return False
+    return True
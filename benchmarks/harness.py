@@ -0,0 +1,188 @@
+import argparse
+import json
+import logging
+import math
+import platform
+import subprocess
+import sys
+import time
+from importlib import metadata
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.models.graph import utc_now
+
+logger = logging.getLogger(__name__)
+
+NEO4J_IMAGE = "neo4j:5.14-community"
+
+# Metrics compared against a baseline; higher is worse for all of them
+REGRESSION_METRICS = ("p50_ms", "p95_ms", "seconds")
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of `samples` (0 < pct <= 100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, Any]:
+    """Latency statistics, in milliseconds, for samples in seconds."""
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "mean_ms": round(total / len(samples) * 1000, 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3) if samples else 0.0,
+        "max_ms": round(max(samples) * 1000, 3) if samples else 0.0,
+        "ops_per_second": round(len(samples) / total, 2) if total else 0.0,
+    }
+
+
+async def measure(
+    operation: Callable[[int], Awaitable[Any]], repeat: int, warmup: int = 3
+) -> Dict[str, Any]:
+    """Time `repeat` sequential calls of `operation(i)` after `warmup` untimed ones."""
+    for i in range(warmup):
+        await operation(i)
+
+    samples: List[float] = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        await operation(i)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        version = metadata.version("cloud-companion")
+    except metadata.PackageNotFoundError:
+        version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "version": version,
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+class Report:
+    """Benchmark results for one suite run, written as JSON."""
+
+    def __init__(self, suite: str, parameters: Optional[Dict[str, Any]] = None):
+        self.suite = suite
+        self.parameters = parameters or {}
+        self.started_at = utc_now().isoformat()
+        self.environment = environment()
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        self.results[name] = result
+        headline = result.get("p50_ms", result.get("seconds"))
+        print(f"{name:<48} {headline}", file=sys.stderr)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "suite": self.suite,
+            "started_at": self.started_at,
+            "environment": self.environment,
+            "parameters": self.parameters,
+            "results": self.results,
+        }
+
+    def write(self, path: Optional[str]) -> None:
+        """Write to `path`, or to stdout without one."""
+        output = json.dumps(self.to_dict(), indent=2, default=str)
+        if path:
+            with open(path, "w") as f:
+                f.write(output + "\n")
+        else:
+            print(output)
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.2
+) -> List[Dict[str, Any]]:
+    """Results that got more than `tolerance` slower than in `baseline`."""
+    regressions = []
+    for name, result in current.get("results", {}).items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric in REGRESSION_METRICS:
+            before, after = previous.get(metric), result.get(metric)
+            if before and after is not None and after > before * (1 + tolerance):
+                regressions.append(
+                    {
+                        "name": name,
+                        "metric": metric,
+                        "baseline": before,
+                        "current": after,
+                        "change": round(after / before - 1, 4),
+                    }
+                )
+    return regressions
+
+
+def check_baseline(path: str, report: Report, tolerance: float) -> None:
+    """Print regressions against the report at `path`; exit with status 1 if there are any."""
+    with open(path) as f:
+        regressions = compare(json.load(f), report.to_dict(), tolerance)
+    for r in regressions:
+        print(
+            f"REGRESSION {r['name']} {r['metric']}: "
+            f"{r['baseline']} -> {r['current']} (+{r['change']:.0%})",
+            file=sys.stderr,
+        )
+    if regressions:
+        sys.exit(1)
+
+
+def add_neo4j_arguments(parser: argparse.ArgumentParser) -> None:
+    """Require the Neo4j to benchmark to be named explicitly.
+
+    The suites write and delete data, so they never fall back to whatever
+    `NEO4J_URI` happens to point at.
+    """
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "--uri", help="Neo4j to run against; credentials come from NEO4J_USER/NEO4J_PASSWORD"
+    )
+    target.add_argument("--testcontainers", action="store_true", help="Run Neo4j in a container")
+
+
+def start_neo4j(args: argparse.Namespace):
+    """Point the settings at `--uri`, or start a container; returns the container if any."""
+    if args.testcontainers:
+        return start_neo4j_container()
+    settings.NEO4J_URI = args.uri
+    return None
+
+
+def start_neo4j_container():
+    """Start a throwaway Neo4j and point the settings at it; the caller stops it."""
+    try:
+        from testcontainers.neo4j import Neo4jContainer
+    except ImportError:
+        sys.exit("--testcontainers needs the benchmarks extra: pip install -e '.[benchmarks]'")
+
+    container = Neo4jContainer(NEO4J_IMAGE)
+    container.start()
+    settings.NEO4J_URI = container.get_connection_url()
+    settings.NEO4J_USER = container.username
+    settings.NEO4J_PASSWORD = container.password
+    settings.NEO4J_DATABASE = "neo4j"
+    return container
@@ -0,0 +1,326 @@
+"""Neo4j ingest and query benchmarks.
+
+Runs against the Neo4j given with `--uri` (credentials from `NEO4J_USER`
+and `NEO4J_PASSWORD`), or a throwaway container with `--testcontainers`.
+Everything is created under a per-run id prefix and deleted afterwards.
+
+    python -m benchmarks.neo4j_suite --uri bolt://localhost:7687 --output results.json
+    python -m benchmarks.neo4j_suite --testcontainers --baseline previous.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.constants import CloudProvider, ResourceType
+from app.core.migrate import run_migrations
+from app.models.graph import APIKey, CloudResource, Organization, utc_now
+from app.services.cache import TTLCache
+from app.services.chat import ChatService
+from app.services.crawler.base import CloudCrawlerBase
+from app.services.neo4j import Neo4jService
+from app.services.repositories.organization import OrganizationRepository
+from benchmarks.harness import Report, add_neo4j_arguments, check_baseline, measure, start_neo4j
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+REGIONS = ["us-east-1", "eu-west-1", "ap-southeast-2"]
+
+# Same queries as GET /resources, paged and with stream=true
+LIST_RESOURCES_QUERY = """
+MATCH (r:CloudResource {org_id: $org_id})
+RETURN r
+SKIP $skip
+LIMIT $limit
+"""
+
+STREAM_RESOURCES_QUERY = """
+MATCH (r:CloudResource {org_id: $org_id})
+RETURN r
+"""
+
+SEED_API_KEYS_QUERY = """
+MATCH (o:Organization {id: $org_id})
+UNWIND $keys AS props
+CREATE (k:APIKey)
+SET k = props
+CREATE (o)-[:HAS_API_KEY]->(k)
+"""
+
+SEED_MESSAGES_QUERY = """
+MATCH (c:Conversation {id: $conv_id})
+UNWIND range(0, $count - 1) AS n
+CREATE (m:Message {
+    id: $conv_id + '-' + toString(n),
+    conversation_id: $conv_id,
+    role: CASE n % 2 WHEN 0 THEN 'user' ELSE 'assistant' END,
+    content: 'Which instances in eu-west-1 are stopped? (' + toString(n) + ')',
+    created_at: datetime() + duration({milliseconds: n})
+})
+CREATE (c)-[:HAS_MESSAGE]->(m)
+"""
+
+CLEANUP_MESSAGES_QUERY = """
+MATCH (c:Conversation)-[:HAS_MESSAGE]->(m:Message)
+WHERE c.org_id STARTS WITH $prefix
+WITH m LIMIT $limit
+DETACH DELETE m
+RETURN count(*) AS deleted
+"""
+
+CLEANUP_NODES_QUERY = """
+MATCH (n)
+WHERE n.org_id STARTS WITH $prefix OR n.id STARTS WITH $prefix
+WITH n LIMIT $limit
+DETACH DELETE n
+RETURN count(*) AS deleted
+"""
+
+SERVER_VERSION_QUERY = """
+CALL dbms.components() YIELD name, versions, edition
+RETURN name, versions[0] AS version, edition
+"""
+
+
+def make_resources(org_id: str, account_id: str, count: int) -> Iterator[CloudResource]:
+    for n in range(count):
+        yield CloudResource(
+            id=f"{account_id}/i-{n:08x}",
+            org_id=org_id,
+            name=f"web-{n}",
+            resource_type=ResourceType.AWS.EC2.value,
+            provider=CloudProvider.AWS.value,
+            account_id=account_id,
+            metadata={
+                "state": "stopped" if n % 10 == 0 else "running",
+                "instance_type": "t3.micro",
+                "region": REGIONS[n % len(REGIONS)],
+                "vpc_id": f"vpc-{n % 20:04x}",
+            },
+        )
+
+
+def api_key_hash(prefix: str, n: int) -> str:
+    return hashlib.sha256(f"{prefix}-key-{n}".encode()).hexdigest()
+
+
+class Neo4jSuite:
+    def __init__(self, neo4j: Neo4jService, prefix: str, repeat: int = 50):
+        self.neo4j = neo4j
+        self.prefix = prefix
+        self.repeat = repeat
+        self.crawler = CloudCrawlerBase(neo4j)
+
+    async def server_version(self) -> Dict[str, Any]:
+        results = await self.neo4j.read(SERVER_VERSION_QUERY)
+        return results[0] if results else {}
+
+    async def single_vs_batched_writes(self, report: Report, count: int) -> None:
+        org_id, account_id = f"{self.prefix}-org-single", f"{self.prefix}-acct-single"
+        resources = list(make_resources(org_id, account_id, count))
+        single = await measure(
+            lambda i: self.crawler.store_resource(org_id, account_id, resources[i]),
+            repeat=count,
+            warmup=0,
+        )
+        report.add("writes.single", single)
+
+        org_id, account_id = f"{self.prefix}-org-batched", f"{self.prefix}-acct-batched"
+        await self.ingest(report, "writes.batched", org_id, account_id, count)
+
+    async def ingest(
+        self, report: Report, name: str, org_id: str, account_id: str, count: int
+    ) -> None:
+        ingest = await self.crawler.store_resources(
+            org_id, account_id, make_resources(org_id, account_id, count)
+        )
+        seconds = ingest["seconds"]
+        report.add(
+            name,
+            {
+                "resources": ingest["stored"],
+                "batches": len(ingest["batches"]),
+                "batch_size": settings.CRAWLER_INGEST_BATCH_SIZE,
+                "seconds": seconds,
+                "per_resource_ms": round(seconds / count * 1000, 4),
+                "resources_per_second": round(count / seconds, 1) if seconds else 0.0,
+            },
+        )
+
+    async def api_key_lookup(self, report: Report, count: int) -> None:
+        org_id = f"{self.prefix}-org-keys"
+        await OrganizationRepository(self.neo4j).create_org(Organization(name=org_id, id=org_id))
+        expires_at = utc_now() + timedelta(days=30)
+        keys = [
+            APIKey(
+                org_id=org_id,
+                name=f"key-{n}",
+                hashed_key=api_key_hash(self.prefix, n),
+                expires_at=expires_at,
+            ).to_dict()
+            for n in range(count)
+        ]
+        await self.neo4j.write(SEED_API_KEYS_QUERY, {"org_id": org_id, "keys": keys})
+
+        uncached = OrganizationRepository(self.neo4j)
+        report.add(
+            "api_key_lookup.uncached",
+            await measure(
+                lambda i: uncached.find_api_key_by_hash(api_key_hash(self.prefix, i % count)),
+                self.repeat,
+            ),
+        )
+        report.add(
+            "api_key_lookup.unknown",
+            await measure(
+                lambda i: uncached.find_api_key_by_hash(api_key_hash(self.prefix, count + i)),
+                self.repeat,
+            ),
+        )
+
+        hot = min(count, 100)
+        cached = OrganizationRepository(
+            self.neo4j,
+            api_key_cache=TTLCache(
+                max_entries=settings.API_KEY_CACHE_MAX_ENTRIES,
+                ttl=settings.API_KEY_CACHE_TTL_SECONDS,
+            ),
+        )
+        report.add(
+            "api_key_lookup.cached",
+            await measure(
+                lambda i: cached.find_api_key_by_hash(api_key_hash(self.prefix, i % hot)),
+                self.repeat,
+                warmup=hot,
+            ),
+        )
+
+    async def resource_listing(self, report: Report, size: int) -> None:
+        org_id, account_id = f"{self.prefix}-org-{size}", f"{self.prefix}-acct-{size}"
+        await self.ingest(report, f"ingest.{size}", org_id, account_id, size)
+
+        async def page(skip: int) -> None:
+            await self.neo4j.read(
+                LIST_RESOURCES_QUERY, {"org_id": org_id, "skip": skip, "limit": 100}
+            )
+
+        report.add(
+            f"resource_listing.{size}.first_page", await measure(lambda i: page(0), self.repeat)
+        )
+        report.add(
+            f"resource_listing.{size}.last_page",
+            await measure(lambda i: page(max(size - 100, 0)), self.repeat),
+        )
+
+        async def stream(i: int) -> None:
+            async for _ in self.neo4j.iter_query(STREAM_RESOURCES_QUERY, {"org_id": org_id}):
+                pass
+
+        streamed = await measure(stream, repeat=3, warmup=1)
+        streamed["rows_per_second"] = round(size * streamed["ops_per_second"], 1)
+        report.add(f"resource_listing.{size}.stream", streamed)
+
+    async def conversation_history(self, report: Report, lengths: List[int]) -> None:
+        chat = ChatService(self.neo4j, None, None)
+        org_id = f"{self.prefix}-org-chat"
+        for length in lengths:
+            conversation_id = await chat.create_conversation(org_id)
+            await self.neo4j.write(
+                SEED_MESSAGES_QUERY, {"conv_id": conversation_id, "count": length}
+            )
+            report.add(
+                f"conversation_history.{length}",
+                await measure(
+                    lambda i, conversation_id=conversation_id: chat.get_conversation_context(
+                        conversation_id, org_id, limit=settings.CHAT_HISTORY_MESSAGES
+                    ),
+                    self.repeat,
+                ),
+            )
+
+    async def cleanup(self, batch_size: int = 10_000) -> int:
+        deleted = 0
+        for query in (CLEANUP_MESSAGES_QUERY, CLEANUP_NODES_QUERY):
+            while True:
+                results = await self.neo4j.write(
+                    query, {"prefix": self.prefix, "limit": batch_size}
+                )
+                batch = results[0]["deleted"] if results else 0
+                deleted += batch
+                if batch < batch_size:
+                    break
+        return deleted
+
+
+async def run(args: argparse.Namespace) -> Report:
+    neo4j = Neo4jService()
+    await neo4j.connect()
+    try:
+        await run_migrations(neo4j)
+
+        suite = Neo4jSuite(neo4j, prefix=f"bench-{uuid4().hex[:8]}", repeat=args.repeat)
+        report = Report(
+            "neo4j",
+            {
+                "sizes": args.sizes,
+                "single_writes": args.single_writes,
+                "api_keys": args.api_keys,
+                "conversation_lengths": args.conversation_lengths,
+                "repeat": args.repeat,
+                "ingest_batch_size": settings.CRAWLER_INGEST_BATCH_SIZE,
+                "ingest_concurrency": settings.CRAWLER_INGEST_CONCURRENCY,
+            },
+        )
+        report.environment["neo4j"] = await suite.server_version()
+
+        try:
+            await suite.single_vs_batched_writes(report, args.single_writes)
+            await suite.api_key_lookup(report, args.api_keys)
+            for size in args.sizes:
+                await suite.resource_listing(report, size)
+            await suite.conversation_history(report, args.conversation_lengths)
+        finally:
+            if not args.keep:
+                deleted = await suite.cleanup()
+                logger.info(f"Deleted {deleted} benchmark nodes")
+        return report
+    finally:
+        await neo4j.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--single-writes", type=int, default=200)
+    parser.add_argument("--api-keys", type=int, default=1_000)
+    parser.add_argument("--conversation-lengths", type=int, nargs="+", default=[10, 100, 1_000])
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per latency metric")
+    add_neo4j_arguments(parser)
+    parser.add_argument("--keep", action="store_true", help="Don't delete the benchmark data")
+    parser.add_argument("--baseline", help="Earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    container = start_neo4j(args)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if container is not None:
+            container.stop()
+    report.write(args.output)
+
+    if args.baseline:
+        check_baseline(args.baseline, report, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import threading
+
+import boto3
+import pytest
+
+from app.core.constants import ResourceType
+from app.core.exceptions import CloudAPIError
+from app.services.crawler.aws import GLOBAL_REGION, AWSCrawler
+
+REGIONS = ["eu-west-1", "us-west-2"]
+TYPES = [ResourceType.AWS.EC2, ResourceType.AWS.S3]
+
+PAGES = {
+    "describe_instances": lambda region: [
+        {"Reservations": [{"Instances": [{"InstanceId": f"i-{region}"}]}]}
+    ],
+    "list_buckets": lambda region: [{"Buckets": [{"Name": "logs"}]}],
+}
+
+
+class FakePaginator:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def paginate(self, **params):
+        return iter(self.pages)
+
+
+class FakeClient:
+    def __init__(self, service, region, error=None):
+        self.service = service
+        self.region = region
+        self.error = error
+
+    def can_paginate(self, operation):
+        return True
+
+    def get_paginator(self, operation):
+        if self.error:
+            raise self.error
+        return FakePaginator(PAGES[operation](self.region))
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Replace `boto3.session.Session`; records every (service, region) client made."""
+    state = {"calls": [], "failing": set(), "lock": threading.Lock()}
+
+    class FakeSession:
+        def __init__(self, region_name=None, **credentials):
+            self.region = region_name
+
+        def client(self, service, config=None):
+            with state["lock"]:
+                state["calls"].append((service, self.region))
+            error = None
+            if (service, self.region) in state["failing"] or "*" in state["failing"]:
+                error = RuntimeError("AccessDenied")
+            return FakeClient(service, self.region, error)
+
+    monkeypatch.setattr(boto3.session, "Session", FakeSession)
+    return state
+
+
+async def crawl(failed_scopes=None):
+    crawler = AWSCrawler(neo4j_service=None)
+    return [
+        r
+        async for r in crawler.iter_resources(
+            "org-1",
+            "123456789012",
+            {},
+            failed_scopes=failed_scopes,
+            regions=REGIONS,
+            resource_types=TYPES,
+        )
+    ]
+
+
+class TestIterResources:
+    @pytest.mark.asyncio
+    async def test_global_collectors_run_once(self, sessions):
+        resources = await crawl()
+
+        assert sorted(sessions["calls"]) == [
+            ("ec2", "eu-west-1"),
+            ("ec2", "us-west-2"),
+            ("s3", GLOBAL_REGION),
+        ]
+        assert sorted(r.id for r in resources) == ["i-eu-west-1", "i-us-west-2", "logs"]
+        (bucket,) = [r for r in resources if r.id == "logs"]
+        assert bucket.metadata["region"] is None
+
+    @pytest.mark.asyncio
+    async def test_failed_region_is_reported_as_failed_scope(self, sessions):
+        sessions["failing"].add(("ec2", "us-west-2"))
+        failed_scopes = set()
+
+        resources = await crawl(failed_scopes)
+
+        assert sorted(r.id for r in resources) == ["i-eu-west-1", "logs"]
+        assert failed_scopes == {ResourceType.AWS.EC2.value}
+
+    @pytest.mark.asyncio
+    async def test_raises_when_every_job_fails(self, sessions):
+        sessions["failing"].add("*")
+
+        with pytest.raises(CloudAPIError):
+            await crawl()
@@ -0,0 +1,252 @@
+import asyncio
+import sys
+from enum import Enum
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.constants import ResourceType
+from app.core.exceptions import CloudAPIError
+from app.services.crawler.azure import (
+    AZURE_CLIENTS,
+    AZURE_COLLECTORS_BY_TYPE,
+    AzureCrawler,
+    resource_group,
+)
+
+SUBSCRIPTION = "/subscriptions/sub-1"
+VM_ID = f"{SUBSCRIPTION}/resourceGroups/rg-web/providers/Microsoft.Compute/virtualMachines/web-1"
+
+
+class ProvisioningState(Enum):
+    SUCCEEDED = "Succeeded"
+
+
+class FakePager:
+    """Mimics `AsyncItemPaged`: `by_page()` yields async iterators of items."""
+
+    def __init__(self, pages, error=None, hang=False):
+        self.pages = pages
+        self.error = error
+        self.hang = hang
+        self.cancelled = False
+
+    async def by_page(self):
+        for page in self.pages:
+            yield _items(page)
+        if self.error:
+            raise self.error
+        if self.hang:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+
+
+async def _items(page):
+    for item in page:
+        yield item
+
+
+class FakeClient:
+    """Async management client whose list operations return prepared pagers."""
+
+    def __init__(self, operations):
+        self.closed = False
+        for path, operation in operations.items():
+            group, method = path.split(".")
+            setattr(self, group, getattr(self, group, SimpleNamespace()))
+            setattr(getattr(self, group), method, operation)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+
+class FakeCredential(FakeClient):
+    def __init__(self):
+        super().__init__({})
+
+
+def vm(name, resource_id=VM_ID):
+    return SimpleNamespace(
+        id=resource_id,
+        name=name,
+        location="eastus",
+        hardware_profile=SimpleNamespace(vm_size="Standard_B2s"),
+        storage_profile=None,
+        provisioning_state=ProvisioningState.SUCCEEDED,
+        zones=["1"],
+    )
+
+
+def sql_server(name):
+    return SimpleNamespace(
+        id=f"{SUBSCRIPTION}/resourceGroups/rg-data/providers/Microsoft.Sql/servers/{name}",
+        name=name,
+        location="westeurope",
+    )
+
+
+def database(server, name):
+    return SimpleNamespace(
+        id=f"{server.id}/databases/{name}",
+        name=name,
+        status="Online",
+        sku=SimpleNamespace(name="S0"),
+        max_size_bytes=1024,
+    )
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """Route the crawler's SDK imports to `FakeClient`s set per client family."""
+    clients = {}
+    credential = FakeCredential()
+    for family, (module, name) in AZURE_CLIENTS.items():
+        factory = lambda credential, subscription_id, family=family: clients[family]  # noqa: E731
+        monkeypatch.setitem(sys.modules, module, SimpleNamespace(**{name: factory}))
+    monkeypatch.setattr(AzureCrawler, "_credential", staticmethod(lambda credentials: credential))
+    clients["credential"] = credential
+    return clients
+
+
+def sql_client(servers, databases):
+    calls = []
+
+    def list_by_server(group, server):
+        calls.append((group, server))
+        return FakePager(databases[server])
+
+    client = FakeClient(
+        {"servers.list": lambda: FakePager(servers), "databases.list_by_server": list_by_server}
+    )
+    return client, calls
+
+
+class TestResourceGroup:
+    def test_parses_arm_id(self):
+        assert resource_group(VM_ID) == "rg-web"
+
+    def test_segment_is_case_insensitive(self):
+        assert resource_group("/subscriptions/s/resourcegroups/RG-Web/providers/x") == "RG-Web"
+
+    def test_missing_group(self):
+        assert resource_group("/subscriptions/s/providers/Microsoft.Network/x") is None
+        assert resource_group("/subscriptions/s/resourceGroups") is None
+
+
+class TestAzureCollector:
+    def test_maps_metadata_paths(self):
+        crawler = AzureCrawler(neo4j_service=None)
+        collector = AZURE_COLLECTORS_BY_TYPE[ResourceType.AZURE.VIRTUAL_MACHINE.value]
+
+        resource = crawler._to_resource("org-1", "sub-1", collector, vm("web-1"))
+
+        assert resource.id == VM_ID
+        assert resource.name == "web-1"
+        assert resource.resource_type == ResourceType.AZURE.VIRTUAL_MACHINE.value
+        assert resource.provider == crawler.provider
+        assert resource.metadata == {
+            "vm_size": "Standard_B2s",
+            "os_type": None,
+            "provisioning_state": "Succeeded",
+            "zones": ["1"],
+            "region": "eastus",
+            "resource_group": "rg-web",
+        }
+
+    def test_child_inherits_parent_location(self):
+        crawler = AzureCrawler(neo4j_service=None)
+        collector = AZURE_COLLECTORS_BY_TYPE[ResourceType.AZURE.SQL_DATABASE.value]
+        server = sql_server("sql-1")
+        databases = [database(server, "master"), database(server, "orders")]
+
+        resources = crawler._convert(databases, collector, "org-1", "sub-1", server)
+
+        assert [r.name for r in resources] == ["orders"]
+        assert resources[0].metadata["region"] == "westeurope"
+        assert resources[0].metadata["resource_group"] == "rg-data"
+        assert resources[0].metadata["parent"] == server.id
+
+
+class TestCollect:
+    @pytest.mark.asyncio
+    async def test_pages_through_children_of_every_parent(self):
+        first, second = sql_server("sql-1"), sql_server("sql-2")
+        client, calls = sql_client(
+            [[first], [second]],
+            {
+                "sql-1": [
+                    [database(first, "master"), database(first, "a")],
+                    [database(first, "b")],
+                ],
+                "sql-2": [[database(second, "c")]],
+            },
+        )
+        collector = AZURE_COLLECTORS_BY_TYPE[ResourceType.AZURE.SQL_DATABASE.value]
+        batches = []
+
+        async def emit(batch):
+            batches.append([r.name for r in batch])
+
+        await AzureCrawler(neo4j_service=None)._collect(client, collector, "org-1", "sub-1", emit)
+
+        assert calls == [("rg-data", "sql-1"), ("rg-data", "sql-2")]
+        assert batches == [["a"], ["b"], ["c"]]
+
+
+class TestIterResources:
+    TYPES = [ResourceType.AZURE.VIRTUAL_MACHINE, ResourceType.AZURE.SQL_DATABASE]
+
+    @pytest.mark.asyncio
+    async def test_failed_collector_is_reported_as_skipped_scope(self, clients):
+        server = sql_server("sql-1")
+        clients["compute"] = FakeClient(
+            {"virtual_machines.list_all": lambda: FakePager([], error=RuntimeError("forbidden"))}
+        )
+        clients["sql"], _ = sql_client([[server]], {"sql-1": [[database(server, "a")]]})
+        failed_scopes = set()
+
+        resources = [
+            r
+            async for r in AzureCrawler(neo4j_service=None).iter_resources(
+                "org-1", "sub-1", {}, failed_scopes=failed_scopes, resource_types=self.TYPES
+            )
+        ]
+
+        assert [r.name for r in resources] == ["a"]
+        assert failed_scopes == {ResourceType.AZURE.VIRTUAL_MACHINE.value}
+        assert clients["compute"].closed and clients["sql"].closed
+        assert clients["credential"].closed
+
+    @pytest.mark.asyncio
+    async def test_raises_when_every_collector_fails(self, clients):
+        failing = lambda: FakePager([], error=RuntimeError("forbidden"))  # noqa: E731
+        clients["compute"] = FakeClient({"virtual_machines.list_all": failing})
+        clients["sql"] = FakeClient({"servers.list": failing})
+
+        with pytest.raises(CloudAPIError):
+            async for _ in AzureCrawler(neo4j_service=None).iter_resources(
+                "org-1", "sub-1", {}, resource_types=self.TYPES
+            ):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_early_close_cancels_paging_and_closes_clients(self, clients):
+        pager = FakePager([[vm("web-1"), vm("web-2")]], hang=True)
+        clients["compute"] = FakeClient({"virtual_machines.list_all": lambda: pager})
+        resources = AzureCrawler(neo4j_service=None).iter_resources(
+            "org-1", "sub-1", {}, resource_types=[ResourceType.AZURE.VIRTUAL_MACHINE]
+        )
+
+        first = await resources.__anext__()
+        await resources.aclose()
+
+        assert first.name == "web-1"
+        assert pager.cancelled
+        assert clients["compute"].closed
+        assert clients["credential"].closed
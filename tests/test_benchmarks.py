@@ -0,0 +1,86 @@
+import argparse
+
+import pytest
+
+from app.core.config import settings
+from benchmarks.fakes import InMemoryVectorStore, fake_embedding
+from benchmarks.harness import add_neo4j_arguments, compare, percentile, start_neo4j, summarize
+
+
+class TestSummarize:
+    def test_percentiles(self):
+        samples = [n / 1000 for n in range(1, 101)]
+
+        assert percentile(samples, 50) == 0.05
+        assert percentile(samples, 99) == 0.099
+        stats = summarize(samples)
+        assert stats["count"] == 100
+        assert stats["p95_ms"] == 95.0
+        assert stats["max_ms"] == 100.0
+
+
+class TestCompare:
+    def test_flags_slower_results_only(self):
+        baseline = {"results": {"a": {"p50_ms": 10.0}, "b": {"seconds": 2.0}}}
+        current = {"results": {"a": {"p50_ms": 13.0}, "b": {"seconds": 2.1}, "c": {"p50_ms": 1}}}
+
+        regressions = compare(baseline, current, tolerance=0.2)
+
+        assert [(r["name"], r["metric"]) for r in regressions] == [("a", "p50_ms")]
+
+
+class TestNeo4jTarget:
+    def parse(self, *argv):
+        parser = argparse.ArgumentParser()
+        add_neo4j_arguments(parser)
+        return parser.parse_args(argv)
+
+    def test_requires_explicit_target(self):
+        with pytest.raises(SystemExit):
+            self.parse()
+        with pytest.raises(SystemExit):
+            self.parse("--uri", "bolt://localhost:7687", "--testcontainers")
+
+    def test_uri_overrides_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "NEO4J_URI", "bolt://production:7687")
+
+        assert start_neo4j(self.parse("--uri", "bolt://localhost:7687")) is None
+        assert settings.NEO4J_URI == "bolt://localhost:7687"
+
+
+class TestInMemoryVectorStore:
+    @pytest.mark.asyncio
+    async def test_hybrid_search_applies_filters(self):
+        store = InMemoryVectorStore()
+        objects = [
+            {"uuid": str(n), "properties": {"name": name, "region": region}}
+            for n, (name, region) in enumerate(
+                [("web-1", "eu-west-1"), ("web-2", "us-east-1"), ("db-1", "eu-west-1")]
+            )
+        ]
+        for obj in objects:
+            obj["vector"] = fake_embedding(obj["properties"]["name"])
+        await store.batch_upsert("Resource", objects, tenant="org-1")
+
+        results = await store.hybrid_search(
+            "Resource",
+            "web-1",
+            vector=fake_embedding("web-1"),
+            filters={"region": ["eu-west-1"]},
+            properties=["name"],
+            tenant="org-1",
+        )
+
+        assert [r["name"] for r in results] == ["web-1", "db-1"]
+        assert await store.hybrid_search("Resource", "web-1", tenant="org-2") == []
+
+    @pytest.mark.asyncio
+    async def test_rejects_vectors_of_another_dimension(self):
+        store = InMemoryVectorStore()
+        obj = {"uuid": "1", "properties": {"name": "web-1"}, "vector": fake_embedding("web-1")}
+        await store.batch_upsert("Resource", [obj], tenant="org-1")
+
+        with pytest.raises(ValueError):
+            await store.hybrid_search(
+                "Resource", "web-1", vector=fake_embedding("web-1", 32), tenant="org-1"
+            )
@@ -0,0 +1,90 @@
+import time
+import pytest
+from app.services.cache import CacheInvalidationChannel, TTLCache
+
+
+class TestTTLCache:
+    def test_hit_and_miss_counters(self):
+        cache = TTLCache(max_entries=10, ttl=60)
+        assert cache.get("a") == (False, None)
+
+        cache.set("a", 1)
+        assert cache.get("a") == (True, 1)
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_caches_negative_lookups(self):
+        cache = TTLCache(max_entries=10, ttl=60, negative_ttl=60)
+        cache.set("missing", None)
+        assert cache.get("missing") == (True, None)
+
+    def test_negative_ttl_zero_disables_negative_caching(self):
+        cache = TTLCache(max_entries=10, ttl=60, negative_ttl=0)
+        cache.set("missing", None)
+        assert cache.get("missing") == (False, None)
+
+    def test_entries_expire(self, monkeypatch):
+        cache = TTLCache(max_entries=10, ttl=5)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        cache.set("a", 1)
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+        assert cache.get("a") == (False, None)
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate_and_clear(self):
+        cache = TTLCache(max_entries=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.invalidate("a")
+        assert cache.get("a") == (False, None)
+
+        cache.clear()
+        assert len(cache) == 0
+
+
+class FakeCounterNeo4j:
+    def __init__(self):
+        self.version = 0
+
+    async def read(self, query, parameters=None):
+        return [{"version": self.version}]
+
+    async def write(self, query, parameters=None):
+        self.version += 1
+        return [{"version": self.version}]
+
+
+class TestCacheInvalidationChannel:
+    @pytest.mark.asyncio
+    async def test_publish_keeps_bumps_from_other_workers(self):
+        neo4j = FakeCounterNeo4j()
+        ours, theirs = CacheInvalidationChannel(neo4j, "k"), CacheInvalidationChannel(neo4j, "k")
+        invalidated = []
+        ours.subscribe(lambda: invalidated.append(True))
+        await ours.poll()
+        await theirs.poll()
+
+        await ours.publish()
+        await ours.poll()
+        assert invalidated == []
+
+        await theirs.publish()
+        await ours.publish()
+        await ours.poll()
+        assert invalidated == [True]
@@ -0,0 +1,344 @@
+import asyncio
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+
+from app.api.deps import RequestContext
+from app.api.v1.endpoints.chat import send_message, stream_chat_sse
+from app.core.config import settings
+from app.core.exceptions import DatabaseError, ResourceNotFoundError
+from app.models.schema import ChatMessageRequest
+from app.services import chat as chat_module
+from app.services.chat import ChatService, Retrieval
+from app.services.llm import LLMService
+from app.services.response_cache import SemanticResponseCache
+
+
+class FakeNeo4j:
+    """Answers the chat queries for conversations owned by a single org."""
+
+    def __init__(self, conversations):
+        self.conversations = conversations
+        self.messages = []
+        self.resources = [{"id": "i-1", "name": "web-1", "metadata": "{}", "type": "AWS_EC2"}]
+        self.history_seconds = 0.0
+        self.write_error = None
+
+    def _owned(self, params):
+        return self.conversations.get(params.get("conv_id")) == params.get("org_id")
+
+    async def read(self, query, params=None):
+        if "Conversation" in query and not self._owned(params):
+            return []
+        if "RETURN c.id" in query:
+            return [{"id": params["conv_id"]}]
+        if "RETURN c.summary" in query:
+            await asyncio.sleep(self.history_seconds)
+            return [
+                {"summary": None, "role": m["role"], "content": m["content"]}
+                for m in reversed(self.messages)
+                if m["conv_id"] == params["conv_id"]
+            ]
+        if "CloudResource" in query:
+            return [r for r in self.resources if r["id"] in params["ids"]]
+        return []
+
+    async def write(self, query, params=None):
+        if self.write_error:
+            raise self.write_error
+        if "Conversation" in query and not self._owned(params):
+            return []
+        self.messages.append(params)
+        return [{"m.id": params["msg_id"]}]
+
+
+class FakeWeaviate:
+    def __init__(self, search_seconds=0.0):
+        self.search_seconds = search_seconds
+        self.cancelled = False
+        self.results = [{"resource_id": "i-2", "name": "web-2", "description": "AWS_EC2 web-2"}]
+
+    async def hybrid_search(self, **kwargs):
+        try:
+            await asyncio.sleep(self.search_seconds)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.results
+
+
+class FakeStream:
+    """litellm-style completion stream that records being closed."""
+
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed or not self.tokens:
+            raise StopAsyncIteration
+        delta = SimpleNamespace(content=self.tokens.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after=None):
+        self.disconnect_after = disconnect_after
+        self.checks = 0
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.disconnect_after is not None and self.checks > self.disconnect_after
+
+
+def parse_sse(frames):
+    events = []
+    for frame in frames:
+        event, data = frame.rstrip("\n").split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+@pytest.fixture
+def llm_stream(monkeypatch):
+    stream = FakeStream(["Hel", "lo ", "world"])
+
+    async def acompletion(**kwargs):
+        assert kwargs["stream"]
+        return stream
+
+    monkeypatch.setitem(sys.modules, "litellm", SimpleNamespace(acompletion=acompletion))
+    return stream
+
+
+@pytest.fixture
+def neo4j():
+    return FakeNeo4j({"conv-1": "org-a"})
+
+
+@pytest.fixture
+def weaviate():
+    return FakeWeaviate()
+
+
+@pytest.fixture
+def chat(neo4j, weaviate, monkeypatch):
+    service = ChatService(neo4j, weaviate, LLMService())
+
+    async def create_embeddings(text):
+        return [1.0, 0.0]
+
+    monkeypatch.setattr(service.llm, "create_embeddings", create_embeddings)
+    return service
+
+
+class TestConversationScoping:
+    def test_conversation_queries_are_scoped_by_org(self):
+        for query in (
+            chat_module.CONVERSATION_CONTEXT_QUERY,
+            chat_module.UNSUMMARIZED_MESSAGES_QUERY,
+            chat_module.SAVE_SUMMARY_QUERY,
+            chat_module.CONVERSATION_EXISTS_QUERY,
+        ):
+            assert "Conversation {id: $conv_id, org_id: $org_id}" in query
+
+    @pytest.mark.asyncio
+    async def test_conversation_exists(self, chat):
+        assert await chat.conversation_exists("conv-1", "org-a")
+        assert not await chat.conversation_exists("conv-1", "org-b")
+        assert not await chat.conversation_exists("missing", "org-a")
+
+    @pytest.mark.asyncio
+    async def test_add_message_rejects_foreign_conversation(self, chat, neo4j):
+        await chat.add_message("conv-1", "org-a", "user", "hello")
+
+        with pytest.raises(ResourceNotFoundError):
+            await chat.add_message("conv-1", "org-b", "user", "injected")
+        assert [m["content"] for m in neo4j.messages] == ["hello"]
+
+    @pytest.mark.asyncio
+    async def test_history_of_foreign_conversation_is_empty(self, chat):
+        await chat.add_message("conv-1", "org-a", "user", "secret")
+
+        assert await chat.get_conversation_context("conv-1", "org-a") == [
+            {"role": "user", "content": "secret"}
+        ]
+        assert await chat.get_conversation_context("conv-1", "org-b") == []
+
+    @pytest.mark.asyncio
+    async def test_retrieve_rejects_foreign_conversation(self, chat):
+        with pytest.raises(ResourceNotFoundError):
+            await chat.retrieve(
+                "conv-1", "org-b", "hello", context_resources=["i-1"], persist_user_message=True
+            )
+
+
+class TestStreamChatSse:
+    async def collect(self, chat, request):
+        events = chat.stream_response("conv-1", "org-a", "hello", context_resources=["i-1"])
+        return [frame async for frame in stream_chat_sse(request, events)]
+
+    @pytest.mark.asyncio
+    async def test_deltas_then_done(self, chat, neo4j, llm_stream):
+        frames = await self.collect(chat, FakeRequest())
+
+        assert all(frame.endswith("\n\n") for frame in frames)
+        events = parse_sse(frames)
+        assert events[:-1] == [
+            ("delta", {"content": "Hel"}),
+            ("delta", {"content": "lo "}),
+            ("delta", {"content": "world"}),
+        ]
+        event, done = events[-1]
+        assert event == "done"
+        assert done["conversation_id"] == "conv-1"
+        assert done["message_id"] == neo4j.messages[-1]["msg_id"]
+        assert done["sources"] == [
+            {"resource_id": "i-1", "name": "web-1", "resource_type": "AWS_EC2"},
+            {"resource_id": "i-2", "name": "web-2", "resource_type": None},
+        ]
+        assert done["prompt_tokens"] > 0
+        assert neo4j.messages[-1]["content"] == "Hello world"
+
+    @pytest.mark.asyncio
+    async def test_disconnect_closes_llm_stream(self, chat, neo4j, llm_stream):
+        frames = await self.collect(chat, FakeRequest(disconnect_after=1))
+
+        assert parse_sse(frames) == [("delta", {"content": "Hel"})]
+        assert llm_stream.closed
+        assert neo4j.messages == []
+
+    @pytest.mark.asyncio
+    async def test_llm_error_is_reported_in_band(self, chat, neo4j, monkeypatch):
+        async def acompletion(**kwargs):
+            raise RuntimeError("model unavailable")
+
+        monkeypatch.setitem(sys.modules, "litellm", SimpleNamespace(acompletion=acompletion))
+
+        events = parse_sse(await self.collect(chat, FakeRequest()))
+
+        assert [event for event, _ in events] == ["error"]
+        assert "model unavailable" in events[0][1]["detail"]
+        assert neo4j.messages == []
+
+
+class TestRetrieve:
+    @pytest.mark.asyncio
+    async def test_slow_stages_degrade_to_empty_results(self, chat, neo4j, weaviate, monkeypatch):
+        monkeypatch.setattr(settings, "CHAT_HISTORY_TIMEOUT_SECONDS", 0.01)
+        monkeypatch.setattr(settings, "CHAT_SEARCH_TIMEOUT_SECONDS", 0.01)
+        await chat.add_message("conv-1", "org-a", "user", "earlier question")
+        neo4j.history_seconds = weaviate.search_seconds = 1.0
+
+        retrieval = await chat.retrieve("conv-1", "org-a", "hello")
+
+        assert retrieval.degraded == {"history": "timeout", "search": "timeout"}
+        assert retrieval.sources == []
+        assert [m["content"] for m in retrieval.messages] == ["hello"]
+        assert retrieval.timings["history"] < 0.5
+        assert retrieval.timings["search"] < 0.5
+
+    @pytest.mark.asyncio
+    async def test_searches_alongside_selected_resources(self, chat, weaviate):
+        weaviate.results.append(
+            {"resource_id": "i-1", "name": "web-1", "description": "AWS_EC2 web-1"}
+        )
+
+        retrieval = await chat.retrieve("conv-1", "org-a", "hello", context_resources=["i-1"])
+
+        assert "search" in retrieval.timings
+        assert [s["resource_id"] for s in retrieval.sources] == ["i-1", "i-2"]
+
+    @pytest.mark.asyncio
+    async def test_failed_user_message_write_cancels_other_stages(self, chat, neo4j, weaviate):
+        neo4j.write_error = RuntimeError("write failed")
+        weaviate.search_seconds = 1.0
+
+        with pytest.raises(DatabaseError):
+            await chat.retrieve("conv-1", "org-a", "hello", persist_user_message=True)
+
+        assert weaviate.cancelled
+
+
+class TestServerTiming:
+    def test_formats_stage_durations(self):
+        retrieval = Retrieval()
+        retrieval.timings = {"history": 0.0123, "search": 0.5}
+        retrieval.degraded = {"search": "timeout"}
+
+        assert retrieval.server_timing() == 'history;dur=12.3, search;dur=500.0;desc="timeout"'
+
+    @pytest.mark.asyncio
+    async def test_send_message_sets_header(self, chat, monkeypatch):
+        async def acompletion(**kwargs):
+            message = SimpleNamespace(content="Check the security group")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        monkeypatch.setitem(sys.modules, "litellm", SimpleNamespace(acompletion=acompletion))
+        response = Response()
+
+        reply = await send_message(
+            ChatMessageRequest(content="hello", role="user", conversation_id="conv-1"),
+            FakeRequest(),
+            response,
+            stream=False,
+            context=RequestContext("org-a", "key-1", "test"),
+            app=SimpleNamespace(chat=chat),
+        )
+
+        assert reply.content == "Check the security group"
+        stages = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+        assert {"history", "search", "persist", "retrieval", "context", "llm"} <= set(stages)
+
+    @pytest.mark.asyncio
+    async def test_streaming_reply_sets_header(self, chat, llm_stream):
+        response = await send_message(
+            ChatMessageRequest(content="hello", role="user", conversation_id="conv-1"),
+            FakeRequest(),
+            Response(),
+            stream=True,
+            context=RequestContext("org-a", "key-1", "test"),
+            app=SimpleNamespace(chat=chat),
+        )
+
+        assert response.media_type == "text/event-stream"
+        assert "history;dur=" in response.headers["Server-Timing"]
+
+
+class TestResponseCache:
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_llm(self, chat, neo4j, monkeypatch):
+        completions = []
+
+        async def acompletion(**kwargs):
+            completions.append(kwargs)
+            message = SimpleNamespace(content="Check the security group")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        monkeypatch.setitem(sys.modules, "litellm", SimpleNamespace(acompletion=acompletion))
+        neo4j.conversations.update({"conv-2": "org-a", "conv-3": "org-a"})
+        chat.response_cache = SemanticResponseCache()
+
+        first = await chat.generate_response("conv-1", "org-a", "why is web-1 down?", ["i-1"])
+        second = await chat.generate_response("conv-2", "org-a", "why is web-1 down?", ["i-1"])
+        events = [
+            event
+            async for event in chat.stream_response(
+                "conv-3", "org-a", "why is web-1 down?", ["i-1"]
+            )
+        ]
+
+        assert len(completions) == 1
+        assert second.content == first.content == "Check the security group"
+        assert "llm" not in second.retrieval.timings
+        assert events[0] == {"type": "delta", "content": "Check the security group"}
+        assert chat.response_cache.hits == 2
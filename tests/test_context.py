@@ -0,0 +1,33 @@
+import json
+from app.services.context import ContextBuilder, compact_metadata
+from app.services.llm import LLMService
+
+
+class WordCountingLLM(LLMService):
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+
+class TestContextBuilder:
+    def test_compact_metadata(self):
+        metadata = json.dumps({"region": "us-east-1", "tags": {"env": "prod", "team": ""}})
+        assert compact_metadata(metadata) == "region=us-east-1 tags.env=prod"
+
+    def test_fits_budget_keeping_most_relevant(self):
+        builder = ContextBuilder(WordCountingLLM(), max_tokens=120)
+        history = [{"role": "user", "content": f"billing question {i} " * 10} for i in range(5)]
+        history += [
+            {"role": "user", "content": "ssh to web-1 fails"},
+            {"role": "assistant", "content": "Check the security group."},
+        ]
+        resources = [
+            {"id": f"i-{i}", "name": f"db-{i}", "type": "AWS_RDS", "metadata": "{}"}
+            for i in range(20)
+        ] + [{"id": "i-web", "name": "web-1", "type": "AWS_EC2", "metadata": "{}"}]
+
+        prompt = builder.build("why does ssh fail on web-1", history, resources)
+
+        assert prompt.tokens["total"] <= 120
+        assert prompt.messages[-3:-1] == history[-2:]
+        assert prompt.sources[0]["resource_id"] == "i-web"
+        assert prompt.omitted["resources"] > 0
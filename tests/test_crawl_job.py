@@ -0,0 +1,75 @@
+import asyncio
+import os
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import settings
+from app.models.graph import CrawlJob, utc_now
+from app.services.neo4j import Neo4jService
+from app.services.repositories.crawl_job import CrawlJobRepository
+
+# Lease claims rely on Neo4j's write locks, so this needs a real (throwaway) database
+NEO4J_TEST_URI = os.environ.get("NEO4J_TEST_URI")
+
+pytestmark = pytest.mark.skipif(not NEO4J_TEST_URI, reason="NEO4J_TEST_URI is not set")
+
+
+@pytest.fixture
+async def neo4j(monkeypatch):
+    monkeypatch.setattr(settings, "NEO4J_URI", NEO4J_TEST_URI)
+    service = Neo4jService()
+    await service.connect()
+    yield service
+    await service.close()
+
+
+@pytest.fixture
+async def job(neo4j):
+    job = CrawlJob(
+        org_id=f"test-{uuid4().hex[:8]}",
+        provider="AWS",
+        account_id="123456789012",
+        next_run_at=utc_now(),
+    )
+    await neo4j.write("CREATE (j:CrawlJob) SET j = $props", {"props": job.to_dict()})
+    yield job
+    await neo4j.write("MATCH (j:CrawlJob {id: $id}) DELETE j", {"id": job.id})
+
+
+class TestClaimJob:
+    async def test_concurrent_claims_have_one_winner(self, neo4j, job):
+        repo = CrawlJobRepository(neo4j)
+        now = utc_now()
+        claims = await asyncio.gather(
+            *(
+                repo.claim_job(job.id, f"worker-{n}", now, now + timedelta(minutes=5))
+                for n in range(8)
+            )
+        )
+
+        winners = [claim for claim in claims if claim is not None]
+        assert len(winners) == 1
+        stored = await repo.get_job(job.id)
+        assert stored.status == "running"
+        assert stored.lease_owner == winners[0].lease_owner
+
+    async def test_job_completed_by_another_worker_is_not_claimed_again(self, neo4j, job):
+        repo = CrawlJobRepository(neo4j)
+        now = utc_now()
+        # Another worker claims the due job and finishes it while this one waits
+        finished = await repo.claim_job(job.id, "worker-1", now, now + timedelta(minutes=5))
+        finished.status = "succeeded"
+        finished.lease_owner = None
+        finished.lease_expires_at = None
+        finished.next_run_at = utc_now() + timedelta(hours=1)
+        await repo.save_job(finished)
+
+        now = utc_now()
+        lease = now + timedelta(minutes=5)
+        assert await repo.claim_job(job.id, "worker-2", now, lease) is None
+
+        forced = await repo.claim_job(job.id, "worker-2", now, lease, force=True)
+        assert forced is not None
+        assert forced.lease_owner == "worker-2"
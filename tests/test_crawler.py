@@ -0,0 +1,144 @@
+import os
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import settings
+from app.core.constants import CloudProvider, ResourceType
+from app.models.graph import Account, CloudResource, Organization, utc_now
+from app.services.crawler.base import CloudCrawlerBase
+from app.services.neo4j import Neo4jService
+from app.services.repositories.organization import OrganizationRepository
+
+NEO4J_TEST_URI = os.environ.get("NEO4J_TEST_URI")
+
+EC2 = ResourceType.AWS.EC2.value
+S3 = ResourceType.AWS.S3.value
+
+
+def resource(org_id, resource_id, resource_type=EC2, name=None):
+    return CloudResource(
+        id=resource_id,
+        org_id=org_id,
+        name=name or resource_id,
+        resource_type=resource_type,
+        provider=CloudProvider.AWS.value,
+        account_id="123456789012",
+    )
+
+
+class FakeCrawler(CloudCrawlerBase):
+    """Yields fixed resources and reports `failed` resource types as failed scopes."""
+
+    def __init__(self, neo4j_service, resources, failed=()):
+        super().__init__(neo4j_service)
+        self.provider = CloudProvider.AWS.value
+        self.resources = resources
+        self.failed = failed
+
+    async def iter_resources(self, org_id, account_id, credentials, failed_scopes=None):
+        if failed_scopes is not None:
+            failed_scopes.update(self.failed)
+        for r in self.resources:
+            yield r
+
+
+class FakeGraph:
+    """Keeps the stored fingerprints the delta sync reads, deletes and upserts."""
+
+    def __init__(self, stored):
+        self.stored = {r.id: CloudCrawlerBase.to_row(r) for r in stored}
+        self.synced = []
+
+    async def iter_query(self, query, parameters=None):
+        for row in list(self.stored.values()):
+            yield {"id": row["id"], "type": row["type"], "fingerprint": row["fingerprint"]}
+
+    async def write(self, query, parameters=None):
+        if "UNWIND $rows" in query:
+            self.stored.update({row["id"]: row for row in parameters["rows"]})
+            return [{"stored": len(parameters["rows"])}]
+        if "DETACH DELETE" in query:
+            deleted = [i for i in parameters["ids"] if self.stored.pop(i, None)]
+            return [{"deleted": len(deleted)}]
+        if "last_synced" in query:
+            self.synced.append(parameters)
+        return []
+
+
+class TestDeltaSync:
+    @pytest.mark.asyncio
+    async def test_deletes_resources_missing_from_crawl(self):
+        graph = FakeGraph([resource("org-1", "i-1"), resource("org-1", "i-2")])
+        crawler = FakeCrawler(graph, [resource("org-1", "i-1"), resource("org-1", "i-3")])
+
+        report = await crawler.sync_resources("org-1", "123456789012", {}, incremental=True)
+
+        assert sorted(graph.stored) == ["i-1", "i-3"]
+        assert (report["created"], report["unchanged"], report["deleted"]) == (1, 1, 1)
+        assert graph.synced[0]["account_id"] == "123456789012"
+
+    @pytest.mark.asyncio
+    async def test_keeps_resource_types_that_failed_to_list(self):
+        graph = FakeGraph([resource("org-1", "i-1"), resource("org-1", "logs", S3)])
+        crawler = FakeCrawler(graph, [], failed=[S3])
+
+        report = await crawler.sync_resources("org-1", "123456789012", {}, incremental=True)
+
+        assert sorted(graph.stored) == ["logs"]
+        assert report["deleted"] == 1
+        assert report["skipped_scopes"] == [S3]
+
+
+@pytest.mark.skipif(not NEO4J_TEST_URI, reason="NEO4J_TEST_URI is not set")
+class TestDeltaSyncAgainstNeo4j:
+    @pytest.fixture
+    async def neo4j(self, monkeypatch):
+        monkeypatch.setattr(settings, "NEO4J_URI", NEO4J_TEST_URI)
+        service = Neo4jService()
+        await service.connect()
+        yield service
+        await service.close()
+
+    @pytest.fixture
+    async def account(self, neo4j):
+        repo = OrganizationRepository(neo4j)
+        org = await repo.create_org(Organization(name=f"test-{uuid4().hex[:8]}"))
+        account = await repo.create_account(
+            Account(
+                org_id=org.id,
+                name="prod",
+                provider=CloudProvider.AWS,
+                account_id="123456789012",
+                last_synced=utc_now() - timedelta(days=1),
+            )
+        )
+        yield account
+        await neo4j.write(
+            """
+            MATCH (n) WHERE n.id = $org_id OR n.org_id = $org_id
+            DETACH DELETE n
+            """,
+            {"org_id": org.id},
+        )
+
+    async def test_sync_deletes_missing_keeps_failed_and_marks_account(self, neo4j, account):
+        org_id, account_id = account.org_id, account.account_id
+        crawler = FakeCrawler(
+            neo4j,
+            [resource(org_id, "i-1"), resource(org_id, "i-2"), resource(org_id, "logs", S3)],
+        )
+        await crawler.sync_resources(org_id, account_id, {}, incremental=True)
+
+        crawler.resources, crawler.failed = [resource(org_id, "i-1")], [S3]
+        report = await crawler.sync_resources(org_id, account_id, {}, incremental=True)
+
+        stored = await neo4j.read(
+            "MATCH (r:CloudResource {org_id: $org_id}) RETURN r.id AS id ORDER BY id",
+            {"org_id": org_id},
+        )
+        assert [r["id"] for r in stored] == ["i-1", "logs"]
+        assert report["deleted"] == 1
+        (synced,) = await OrganizationRepository(neo4j).list_accounts(org_id)
+        assert synced.last_synced > account.last_synced + timedelta(hours=23)
@@ -0,0 +1,53 @@
+import pytest
+
+from app.services.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"), max_entries=10)
+    yield cache
+    cache.close()
+
+
+class TestEmbeddingCache:
+    @pytest.mark.asyncio
+    async def test_round_trip_as_float32(self, cache):
+        await cache.put_many("ollama/embedding", {"a b": [0.5, 0.25, 1.0]})
+
+        found = await cache.get_many("ollama/embedding", ["a   b", "missing"])
+        assert found == {"a   b": [0.5, 0.25, 1.0]}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_keyed_by_model(self, cache):
+        await cache.put_many("ollama/embedding", {"text": [1.0]})
+        assert await cache.get_many("openai/embedding", ["text"]) == {}
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self, cache):
+        await cache.put_many("m", {f"t{i}": [float(i)] for i in range(10)})
+        await cache.get_many("m", ["t0"])
+        await cache.put_many("m", {"t10": [10.0]})
+
+        assert cache.stats()["entries"] == 9
+        assert await cache.get_many("m", ["t0", "t10"]) == {"t0": [0.0], "t10": [10.0]}
+
+    @pytest.mark.asyncio
+    async def test_size_tracked_without_rescanning(self, cache, tmp_path):
+        await cache.put_many("m", {f"t{i}": [float(i)] * 4 for i in range(8)})
+        # Replacing an entry must not count it twice
+        await cache.put_many("m", {"t0": [0.0] * 2, "t1": [1.0] * 4})
+        await cache.put_many("m", {f"u{i}": [float(i)] * 4 for i in range(3)})
+
+        stats = cache.stats()
+        cache._refresh_size()
+        assert (stats["entries"], stats["bytes"]) == (cache.entries, cache.bytes)
+        assert stats["evictions"] == 2
+
+        cache.close()
+        reopened = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"), max_entries=10)
+        await reopened.get_many("m", ["t1"])
+        assert (reopened.entries, reopened.bytes) == (stats["entries"], stats["bytes"])
+        reopened.close()
@@ -0,0 +1,74 @@
+import gzip
+import json
+
+import pytest
+
+from app.core.exceptions import CloudAPIError
+from app.services.crawler.gcp import GCPCrawler, full_resource_name, region_of
+
+ASSETS = [
+    {
+        "name": "//compute.googleapis.com/projects/p1/zones/us-central1-a/instances/web-1",
+        "assetType": "compute.googleapis.com/Instance",
+        "resource": {
+            "location": "us-central1-a",
+            "data": {
+                "name": "web-1",
+                "status": "RUNNING",
+                "machineType": "https://www.googleapis.com/compute/v1/projects/p1/zones/"
+                "us-central1-a/machineTypes/e2-small",
+            },
+        },
+    },
+    {
+        "name": "//storage.googleapis.com/logs-bucket",
+        "assetType": "storage.googleapis.com/Bucket",
+        "resource": {"location": "US", "data": {"name": "logs-bucket"}},
+    },
+    {"name": "//example.googleapis.com/thing", "assetType": "example.googleapis.com/Thing"},
+]
+
+
+async def _collect(path):
+    crawler = GCPCrawler(neo4j_service=None)
+    return [
+        r async for r in crawler.iter_resources("org-1", "p1", {"asset_export_path": str(path)})
+    ]
+
+
+class TestAssetExport:
+    @pytest.mark.asyncio
+    async def test_streams_supported_assets(self, tmp_path):
+        path = tmp_path / "export.json.gz"
+        with gzip.open(path, "wt") as f:
+            for asset in ASSETS:
+                f.write(json.dumps(asset) + "\n")
+            f.write("not json\n")
+
+        resources = await _collect(path)
+
+        assert [r.name for r in resources] == ["web-1", "logs-bucket"]
+        instance, bucket = resources
+        assert instance.id == ASSETS[0]["name"]
+        assert instance.metadata["machine_type"] == "e2-small"
+        assert instance.metadata["region"] == "us-central1"
+        assert bucket.metadata["region"] is None
+
+    @pytest.mark.asyncio
+    async def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(CloudAPIError):
+            await _collect(tmp_path / "missing.json")
+
+
+class TestNames:
+    def test_api_and_export_ids_agree(self):
+        self_link = "https://www.googleapis.com/compute/v1/projects/p1/global/networks/default"
+        assert (
+            full_resource_name(self_link)
+            == "//compute.googleapis.com/projects/p1/global/networks/default"
+        )
+
+    def test_region_of(self):
+        assert region_of("europe-west1-b") == "europe-west1"
+        assert region_of("europe-west1") == "europe-west1"
+        assert region_of("global") is None
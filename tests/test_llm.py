@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from app.core.exceptions import LLMError
+from app.services.llm import LLMService
+
+
+@pytest.fixture
+def llm():
+    service = LLMService()
+    service.embedding_batch_size = 3
+    service.embedding_batch_tokens = 100
+    service.embedding_concurrency = 4
+    return service
+
+
+class TestChunkForEmbedding:
+    def test_bounded_by_items(self, llm):
+        chunks = llm._chunk_for_embedding([f"text {n}" for n in range(7)])
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert [text for chunk in chunks for text in chunk] == [f"text {n}" for n in range(7)]
+
+    def test_bounded_by_tokens(self, llm):
+        # 200 characters is ~51 tokens, so no two of them fit in 100 tokens
+        texts = ["a" * 200, "b" * 200, "c" * 200]
+        assert llm._chunk_for_embedding(texts) == [["a" * 200], ["b" * 200], ["c" * 200]]
+
+    def test_oversized_text_gets_its_own_chunk(self, llm):
+        texts = ["short", "x" * 1000, "short too"]
+        assert llm._chunk_for_embedding(texts) == [["short"], ["x" * 1000], ["short too"]]
+
+
+class TestCreateEmbeddingsBatch:
+    @pytest.mark.asyncio
+    async def test_vectors_follow_input_order(self, llm, monkeypatch):
+        async def embed(chunk):
+            # Later chunks finish first
+            await asyncio.sleep(0.005 * (10 - int(chunk[0].split()[-1])))
+            return [[float(text.split()[-1])] for text in chunk]
+
+        monkeypatch.setattr(llm, "_embed", embed)
+        texts = [f"resource {n}" for n in range(10)] + ["resource 3"]
+
+        vectors = await llm.create_embeddings_batch(texts)
+
+        assert vectors == [[float(n)] for n in range(10)] + [[3.0]]
+
+    @pytest.mark.asyncio
+    async def test_short_response_raises(self, llm, monkeypatch):
+        async def embed(chunk):
+            return [[1.0] for _ in chunk[:-1]]
+
+        monkeypatch.setattr(llm, "_embed", embed)
+
+        with pytest.raises(LLMError):
+            await llm.create_embeddings_batch(["a", "b", "c", "d"])
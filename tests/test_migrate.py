@@ -0,0 +1,27 @@
+from app.core.migrate import MIGRATIONS_PATH, split_statements
+
+
+class TestSplitStatements:
+    def test_splits_on_semicolons_and_drops_comments(self):
+        cypher = """
+        // CONVERSATION
+        CREATE CONSTRAINT conversation_id IF NOT EXISTS
+        FOR (c:Conversation)
+        REQUIRE c.id IS UNIQUE;
+
+        // trailing comment
+        CREATE INDEX conversation_org_index IF NOT EXISTS
+        FOR (c:Conversation)
+        ON (c.org_id);
+        """
+        statements = split_statements(cypher)
+
+        assert len(statements) == 2
+        assert statements[0].startswith("CREATE CONSTRAINT conversation_id")
+        assert statements[1].endswith("ON (c.org_id)")
+
+    def test_every_migration_has_statements(self):
+        for path in MIGRATIONS_PATH.glob("*.cypher"):
+            statements = split_statements(path.read_text())
+            assert statements, path.name
+            assert not any(statement.startswith("//") for statement in statements)
@@ -0,0 +1,76 @@
+import pytest
+
+from app.services.crawler.recording import PageRecorder
+from app.services.crawler.replay import ReplayCrawler
+
+EC2_PAGE = {
+    "Reservations": [
+        {
+            "Instances": [
+                {
+                    "InstanceId": f"i-{n}",
+                    "PrivateDnsName": f"ip-10-0-0-{n}",
+                    "InstanceType": "t3.micro",
+                    "State": {"Name": "running"},
+                }
+                for n in range(2)
+            ]
+        }
+    ]
+}
+
+
+async def _replay(path, **kwargs):
+    failed = set()
+    crawler = ReplayCrawler(None, str(path), **kwargs)
+    resources = [r async for r in crawler.iter_resources("org-1", "123", {}, failed_scopes=failed)]
+    return resources, failed
+
+
+class TestReplay:
+    @pytest.mark.asyncio
+    async def test_replays_recorded_pages(self, tmp_path):
+        path = tmp_path / "aws.ndjson.gz"
+        with PageRecorder(str(path), "AWS", "123") as recorder:
+            recorder.page("AWS_EC2", "eu-west-1", EC2_PAGE)
+            recorder.failed("AWS_Lambda")
+
+        resources, failed = await _replay(path)
+
+        assert [r.id for r in resources] == ["i-0", "i-1"]
+        assert resources[0].metadata["region"] == "eu-west-1"
+        assert resources[0].metadata["state"] == "running"
+        assert failed == {"AWS_Lambda"}
+
+    @pytest.mark.asyncio
+    async def test_scale_synthesizes_distinct_resources(self, tmp_path):
+        path = tmp_path / "aws.ndjson.gz"
+        with PageRecorder(str(path), "AWS", "123") as recorder:
+            recorder.page("AWS_EC2", "eu-west-1", EC2_PAGE)
+
+        resources, _ = await _replay(path, scale=3)
+
+        assert len(resources) == 6
+        assert len({r.id for r in resources}) == 6
+
+    @pytest.mark.asyncio
+    async def test_azure_child_pages(self, tmp_path):
+        path = tmp_path / "azure.ndjson.gz"
+        parent = {"id": "/subscriptions/s/resourceGroups/rg/providers/x/servers/db", "name": "db"}
+        with PageRecorder(str(path), "AZURE", "s") as recorder:
+            recorder.page(
+                "AZURE_SQLDatabase",
+                None,
+                [
+                    {"id": parent["id"] + "/databases/master", "name": "master"},
+                    {"id": parent["id"] + "/databases/app", "name": "app", "sku": {"name": "S0"}},
+                ],
+                parent={**parent, "location": "westeurope"},
+            )
+
+        resources, _ = await _replay(path)
+
+        assert [r.name for r in resources] == ["app"]
+        assert resources[0].metadata["sku"] == "S0"
+        assert resources[0].metadata["region"] == "westeurope"
+        assert resources[0].metadata["resource_group"] == "rg"
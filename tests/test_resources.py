@@ -0,0 +1,62 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.deps import RequestContext
+from app.api.v1.endpoints.resources import list_resources, stream_resources_ndjson
+
+
+def node(resource_id):
+    return {
+        "id": resource_id,
+        "name": resource_id,
+        "type": "AWS_EC2",
+        "provider": "AWS",
+        "account_id": "123456789012",
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+
+
+class FakeNeo4j:
+    def __init__(self, records, error=None):
+        self.records = records
+        self.error = error
+        self.reads = []
+
+    async def read(self, query, parameters=None):
+        self.reads.append(parameters)
+        return self.records[: parameters["limit"]]
+
+    async def iter_query(self, query, parameters=None, fetch_size=None):
+        for record in self.records:
+            yield record
+        if self.error:
+            raise self.error
+
+
+class TestListResources:
+    @pytest.mark.asyncio
+    async def test_zero_limit_is_not_replaced_by_default(self):
+        neo4j = FakeNeo4j([{"r": node("i-1")}])
+
+        resources = await list_resources(
+            limit=0,
+            context=RequestContext("org-1", "key-1", "test"),
+            app=SimpleNamespace(neo4j=neo4j),
+        )
+
+        assert resources == []
+        assert neo4j.reads[0]["limit"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_error_ends_with_error_line(self):
+        app = SimpleNamespace(
+            neo4j=FakeNeo4j([{"r": node("i-1")}], error=RuntimeError("connection reset"))
+        )
+
+        lines = [line async for line in stream_resources_ndjson(app, "org-1", 0, None, None)]
+
+        assert [json.loads(line).get("id") for line in lines[:-1]] == ["i-1"]
+        assert json.loads(lines[-1]) == {"error": "Failed to stream resources"}
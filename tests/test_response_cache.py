@@ -0,0 +1,94 @@
+import pytest
+
+from app.models.graph import CloudResource
+from app.services.cache import CacheInvalidationChannel
+from app.services.crawler.base import CloudCrawlerBase
+from app.services.response_cache import SemanticResponseCache, context_fingerprint
+
+
+class TestSemanticResponseCache:
+    def test_matches_similar_questions_with_same_context(self):
+        cache = SemanticResponseCache(threshold=0.9)
+        fingerprint = context_fingerprint("Resource: web-1", [])
+        cache.set("org", fingerprint, [1.0, 0.0], "Check the security group")
+
+        assert cache.get("org", fingerprint, [0.98, 0.1]) == "Check the security group"
+        assert cache.get("org", fingerprint, [0.0, 1.0]) is None
+        assert cache.get("other-org", fingerprint, [1.0, 0.0]) is None
+        assert cache.get("org", context_fingerprint("Resource: web-2", []), [1.0, 0.0]) is None
+
+    def test_invalidate_org(self):
+        cache = SemanticResponseCache()
+        cache.set("org", "fp", [1.0], "a")
+        cache.set("other-org", "fp", [1.0], "b")
+
+        cache.invalidate_org("org")
+
+        assert cache.get("org", "fp", [1.0]) is None
+        assert cache.get("other-org", "fp", [1.0]) == "b"
+
+    def test_skips_entries_with_other_dimensions(self):
+        cache = SemanticResponseCache(threshold=0.5)
+        cache.set("org", "fp", [1.0, 0.0, 0.0], "old model")
+        cache.set("org", "fp", [1.0, 0.0], "new model")
+
+        assert cache.get("org", "fp", [1.0, 0.0]) == "new model"
+        assert cache.get("org", "fp", [1.0, 0.0, 0.0, 0.0]) is None
+
+    def test_evicts_least_recently_used(self):
+        cache = SemanticResponseCache(max_entries=2)
+        cache.set("org", "a", [1.0], "a")
+        cache.set("org", "b", [1.0], "b")
+        cache.get("org", "a", [1.0])
+        cache.set("org", "c", [1.0], "c")
+
+        assert len(cache) == 2
+        assert cache.get("org", "b", [1.0]) is None
+        assert cache.get("org", "a", [1.0]) == "a"
+
+
+class FakeCrawlNeo4j:
+    def __init__(self):
+        self.version = 0
+
+    async def write(self, query, parameters=None):
+        if "CacheInvalidation" in query:
+            self.version += 1
+            return [{"version": self.version}]
+        if "UNWIND $rows" in query:
+            return [{"stored": len(parameters["rows"])}]
+        return []
+
+
+class StaticCrawler(CloudCrawlerBase):
+    def __init__(self, resources, **kwargs):
+        super().__init__(FakeCrawlNeo4j(), **kwargs)
+        self.resources = resources
+
+    async def crawl_resources(self, org_id, account_id, credentials):
+        return self.resources
+
+
+class TestCrawlInvalidation:
+    @pytest.mark.asyncio
+    async def test_storing_resources_invalidates_and_publishes(self):
+        cache = SemanticResponseCache()
+        cache.set("org", "fp", [1.0], "stale")
+        cache.set("other-org", "fp", [1.0], "fresh")
+        resource = CloudResource(
+            id="i-1",
+            org_id="org",
+            name="web-1",
+            resource_type="AWS_EC2",
+            provider="aws",
+            account_id="acct",
+        )
+        crawler = StaticCrawler([resource], response_cache=cache)
+        crawler.response_cache_invalidation = CacheInvalidationChannel(crawler.neo4j, "responses")
+
+        report = await crawler.sync_resources("org", "acct", {}, incremental=False)
+
+        assert report["stored"] == 1
+        assert cache.get("org", "fp", [1.0]) is None
+        assert cache.get("other-org", "fp", [1.0]) == "fresh"
+        assert crawler.neo4j.version == 1
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from app.services.chat import ChatService
+from app.services.weaviate import WeaviateService
+
+# Imported lazily by the service; load it up front so it isn't timed
+pytest.importorskip("weaviate.classes.query")
+
+QUERY_SECONDS = 0.2
+
+
+class SlowQuery:
+    """Stands in for the async client's query API with a fixed latency."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def hybrid(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(QUERY_SECONDS)
+        hit = SimpleNamespace(
+            properties={"name": kwargs["query"]},
+            uuid="00000000-0000-0000-0000-000000000001",
+            metadata=SimpleNamespace(score=0.5),
+        )
+        return SimpleNamespace(objects=[hit])
+
+
+class FakeCollection:
+    def __init__(self):
+        self.query = SlowQuery()
+
+    def with_tenant(self, tenant):
+        return self
+
+
+class FakeLLM:
+    async def create_embeddings(self, text):
+        return [0.0]
+
+
+@pytest.fixture
+def collection():
+    return FakeCollection()
+
+
+@pytest.fixture
+def chat(collection):
+    weaviate = WeaviateService()
+    weaviate.client = SimpleNamespace(collections=SimpleNamespace(get=lambda name: collection))
+    return ChatService(neo4j_service=None, weaviate_service=weaviate, llm_service=FakeLLM())
+
+
+class TestWeaviateConcurrency:
+    @pytest.mark.asyncio
+    async def test_concurrent_searches_do_not_serialize(self, chat, collection):
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(chat.search_resources("org", f"query {i}") for i in range(10))
+        )
+        elapsed = time.perf_counter() - started
+
+        # search_resources swallows errors, so check the queries really ran
+        assert collection.query.calls == 10
+        assert [r[0]["name"] for r in results] == [f"query {i}" for i in range(10)]
+        # Serialized queries would take 10 * QUERY_SECONDS
+        assert elapsed < QUERY_SECONDS * 3
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive_during_search(self, chat, collection):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        results = await chat.search_resources("org", "stopped instances")
+        task.cancel()
+
+        assert collection.query.calls == 1
+        assert results[0]["score"] == 0.5
+        assert ticks >= 10